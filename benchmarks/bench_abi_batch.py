@@ -0,0 +1,76 @@
+"""
+Decoding many deposit records, one by one and as a batch of columns.
+
+Requires NumPy. Run from the repository root with:
+
+    python -m benchmarks.bench_abi_batch
+"""
+import random
+import timeit
+
+from pydantic import BaseModel
+
+from cartesi import abi
+
+
+class DepositRecord(BaseModel):
+    token: abi.Address
+    sender: abi.Address
+    amount: abi.UInt256
+    block: abi.UInt64
+    index: abi.UInt32
+    success: abi.Bool
+
+
+class PortalDeposit(BaseModel):
+    success: abi.Bool
+    token: abi.Address
+    sender: abi.Address
+    amount: abi.UInt256
+    execLayerData: bytes
+
+
+def make_payloads(model, count: int, packed: bool) -> list[bytes]:
+    rand = random.Random(0)
+    values = {
+        'token': lambda: '0x' + rand.randbytes(20).hex(),
+        'sender': lambda: '0x' + rand.randbytes(20).hex(),
+        'amount': lambda: rand.getrandbits(96),
+        'block': lambda: rand.getrandbits(40),
+        'index': lambda: rand.getrandbits(32),
+        'success': lambda: True,
+        'execLayerData': lambda: b'',
+    }
+    return [
+        abi.encode_model(
+            model(**{field: values[field]() for field in model.__fields__}),
+            packed=packed,
+        )
+        for _ in range(count)
+    ]
+
+
+def main(count: int = 10000, number: int = 3):
+    # Import NumPy before timing
+    abi.decode_batch([], DepositRecord)
+    cases = {
+        'standard': (DepositRecord, False),
+        'packed portal': (PortalDeposit, True),
+    }
+    for name, (model, packed) in cases.items():
+        payloads = make_payloads(model, count, packed)
+        loop = timeit.timeit(
+            lambda: [abi.decode_to_model(p, model, packed=packed)
+                     for p in payloads],
+            number=number,
+        ) / number
+        batch = timeit.timeit(
+            lambda: abi.decode_batch(payloads, model, packed=packed),
+            number=number,
+        ) / number
+        print(f'{name} ({count} payloads): loop {loop * 1e3:8.2f} ms, '
+              f'batch {batch * 1e3:8.2f} ms, {loop / batch:5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Reading one field of a large payload, with full and lazy decoding.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_abi_lazy
+"""
+import time
+import tracemalloc
+
+from pydantic import BaseModel
+
+from cartesi import abi
+
+
+class Entry(BaseModel):
+    key: abi.Bytes32
+    value: abi.UInt256
+
+
+class Batch(BaseModel):
+    owner: abi.Address
+    amounts: list[abi.UInt256]
+    entries: list[Entry]
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main(size: int = 50000):
+    batch = Batch(
+        owner='0x' + '11' * 20,
+        amounts=list(range(size)),
+        entries=[Entry(key=bytes(32), value=idx) for idx in range(size // 10)],
+    )
+    data = abi.encode_model(batch)
+    print(f'{len(data)} bytes, {size} amounts, {size // 10} entries')
+
+    readers = {
+        'decode_to_model': lambda: abi.decode_to_model(data, Batch),
+        'decode_lazy': lambda: abi.decode_lazy(data, Batch),
+    }
+    for name, decode in readers.items():
+        def read():
+            decoded = decode()
+            return (decoded.owner, decoded.amounts[size // 2],
+                    decoded.entries[-1].value)
+        result, elapsed, peak = measure(read)
+        print(f'{name:>16}: {elapsed * 1e3:9.3f} ms, '
+              f'peak {peak / 1024:9.1f} KiB, read {result[1:]}')
+
+
+if __name__ == '__main__':
+    main()
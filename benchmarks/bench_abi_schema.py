@@ -0,0 +1,76 @@
+"""
+Cost of deriving the ABI types of a model on every encode and decode.
+
+The "uncached" rows clear the schema cache before each call, so that every
+call derives the schema again, as it did before schemas were cached. Since
+the schema of a static model also holds its generated codec, those rows
+include the code generation as well.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_abi_schema
+"""
+import timeit
+
+from pydantic import BaseModel
+
+from cartesi import abi
+
+
+class Flat(BaseModel):
+    to: abi.Address
+    amount: abi.UInt256
+    flag: abi.Bool
+
+
+class Inner(BaseModel):
+    key: abi.Bytes32
+    value: abi.UInt256
+
+
+class Nested(BaseModel):
+    owner: abi.Address
+    inner: Inner
+
+
+class ListOfStruct(BaseModel):
+    owner: abi.Address
+    items: list[Inner]
+
+
+ADDRESS = '0x' + '11' * 20
+INNER = Inner(key=b'\x01' * 32, value=10**18)
+
+CASES = {
+    'flat': Flat(to=ADDRESS, amount=10**18, flag=True),
+    'nested': Nested(owner=ADDRESS, inner=INNER),
+    'list of 8 structs': ListOfStruct(owner=ADDRESS, items=[INNER] * 8),
+}
+
+
+def uncached(func):
+    def wrapper():
+        abi.clear_schema_cache()
+        func()
+    return wrapper
+
+
+def main(number: int = 5000):
+    for name, obj in CASES.items():
+        model = type(obj)
+        data = abi.encode_model(obj)
+        operations = {
+            'types': lambda: abi.get_abi_types_from_model(model),
+            'encode': lambda: abi.encode_model(obj),
+            'decode': lambda: abi.decode_to_model(data, model),
+        }
+        print(f'{name} model')
+        for op, func in operations.items():
+            before = timeit.timeit(uncached(func), number=number)
+            after = timeit.timeit(func, number=number)
+            print(f'{op:>10}: {before / number * 1e6:8.2f} us uncached, '
+                  f'{after / number * 1e6:8.2f} us cached')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Specialized codecs for static models against the generic eth_abi path.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_abi_static
+"""
+import timeit
+
+from cartesi import abi
+
+from .bench_abi_schema import Flat, Inner, Nested
+
+ADDRESS = '0x' + '11' * 20
+
+CASES = {
+    'flat': Flat(to=ADDRESS, amount=10**18, flag=True),
+    'nested': Nested(owner=ADDRESS, inner=Inner(key=b'\x01' * 32,
+                                                value=10**18)),
+}
+
+
+def main(number: int = 20000):
+    for name, obj in CASES.items():
+        schema = abi.get_model_schema(obj)
+        data = abi.encode_model(obj)
+        operations = {
+            'encode': (
+                lambda: abi._encode_generic(schema, obj),
+                lambda: abi.encode_model(obj),
+            ),
+            'decode': (
+                lambda: abi._decode_generic(schema, data),
+                lambda: abi.decode_to_model(data, type(obj)),
+            ),
+        }
+        print(f'{name} model')
+        for op, (generic, specialized) in operations.items():
+            before = timeit.timeit(generic, number=number)
+            after = timeit.timeit(specialized, number=number)
+            print(f'{op:>10}: {before / number * 1e6:8.2f} us eth_abi, '
+                  f'{after / number * 1e6:8.2f} us specialized')
+
+
+if __name__ == '__main__':
+    main()
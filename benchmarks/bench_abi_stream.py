@@ -0,0 +1,76 @@
+"""
+Encoding a large notice payload with eth_abi and with the streaming encoder.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_abi_stream
+"""
+import time
+import tracemalloc
+
+import eth_abi
+from pydantic import BaseModel
+
+from cartesi import abi
+
+
+class Transfer(BaseModel):
+    sender: abi.Address
+    receiver: abi.Address
+    amount: abi.UInt256
+    memo: abi.String
+
+
+class Report(BaseModel):
+    epoch: abi.UInt64
+    transfers: list[Transfer]
+    amounts: list[abi.UInt256]
+
+
+def measure(func, number: int):
+    func()
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    elapsed = (time.perf_counter() - start) / number
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(size: int = 2000, number: int = 10):
+    report = Report(
+        epoch=1,
+        transfers=[
+            Transfer(sender='0x' + '11' * 20, receiver='0x' + '22' * 20,
+                     amount=idx, memo=f'transfer {idx}')
+            for idx in range(size)
+        ],
+        amounts=list(range(size)),
+    )
+    schema = abi.get_model_schema(Report)
+    buffer = bytearray()
+
+    def into_buffer():
+        buffer.clear()
+        abi.encode_model_into(report, buffer)
+
+    encoders = {
+        'eth_abi': lambda: eth_abi.encode(
+            schema.types, abi._get_values_from_model(report)
+        ),
+        'encode_model': lambda: abi.encode_model(report),
+        'encode_model_into': into_buffer,
+    }
+    print(f'{len(abi.encode_model(report))} bytes, {size} transfers')
+    for name, encode in encoders.items():
+        elapsed, peak = measure(encode, number)
+        print(f'{name:>18}: {elapsed * 1e3:9.3f} ms, '
+              f'peak {peak / 1024:9.1f} KiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Dispatch cost of a DApp with many routes, scanning the routers in turn
+versus using the dispatch index built by `DApp.freeze()`.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_dispatch [routes_per_router]
+"""
+import json
+import sys
+import timeit
+
+from cartesi import (
+    DApp,
+    ABIRouter,
+    ABIFunctionSelectorHeader,
+    JSONRouter,
+    RollupResponse,
+    URLRouter,
+)
+
+
+def handler(rollup, data):
+    return True
+
+
+def build_dapp(n_routes: int) -> DApp:
+    dapp = DApp()
+    abi_router = ABIRouter()
+    url_router = URLRouter()
+    json_router = JSONRouter()
+    for idx in range(n_routes):
+        header = ABIFunctionSelectorHeader(
+            function=f'method{idx}',
+            argument_types=['uint256'],
+        )
+        abi_router.advance(header=header)(handler)
+        url_router.advance(f'path{idx}/{{id}}')(handler)
+        json_router.advance({'op': f'op{idx}'})(handler)
+    dapp.add_router(abi_router)
+    dapp.add_router(url_router)
+    dapp.add_router(json_router)
+    return dapp
+
+
+def make_request(payload: bytes) -> dict:
+    return {
+        'request_type': 'advance_state',
+        'data': {
+            'metadata': {
+                'msg_sender': '0x' + '00' * 20,
+                'epoch_index': 0,
+                'input_index': 0,
+                'block_number': 0,
+                'timestamp': 0,
+            },
+            'payload': '0x' + payload.hex(),
+        },
+    }
+
+
+def main(n_routes: int = 200):
+    last = n_routes - 1
+    selector = ABIFunctionSelectorHeader(
+        function=f'method{last}',
+        argument_types=['uint256'],
+    ).to_bytes()
+    requests = {
+        'last ABI route': make_request(selector + bytes(32)),
+        'last URL route': make_request(f'path{last}/123'.encode()),
+        'last JSON route': make_request(
+            json.dumps({'op': f'op{last}'}).encode()
+        ),
+        'no match': make_request(b'\xff' * 36),
+    }
+
+    dapps = {
+        'sequential': build_dapp(n_routes),
+        'frozen': build_dapp(n_routes),
+    }
+    dapps['frozen'].freeze()
+
+    print(f'{3 * n_routes} routes, times include parsing the request')
+    number = 200
+    for name, obj in requests.items():
+        print(name)
+        # Parse a new request every time, so no decoding is cached
+        elapsed = timeit.timeit(
+            lambda: RollupResponse.parse_obj(obj),
+            number=number,
+        )
+        print(f'{"parse only":>20}: {elapsed / number * 1e6:9.1f} us/input')
+        for dapp_name, dapp in dapps.items():
+            elapsed = timeit.timeit(
+                lambda: dapp._get_handler(RollupResponse.parse_obj(obj)),
+                number=number,
+            )
+            print(f'{dapp_name:>20}: {elapsed / number * 1e6:9.1f} us/input')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
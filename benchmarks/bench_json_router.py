@@ -0,0 +1,98 @@
+"""
+JSONRouter lookup cost with the discriminator index versus trying the
+routes in order, for a DApp with 200 operation types, and for large
+payloads, which the index scans only for the keys it needs.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_json_router [n_routes]
+"""
+import json
+import sys
+import timeit
+
+from cartesi import JSONRouter, RollupResponse
+from cartesi.router.json import _dict_contains
+
+
+def handler(rollup, data):
+    return True
+
+
+def linear_lookup(router: JSONRouter, request: RollupResponse):
+    """The lookup of JSONRouter before the index"""
+    try:
+        req_data = request.data.json_payload()
+    except Exception:
+        return None
+    for route_dict, route_func in router.advance_routes:
+        if _dict_contains(route_dict, req_data):
+            return route_func
+
+
+def make_request(doc) -> RollupResponse:
+    return RollupResponse.parse_obj({
+        'request_type': 'advance_state',
+        'data': {
+            'metadata': {
+                'msg_sender': '0x' + '00' * 20,
+                'epoch_index': 0,
+                'input_index': 0,
+                'block_number': 0,
+                'timestamp': 0,
+            },
+            'payload': '0x' + json.dumps(doc).encode().hex(),
+        },
+    })
+
+
+def main(n_routes: int = 200, number: int = 5000):
+    router = JSONRouter()
+    for idx in range(n_routes):
+        router.advance({'op': f'op{idx}'})(handler)
+    router.advance({'kind': 'fallback'})(handler)
+
+    requests = {
+        'first op': make_request({'op': 'op0', 'amount': 1}),
+        'last op': make_request({'op': f'op{n_routes - 1}', 'amount': 1}),
+        'fallback': make_request({'kind': 'fallback'}),
+        'no match': make_request({'op': 'missing'}),
+    }
+    print(f'{n_routes} routes')
+    for name, request in requests.items():
+        assert router.get_handler(request) is linear_lookup(router, request)
+        # The parsed JSON is cached on the request, as in a DApp
+        times = {
+            'linear': timeit.timeit(
+                lambda: linear_lookup(router, request), number=number
+            ),
+            'index': timeit.timeit(
+                lambda: router.get_handler(request), number=number
+            ),
+        }
+        print(f'  {name:>10}: ' + ', '.join(
+            f'{method} {elapsed / number * 1e6:8.2f} us'
+            for method, elapsed in times.items()
+        ))
+
+    print('large payloads, fresh requests')
+    items = [{'id': idx, 'name': f'item {idx}'} for idx in range(50000)]
+    for name, doc in {
+        'no match': {'op': 'missing', 'items': items},
+        'match': {'op': f'op{n_routes - 1}', 'items': items},
+    }.items():
+        times = {}
+        for method, lookup in (('linear', linear_lookup),
+                               ('index', JSONRouter.get_handler)):
+            requests = [make_request(doc) for _ in range(5)]
+            times[method] = timeit.timeit(
+                lambda: lookup(router, requests.pop()), number=5
+            ) / 5
+        print(f'  {name:>10}: ' + ', '.join(
+            f'{method} {elapsed * 1e3:8.2f} ms'
+            for method, elapsed in times.items()
+        ))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,66 @@
+"""
+Memory used by the balances of many accounts, in the dict the EtherWallet
+used to keep and in a Ledger.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_ledger [accounts ...]
+
+By default, with 1M and 10M accounts, which takes about 2 GB of memory for
+the dict of 10M accounts.
+"""
+import gc
+import sys
+import time
+
+from cartesi.wallet.ledger import Ledger
+
+
+def deposits(accounts: int):
+    """Deposits of up to about 100 ether to distinct addresses"""
+    for idx in range(accounts):
+        address = (idx * 0x9e3779b97f4a7c15 % 2**160).to_bytes(20, 'big')
+        yield '0x' + address.hex(), (idx * 7919 % 100003) * 10**15
+
+
+def dict_size(balances: dict) -> int:
+    return sys.getsizeof(balances) + sum(
+        sys.getsizeof(key) + sys.getsizeof(value)
+        for key, value in balances.items()
+    )
+
+
+def fill_dict(accounts: int) -> dict:
+    balances = {}
+    for sender, amount in deposits(accounts):
+        sender = sender.lower()
+        balances.setdefault(sender, 0)
+        balances[sender] += amount
+    return balances
+
+
+def fill_ledger(accounts: int) -> Ledger:
+    balances = Ledger()
+    for sender, amount in deposits(accounts):
+        balances.credit(sender, amount)
+    return balances
+
+
+def main(*sizes: int):
+    for accounts in sizes or (10**6, 10**7):
+        print(f'{accounts} accounts')
+        for name, fill, size in [('dict', fill_dict, dict_size),
+                                 ('Ledger', fill_ledger, sys.getsizeof)]:
+            start = time.perf_counter()
+            balances = fill(accounts)
+            elapsed = time.perf_counter() - start
+            used = size(balances)
+            print(f'{name:>8}: {used / 2**20:9.1f} MiB, '
+                  f'{used / accounts:6.1f} bytes/account, '
+                  f'{elapsed / accounts * 1e6:5.2f} us/deposit')
+            del balances
+            gc.collect()
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
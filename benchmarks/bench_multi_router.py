@@ -0,0 +1,92 @@
+"""
+Routing cost through a MultiRouter composing an EtherWallet and the
+application's routers, asking each router in turn versus the merged
+dispatch index.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_multi_router
+"""
+import json
+import timeit
+
+from cartesi import JSONRouter, RollupResponse
+from cartesi.router import DAppAddressRouter, MultiRouter
+from cartesi.wallet.ether import EtherWallet
+
+PORTAL = '0xFfdbe43d4c855BF7e0f105c400A50857f53AB044'
+RELAY = '0xF5DE34d6BbC0446E2a45719E718efEbaaE179daE'
+SENDER = '0x' + '11' * 20
+
+
+def handler(rollup, data):
+    return True
+
+
+def sequential_lookup(router: MultiRouter, request: RollupResponse):
+    """The lookup of MultiRouter before the merged index"""
+    for child in router.routers:
+        if isinstance(child, MultiRouter):
+            found = sequential_lookup(child, request)
+        else:
+            found = child.get_handler(request)
+        if found is not None:
+            return found
+
+
+def build_router(n_ops: int) -> MultiRouter:
+    app = MultiRouter()
+    app.add_router(EtherWallet(PORTAL, DAppAddressRouter(RELAY)))
+    json_router = JSONRouter()
+    for idx in range(n_ops):
+        json_router.advance({'op': f'op{idx}'})(handler)
+    app.add_router(json_router)
+    return app
+
+
+def make_request(payload: bytes, sender: str = SENDER,
+                 request_type: str = 'advance_state') -> RollupResponse:
+    data = {'payload': '0x' + payload.hex()}
+    if request_type == 'advance_state':
+        data['metadata'] = {
+            'msg_sender': sender,
+            'epoch_index': 0,
+            'input_index': 0,
+            'block_number': 0,
+            'timestamp': 0,
+        }
+    return RollupResponse.parse_obj({'request_type': request_type,
+                                     'data': data})
+
+
+def main(n_ops: int = 50, number: int = 5000):
+    router = build_router(n_ops)
+    requests = {
+        'ether deposit': make_request(bytes(72), sender=PORTAL),
+        'balance inspect': make_request(b'balance/ether',
+                                        request_type='inspect_state'),
+        'app JSON op': make_request(
+            json.dumps({'op': f'op{n_ops - 1}'}).encode()
+        ),
+        'no match': make_request(b'\xff' * 36),
+    }
+    print(f'EtherWallet and {n_ops} JSON routes')
+    for name, request in requests.items():
+        assert router.get_handler(request) is not None or \
+            sequential_lookup(router, request) is None
+        times = {
+            'sequential': timeit.timeit(
+                lambda: sequential_lookup(router, request), number=number
+            ),
+            'indexed': timeit.timeit(
+                lambda: router.get_handler(request), number=number
+            ),
+        }
+        print(f'  {name:>16}: ' + ', '.join(
+            f'{method} {elapsed / number * 1e6:7.2f} us'
+            for method, elapsed in times.items()
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Decoding of portal inputs with the packed codec, compared with the previous
+decoder built on the eth_abi registry.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_packed
+"""
+import timeit
+
+import eth_abi
+from eth_abi.codec import ABICodec
+from eth_abi.decoding import (
+    AddressDecoder,
+    BooleanDecoder,
+    ByteStringDecoder,
+    BytesDecoder,
+    UnsignedIntegerDecoder,
+)
+from eth_abi.registry import BaseEquals, registry_packed
+
+from cartesi import _packed
+
+TOKEN = bytes.fromhex('22' * 20)
+SENDER = bytes.fromhex('11' * 20)
+AMOUNT = (10**18).to_bytes(32, 'big')
+EXTRA = b'\x00' * 64
+
+PAYLOADS = {
+    'ether': (
+        ['address', 'uint256', 'bytes'],
+        SENDER + AMOUNT + EXTRA,
+    ),
+    'erc20': (
+        ['bool', 'address', 'address', 'uint256', 'bytes'],
+        b'\x01' + TOKEN + SENDER + AMOUNT + EXTRA,
+    ),
+    'erc721': (
+        ['address', 'address', 'uint256', 'bytes'],
+        TOKEN + SENDER + AMOUNT + eth_abi.encode(['bytes', 'bytes'],
+                                                 [b'', EXTRA]),
+    ),
+    'erc1155 single': (
+        ['address', 'address', 'uint256', 'uint256', 'bytes'],
+        TOKEN + SENDER + AMOUNT + AMOUNT + eth_abi.encode(['bytes', 'bytes'],
+                                                          [b'', EXTRA]),
+    ),
+    'erc1155 batch': (
+        ['address', 'address', 'bytes'],
+        TOKEN + SENDER + eth_abi.encode(
+            ['uint256[]', 'uint256[]', 'bytes', 'bytes'],
+            [list(range(10)), list(range(10)), b'', EXTRA],
+        ),
+    ),
+}
+
+
+def previous_codec() -> ABICodec:
+    """The decoder registry that was used for the packed encoding"""
+
+    class PackedBooleanDecoder(BooleanDecoder):
+        data_byte_size = 1
+
+    class PackedAddressDecoder(AddressDecoder):
+        data_byte_size = 20
+
+    class PackedBytesDecoder(ByteStringDecoder):
+        is_dynamic = False
+
+        def read_data_from_stream(self, stream):
+            return stream.read()
+
+    registry = registry_packed.copy()
+    registry.register_decoder(BaseEquals('bool'), PackedBooleanDecoder,
+                              label='bool')
+    registry.register_decoder(BaseEquals('address'), PackedAddressDecoder,
+                              label='address')
+    registry.register_decoder(BaseEquals('uint'), UnsignedIntegerDecoder,
+                              label='uint')
+    registry.register_decoder(BaseEquals('bytes', with_sub=False),
+                              PackedBytesDecoder, label='bytes')
+    registry.register_decoder(BaseEquals('bytes', with_sub=True),
+                              BytesDecoder, label='bytes<M>')
+    return ABICodec(registry)
+
+
+def main(number: int = 20000):
+    codec = previous_codec()
+    for name, (types, data) in PAYLOADS.items():
+        assert codec.decode(types, data) == _packed.decode_packed(types, data)
+        decode = _packed.compile_decoder(tuple(types))
+        before = timeit.timeit(lambda: codec.decode(types, data),
+                               number=number)
+        after = timeit.timeit(lambda: decode(data), number=number)
+        print(f'{name:>15}: {before / number * 1e6:8.2f} us eth_abi, '
+              f'{after / number * 1e6:8.2f} us packed codec')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Per-input overhead of parsing the `/finish` responses.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_parse
+"""
+import json
+import timeit
+
+from cartesi.models import RollupResponse, parse_rollup_response
+
+
+def make_response(payload_size: int) -> bytes:
+    response = {
+        'request_type': 'advance_state',
+        'data': {
+            'metadata': {
+                'msg_sender': '0xdeadbeef7dc51b33c9a3e4a21ae053daa1872810',
+                'epoch_index': 0,
+                'input_index': 0,
+                'block_number': 0,
+                'timestamp': 0,
+            },
+            'payload': '0x' + 'ab' * payload_size,
+        },
+    }
+    return json.dumps(response).encode('utf-8')
+
+
+def previous(content: bytes):
+    return RollupResponse.parse_obj(json.loads(content))
+
+
+def main():
+    parsers = {
+        'json + parse_obj': previous,
+        'strict': lambda c: parse_rollup_response(c, strict=True),
+        'fast': parse_rollup_response,
+    }
+    for size in (32, 1024, 1024 * 1024):
+        content = make_response(size)
+        number = 20000 if size < 1024 * 1024 else 200
+        print(f'Payload of {size} bytes')
+        for name, parser in parsers.items():
+            elapsed = timeit.timeit(lambda: parser(content), number=number)
+            print(f'{name:>20}: {elapsed / number * 1e6:9.2f} us/input')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Undoing a rejected input that changes a few balances of a large ledger,
+with the journal, compared with restoring a copy of the state taken before
+the input, for ledgers and dicts of growing sizes.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_state
+"""
+import timeit
+
+from cartesi.wallet.ledger import Ledger
+
+
+def address(idx: int) -> str:
+    return '0x' + idx.to_bytes(20, 'big').hex()
+
+
+def main(changes: int = 10, number: int = 200):
+    touched = [address(idx) for idx in range(0, 10 * changes, 10)]
+    new = [address(2**64 + idx) for idx in range(changes)]
+
+    def change(state):
+        for account in touched:
+            state[account] += 1
+        for account in new:
+            state[account] = 1
+
+    for size in (10**4, 10**5, 10**6):
+        balances = {address(idx): idx for idx in range(size)}
+        ledger = Ledger(balances)
+
+        def journaled():
+            ledger.begin()
+            change(ledger)
+            ledger.rollback()
+
+        def copied():
+            snapshot = balances.copy()
+            change(balances)
+            balances.clear()
+            balances.update(snapshot)
+
+        count = max(1, number * 10**4 // size)
+        before = min(timeit.repeat(copied, number=count, repeat=3)) / count
+        after = min(timeit.repeat(journaled, number=number, repeat=3)) / number
+        print(f'{size:>8} accounts: {before * 1e3:9.3f} ms dict copy, '
+              f'{after * 1e3:9.3f} ms journal')
+
+
+if __name__ == '__main__':
+    main()
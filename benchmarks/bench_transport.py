@@ -0,0 +1,56 @@
+"""
+Compare the HTTP transports against a local stand-in Rollup Server.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_transport [n_requests]
+"""
+import sys
+import time
+
+import requests
+
+from cartesi.transport import SessionTransport, SocketTransport
+from tests.standin_server import StandinRollupServer
+
+
+class _ModuleLevelRequests:
+    """Previous behavior: a new connection for every request"""
+
+    def post(self, url, data):
+        return requests.post(url, json=data)
+
+    def close(self):
+        pass
+
+
+def bench(transport, url: str, n: int) -> float:
+    payload = {'payload': '0x' + '00' * 64}
+    # Warm up the connection
+    transport.post(url, payload)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        transport.post(url, payload)
+    elapsed = time.perf_counter() - start
+
+    transport.close()
+    return elapsed / n
+
+
+def main(n: int = 2000):
+    transports = {
+        'requests.post': _ModuleLevelRequests(),
+        'SessionTransport': SessionTransport(),
+        'SocketTransport': SocketTransport(),
+    }
+    with StandinRollupServer() as server:
+        url = server.url + '/notice'
+        print(f'{n} POST requests per transport')
+        for name, transport in transports.items():
+            per_request = bench(transport, url, n)
+            print(f'{name:>20}: {per_request * 1e6:9.1f} us/request')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,93 @@
+"""
+URLRouter dispatch cost through a frozen DApp, as when it runs, with routes
+sharing their first segment, such as `balance/...`, for a growing number of
+routes. The DApp looks up the trie of path segments, compared with a
+dispatch index of one route per template, keyed by the first segment, and
+with trying the routes in order.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_url_router
+"""
+from functools import partial
+import timeit
+
+from cartesi import DApp, RollupResponse, URLRouter
+from cartesi.router.index import DispatchIndex, Route, url_prefix
+from cartesi.router.url import _match_route
+
+
+def handler(rollup, data):
+    return True
+
+
+def linear_lookup(router: URLRouter, request: RollupResponse):
+    """The lookup of URLRouter before the trie"""
+    for route in router.routes:
+        found = _match_route(route, request)
+        if found is not None:
+            return found
+
+
+def per_route_index(router: URLRouter) -> DispatchIndex:
+    """The dispatch index of a frozen DApp before it used the trie"""
+    return DispatchIndex([
+        Route(
+            match=partial(_match_route, route),
+            request_type=route.requestType,
+            url_prefix=url_prefix(route.path),
+        )
+        for route in router.routes
+    ])
+
+
+def build_dapp(n_routes: int) -> tuple[DApp, URLRouter]:
+    router = URLRouter()
+    for idx in range(n_routes):
+        router.advance(f'balance/token{idx}/{{address}}')(handler)
+        router.inspect(f'balance/token{idx}/{{address}}/{{id}}')(handler)
+    dapp = DApp()
+    dapp.add_router(router)
+    dapp.freeze()
+    return dapp, router
+
+
+def make_request(path: str) -> RollupResponse:
+    return RollupResponse.parse_obj({
+        'request_type': 'inspect_state',
+        'data': {'payload': '0x' + path.encode('utf-8').hex()},
+    })
+
+
+def main(number: int = 2000):
+    for n_routes in (10, 100, 1000):
+        dapp, router = build_dapp(n_routes)
+        index = per_route_index(router)
+        requests = {
+            'first route': make_request('balance/token0/0xab/2'),
+            'last route': make_request(f'balance/token{n_routes - 1}/0xab/2'),
+            'no match': make_request('balance/missing/0xab'),
+        }
+        print(f'{n_routes} routes per request type')
+        for name, request in requests.items():
+            assert (dapp._index.get_handler(request) is None) == \
+                (linear_lookup(router, request) is None)
+            times = {
+                'linear': timeit.timeit(
+                    lambda: linear_lookup(router, request), number=number
+                ),
+                'per-route index': timeit.timeit(
+                    lambda: index.get_handler(request), number=number
+                ),
+                'dapp': timeit.timeit(
+                    lambda: dapp._get_handler(request), number=number
+                ),
+            }
+            print(f'  {name:>12}: ' + ', '.join(
+                f'{method} {elapsed / number * 1e6:8.2f} us'
+                for method, elapsed in times.items()
+            ))
+
+
+if __name__ == '__main__':
+    main()
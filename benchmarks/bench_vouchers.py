@@ -0,0 +1,56 @@
+"""
+Generating the vouchers of a withdrawal sweep, one model at a time and with
+a VoucherFactory.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_vouchers
+"""
+import timeit
+
+from pydantic import BaseModel
+
+from cartesi import abi
+from cartesi.vouchers import VoucherFactory, create_voucher_from_model
+
+TOKEN = '0x' + '11' * 20
+
+
+class TransferParams(BaseModel):
+    to: abi.Address
+    amount: abi.UInt256
+
+
+def main(size: int = 1000, number: int = 20):
+    values = [('0x' + f'{idx:040x}', idx * 10**18) for idx in range(size)]
+    factory = VoucherFactory(TOKEN, 'transfer', TransferParams)
+
+    def from_models():
+        return [
+            create_voucher_from_model(
+                TOKEN, 'transfer', TransferParams(to=to, amount=amount)
+            )
+            for to, amount in values
+        ]
+
+    def factory_models():
+        return [
+            factory.create(TransferParams(to=to, amount=amount))
+            for to, amount in values
+        ]
+
+    def factory_batch():
+        return factory.create_batch(values)
+
+    assert from_models() == factory_models() == factory_batch()
+    print(f'{size} vouchers')
+    for name, func in [('create_voucher_from_model', from_models),
+                       ('VoucherFactory.create', factory_models),
+                       ('VoucherFactory.create_batch', factory_batch)]:
+        elapsed = min(timeit.repeat(func, number=number, repeat=3)) / number
+        print(f'{name:>28}: {elapsed * 1e3:8.3f} ms, '
+              f'{elapsed / size * 1e6:6.2f} us/voucher')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Latency of the EtherWallet balance inspects as the number of accounts grows,
+for one address and for a page, against the report of every balance.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_wallet_inspect [accounts ...]
+"""
+import sys
+import timeit
+
+from cartesi import DApp
+from cartesi.router import DAppAddressRouter
+from cartesi.testclient import TestClient
+from cartesi.wallet.ether import EtherWallet
+
+PORTAL = '0xffdbe43d4c855bf7e0f105c400a50857f53ab044'
+RELAY = '0xf5de34d6bbc0446e2a45719e718efebaae179dae'
+
+
+def inspect_payload(path: str) -> str:
+    return '0x' + path.encode('ascii').hex()
+
+
+def main(*sizes: int, number: int = 20):
+    for accounts in sizes or (10**3, 10**5, 10**6):
+        app = DApp()
+        wallet = EtherWallet(PORTAL, DAppAddressRouter(RELAY))
+        app.add_router(wallet)
+        app.freeze()
+        client = TestClient(app)
+        wallet.balance.apply_credits(
+            (f'0x{idx:040x}', idx * 10**15) for idx in range(accounts)
+        )
+
+        full_dump = inspect_payload('balance/ether')
+        address = inspect_payload(f'balance/ether/0x{accounts // 2:040x}')
+        page = inspect_payload(f'balance/ether?cursor={accounts // 2}')
+
+        print(f'{accounts} accounts')
+        for name, func, repeat in [
+            ('balance/ether', lambda: client.send_inspect(full_dump), 1),
+            ('balance/ether/{address}',
+             lambda: client.send_inspect(address), number),
+            ('balance/ether?cursor=', lambda: client.send_inspect(page),
+             number),
+        ]:
+            elapsed = min(timeit.repeat(func, number=repeat, repeat=3))
+            size = len(client.rollup.reports[-1]['data']['payload']) // 2 - 1
+            print(f'{name:>24}: {elapsed / repeat * 1e3:9.3f} ms, '
+                  f'report of {size} bytes')
+            client.rollup.reports.clear()
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,96 @@
+"""
+Handling ERC20 and ERC1155 batch deposits with the wallets, compared with
+handlers decoding each input with `decode_to_model` into a dict of balances.
+
+Run from the repository root with:
+
+    python -m benchmarks.bench_wallets
+"""
+import timeit
+
+import eth_abi
+from pydantic import BaseModel
+
+from cartesi import abi, _packed
+from cartesi.models import RollupData, RollupMetadata
+from cartesi.router import DAppAddressRouter
+from cartesi.testclient import MockRollup
+from cartesi.wallet import erc20, erc1155
+from cartesi.wallet.erc20 import DepositERC20Payload
+from cartesi.wallet.erc1155 import DepositERC1155BatchPayload
+
+PORTAL = '0x' + '11' * 20
+TOKEN = '0x' + '22' * 20
+SENDER = '0x' + '33' * 20
+
+
+class BatchData(BaseModel):
+    tokenIds: erc1155.UInt256Array
+    amounts: erc1155.UInt256Array
+    baseLayerData: bytes
+    execLayerData: bytes
+
+
+def hand_rolled_erc20(balances: dict, data: RollupData) -> bool:
+    deposit = abi.decode_to_model(data=data.bytes_payload(),
+                                  model=DepositERC20Payload, packed=True)
+    if not deposit.success:
+        return False
+    key = (deposit.token.lower(), deposit.sender.lower())
+    balances[key] = balances.get(key, 0) + deposit.depositAmount
+    return True
+
+
+def hand_rolled_erc1155_batch(balances: dict, data: RollupData) -> bool:
+    deposit = abi.decode_to_model(data=data.bytes_payload(),
+                                  model=DepositERC1155BatchPayload,
+                                  packed=True)
+    batch = abi.decode_to_model(data=deposit.data, model=BatchData)
+    for token_id, amount in zip(batch.tokenIds, batch.amounts):
+        key = (deposit.token.lower(), deposit.sender.lower(), token_id)
+        balances[key] = balances.get(key, 0) + amount
+    return True
+
+
+def rollup_data(payload: bytes) -> RollupData:
+    metadata = RollupMetadata(msg_sender=PORTAL, epoch_index=0,
+                              input_index=0, block_number=0, timestamp=0)
+    return RollupData(metadata=metadata, payload='0x' + payload.hex())
+
+
+def main(batch_size: int = 100, number: int = 2000):
+    rollup = MockRollup()
+    erc20_data = rollup_data(_packed.encode_packed(
+        ['bool', 'address', 'address', 'uint256', 'bytes'],
+        [True, TOKEN, SENDER, 10**18, b''],
+    ))
+    batch_data = rollup_data(_packed.encode_packed(
+        ['address', 'address', 'bytes'],
+        [TOKEN, SENDER, eth_abi.encode(
+            ['uint256[]', 'uint256[]', 'bytes', 'bytes'],
+            [list(range(batch_size)), [10] * batch_size, b'', b''],
+        )],
+    ))
+
+    erc20_wallet = erc20.ERC20Wallet(PORTAL)
+    erc1155_wallet = erc1155.ERC1155Wallet(PORTAL, PORTAL,
+                                           DAppAddressRouter(PORTAL))
+    balances = {}
+    cases = [
+        ('erc20', number,
+         lambda: hand_rolled_erc20(balances, erc20_data),
+         lambda: erc20._deposit_erc20(erc20_wallet, rollup, erc20_data)),
+        (f'erc1155 batch of {batch_size}', number // 10,
+         lambda: hand_rolled_erc1155_batch(balances, batch_data),
+         lambda: erc1155._deposit_erc1155_batch(erc1155_wallet, rollup,
+                                                batch_data)),
+    ]
+    for name, count, before, after in cases:
+        before = min(timeit.repeat(before, number=count, repeat=3)) / count
+        after = min(timeit.repeat(after, number=count, repeat=3)) / count
+        print(f'{name:>22}: {before * 1e6:8.2f} us decode_to_model, '
+              f'{after * 1e6:8.2f} us wallet')
+
+
+if __name__ == '__main__':
+    main()
@@ -8,7 +8,8 @@ from .models import ( # noqa
     RollupMetadata,
     RollupResponse
 )
-from .rollup import Rollup, HTTPRollupServer # noqa
+from .rollup import Rollup, HTTPRollupServer, AsyncHTTPRollupServer # noqa
+from .state import Journaled, JournaledDict # noqa
 from .router import ( # noqa
     Router,
     JSONRouter,
@@ -0,0 +1,278 @@
+"""
+Columnar decoding of many payloads sharing one model into NumPy arrays
+
+All the payloads are copied into a single two-dimensional byte matrix, one
+row per payload, and each field is decoded for all the rows at once from
+its fixed offset. Only the values wider than 64 bits are converted one by
+one, into Python integers.
+
+NumPy is an optional dependency, imported when a batch is decoded.
+"""
+from collections.abc import Iterable
+from dataclasses import dataclass
+import re
+
+from eth_abi.exceptions import InsufficientDataBytes, NonEmptyPaddingBytes
+
+WORD_SIZE = 32
+
+_INT_TYPE = re.compile(r'(u?)int(\d*)')
+_BYTES_TYPE = re.compile(r'bytes(\d+)')
+
+
+@dataclass
+class _Column:
+    """Location of a field in the payloads
+
+    Attributes
+    ----------
+    name : str
+        Column name, with the names of the nested models separated by dots
+    abi_type : str
+        ABI type of the field
+    start : int
+        Offset of the value bytes
+    size : int | None
+        Number of value bytes, or None for the rest of the payload
+    padding : tuple[int, int] | None
+        Range of padding bytes, in the standard encoding
+    """
+    name: str
+    abi_type: str
+    start: int
+    size: int | None
+    padding: tuple[int, int] | None = None
+
+
+def decode_batch(schema, payloads: Iterable[bytes], packed: bool) -> dict:
+    """Decode payloads encoded as the model of `schema` into columns.
+
+    See `abi.decode_batch`.
+    """
+    np = _import_numpy()
+    columns, fixed_size = _plan(schema, packed)
+
+    payloads = list(payloads)
+    data = b''.join([payload[:fixed_size] for payload in payloads])
+    if len(data) != len(payloads) * fixed_size:
+        for row, payload in enumerate(payloads):
+            if len(payload) < fixed_size:
+                raise InsufficientDataBytes(
+                    f'Tried to read {fixed_size} bytes from payload {row}, '
+                    f'only got {len(payload)} bytes.'
+                )
+    matrix = np.frombuffer(data, dtype=np.uint8).reshape(len(payloads),
+                                                         fixed_size)
+    _check_zero_padding(np, matrix, columns)
+
+    result = {}
+    for column in columns:
+        if column.size is None:
+            result[column.name] = _trailing_column(np, column, payloads,
+                                                   fixed_size)
+            continue
+        if column.padding is not None and _is_signed(column):
+            _check_padding(np, matrix, column)
+        values = matrix[:, column.start:column.start + column.size]
+        result[column.name] = _decode_column(np, column, values)
+    return result
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            'Decoding batches requires NumPy, install it with '
+            '"pip install numpy".'
+        ) from None
+    return numpy
+
+
+def _plan(schema, packed: bool,
+          prefix: str = '', offset: int = 0) -> tuple[list, int]:
+    """Return the columns of a model and the size of its fixed part"""
+    columns = []
+    last = len(schema.fields) - 1
+    for idx, (field, abi_type, nested) in enumerate(
+        zip(schema.fields, schema.types, schema.nested)
+    ):
+        name = prefix + field
+        if nested is not None:
+            if nested[0] != 'model':
+                raise ValueError(f'Field {name} is a list, which cannot be '
+                                 'decoded in batches.')
+            nested_columns, offset = _plan(nested[1], packed, name + '.',
+                                           offset)
+            columns += nested_columns
+            continue
+
+        if abi_type in ('bytes', 'string'):
+            if not packed or prefix or idx != last:
+                raise ValueError(
+                    f'Field {name} is dynamic, which can only be decoded in '
+                    'batches as the last field of the packed encoding.'
+                )
+            columns.append(_Column(name, abi_type, offset, None))
+            continue
+
+        size = _value_size(name, abi_type)
+        if packed:
+            columns.append(_Column(name, abi_type, offset, size))
+            offset += size
+        elif abi_type.startswith('bytes'):
+            columns.append(_Column(name, abi_type, offset, size,
+                                   (offset + size, offset + WORD_SIZE)))
+            offset += WORD_SIZE
+        else:
+            start = offset + WORD_SIZE - size
+            columns.append(_Column(name, abi_type, start, size,
+                                   (offset, start)))
+            offset += WORD_SIZE
+    return columns, offset
+
+
+def _value_size(name: str, abi_type: str) -> int:
+    match = _INT_TYPE.fullmatch(abi_type)
+    if match is not None:
+        bits = int(match.group(2) or 256)
+        if bits % 8 or not 8 <= bits <= 256:
+            raise ValueError(f'Invalid type {abi_type} for field {name}')
+        return bits // 8
+    match = _BYTES_TYPE.fullmatch(abi_type)
+    if match is not None:
+        size = int(match.group(1))
+        if not 1 <= size <= 32:
+            raise ValueError(f'Invalid type {abi_type} for field {name}')
+        return size
+    if abi_type == 'bool':
+        return 1
+    if abi_type == 'address':
+        return 20
+    raise ValueError(f'Type {abi_type} of field {name} cannot be decoded in '
+                     'batches.')
+
+
+def _is_signed(column: _Column) -> bool:
+    match = _INT_TYPE.fullmatch(column.abi_type)
+    return match is not None and not match.group(1)
+
+
+def _check_zero_padding(np, matrix, columns: list[_Column]):
+    """Check the padding of all the unsigned values at once"""
+    positions = [
+        pos
+        for column in columns
+        if column.padding is not None and not _is_signed(column)
+        for pos in range(*column.padding)
+    ]
+    if positions and matrix[:, positions].any():
+        for column in columns:
+            if column.padding is not None and not _is_signed(column):
+                _check_padding(np, matrix, column)
+
+
+def _check_padding(np, matrix, column: _Column):
+    start, end = column.padding
+    padding = matrix[:, start:end]
+    expected = 0
+    if _is_signed(column):
+        # Signed integers are padded with their sign bit
+        negative = matrix[:, column.start] >= 0x80
+        expected = np.where(negative, 0xff, 0).astype(np.uint8)[:, None]
+    _raise_on_rows(np, (padding != expected).any(axis=1),
+                   f'Padding bytes of {column.name} were not empty')
+
+
+def _raise_on_rows(np, bad, message: str):
+    if bad.any():
+        row = int(np.argmax(bad))
+        raise NonEmptyPaddingBytes(f'{message} in payload {row}')
+
+
+def _decode_column(np, column: _Column, values):
+    abi_type = column.abi_type
+    match = _INT_TYPE.fullmatch(abi_type)
+    if match is not None:
+        signed = not match.group(1)
+        if column.size > 8:
+            return _object_int_column(np, values, signed)
+        return _int_column(np, values, signed)
+
+    if abi_type == 'bool':
+        flags = values[:, 0]
+        _raise_on_rows(np, flags > 1,
+                       f'Boolean {column.name} must be either 0x0 or 0x1')
+        return flags.astype(bool)
+
+    # Addresses and bytesN
+    return np.ascontiguousarray(values).view(f'S{column.size}').ravel()
+
+
+def _int_column(np, values, signed: bool):
+    """Integers of up to 64 bits, into the narrowest fitting dtype"""
+    size = values.shape[1]
+    itemsize = 1
+    while itemsize < size:
+        itemsize *= 2
+    kind = 'i' if signed else 'u'
+
+    if size == itemsize:
+        big_endian = np.ascontiguousarray(values).view(f'>{kind}{size}')
+        return big_endian.ravel().astype(f'{kind}{itemsize}')
+
+    column = np.zeros(values.shape[0], dtype=np.uint64)
+    for idx in range(size):
+        column = (column << np.uint64(8)) | values[:, idx]
+    if signed:
+        bits = size * 8
+        column = column.astype(np.int64)
+        column[column >= 2**(bits - 1)] -= 2**bits
+    return column.astype(f'{kind}{itemsize}')
+
+
+def _object_int_column(np, values, signed: bool):
+    """Integers wider than 64 bits, as Python integers"""
+    count, size = values.shape
+    column = np.empty(count, dtype=object)
+    if signed:
+        raw = np.ascontiguousarray(values).tobytes()
+        column[:] = [
+            int.from_bytes(raw[pos:pos + size], 'big', signed=True)
+            for pos in range(0, len(raw), size)
+        ]
+        return column
+
+    # Skip the leading bytes that are zero in every row, and convert the
+    # rest in 64-bit limbs, which NumPy turns into Python integers at once
+    used = np.flatnonzero(values.any(axis=0))
+    first = int(used[0]) if len(used) else size
+    limbs = -(-(size - first) // 8)
+    if not limbs:
+        column[:] = [0] * count
+        return column
+    start = size - 8 * limbs
+    padded = values
+    if start < 0:
+        padded = np.zeros((count, 8 * limbs), dtype=np.uint8)
+        padded[:, -start:] = values
+        start = 0
+    words = np.ascontiguousarray(padded[:, start:]).view('>u8')
+
+    result = words[:, 0].tolist()
+    for limb in range(1, limbs):
+        low = words[:, limb].tolist()
+        result = [(high << 64) | value for high, value in zip(result, low)]
+    column[:] = result
+    return column
+
+
+def _trailing_column(np, column: _Column, payloads: list, start: int):
+    column_values = np.empty(len(payloads), dtype=object)
+    if column.abi_type == 'string':
+        column_values[:] = [
+            bytes(payload[start:]).decode('utf-8') for payload in payloads
+        ]
+    else:
+        column_values[:] = [bytes(payload[start:]) for payload in payloads]
+    return column_values
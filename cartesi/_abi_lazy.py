@@ -0,0 +1,243 @@
+"""
+Lazy views over data in the standard ABI encoding
+
+A view keeps a reference to the encoded data and decodes a field only when
+it is accessed, following the head and tail offsets of the encoding.
+Dynamic arrays are exposed as sequences that decode their elements on
+access, so that reading a few elements of a large array does not decode
+the whole array.
+"""
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+import re
+
+from eth_abi.exceptions import InsufficientDataBytes
+
+from . import _packed
+
+WORD_SIZE = 32
+
+_ARRAY = re.compile(r'(?P<element>.+)\[(?P<length>\d*)\]')
+
+
+class _Node(ABC):
+    """Layout of an ABI type in the standard encoding
+
+    Attributes
+    ----------
+    dynamic : bool
+        Whether the value is stored in the tail, pointed by an offset
+    size : int
+        Size of the value in the head: the whole value if static, or the
+        offset if dynamic
+    """
+    dynamic = False
+    size = WORD_SIZE
+
+    @abstractmethod
+    def read(self, view: memoryview, pos: int):
+        """Decode the value starting at `pos`"""
+
+
+class _Word(_Node):
+    def __init__(self, decode):
+        self.decode = decode
+
+    def read(self, view: memoryview, pos: int):
+        return self.decode(_slice(view, pos, WORD_SIZE))
+
+
+class _Bytes(_Node):
+    dynamic = True
+
+    def __init__(self, is_string: bool):
+        self.is_string = is_string
+
+    def read(self, view: memoryview, pos: int):
+        length = _read_uint(view, pos)
+        data = _slice(view, pos + WORD_SIZE, length)
+        if self.is_string:
+            return str(data, 'utf-8')
+        return bytes(data)
+
+
+class _Array(_Node):
+    def __init__(self, element: _Node, length: int | None):
+        self.element = element
+        self.length = length
+        self.dynamic = length is None or element.dynamic
+        if not self.dynamic:
+            self.size = length * element.size
+
+    def read(self, view: memoryview, pos: int):
+        length = self.length
+        if length is None:
+            length = _read_uint(view, pos)
+            pos += WORD_SIZE
+        _slice(view, pos, length * self.element.size)
+        return LazyArray(view, pos, self.element, range(length))
+
+
+class _Tuple(_Node):
+    def __init__(self, schema, fields: dict[str, tuple[int, _Node]]):
+        self.schema = schema
+        self.fields = fields
+        self.dynamic = any(node.dynamic for _, node in fields.values())
+        if not self.dynamic:
+            self.size = sum(node.size for _, node in fields.values())
+
+    def read(self, view: memoryview, pos: int):
+        return LazyModel(view, pos, self)
+
+
+def compile_layout(schema) -> _Tuple:
+    """Return the layout of the standard encoding of a model schema.
+
+    Raises ValueError if a type is not supported.
+    """
+    fields = {}
+    offset = 0
+    for field, abi_type, nested in zip(schema.fields, schema.types,
+                                       schema.nested):
+        if nested is None:
+            node = _compile_type(abi_type)
+        elif nested[0] == 'list':
+            node = _Array(compile_layout(nested[1]), None)
+        else:
+            node = compile_layout(nested[1])
+        fields[field] = (offset, node)
+        offset += node.size
+    return _Tuple(schema, fields)
+
+
+def _compile_type(abi_type: str) -> _Node:
+    match = _ARRAY.fullmatch(abi_type)
+    if match is not None:
+        element = _compile_type(match.group('element'))
+        length = match.group('length')
+        return _Array(element, int(length) if length else None)
+    if abi_type in ('bytes', 'string'):
+        return _Bytes(abi_type == 'string')
+    return _Word(_packed.word_decoder(abi_type))
+
+
+def _read_value(view: memoryview, base: int, head: int, node: _Node):
+    """Decode a value whose head is at `base + head`, in a tuple or array
+    starting at `base`"""
+    if node.dynamic:
+        return node.read(view, base + _read_uint(view, base + head))
+    return node.read(view, base + head)
+
+
+def _read_uint(view: memoryview, pos: int) -> int:
+    return int.from_bytes(_slice(view, pos, WORD_SIZE), 'big')
+
+
+def _slice(view: memoryview, pos: int, size: int) -> memoryview:
+    if pos + size > len(view):
+        raise InsufficientDataBytes(
+            f'Tried to read {size} bytes at offset {pos}, only got '
+            f'{max(len(view) - pos, 0)} bytes.'
+        )
+    return view[pos:pos + size]
+
+
+class LazyModel:
+    """Read-only view of a model encoded with the standard ABI encoding.
+
+    Fields are decoded when accessed for the first time and then cached.
+    Nested models are returned as views and arrays as `LazyArray`. The
+    values are checked against their ABI types, but are not validated by
+    the model. Call `to_model()` to decode all fields into the model.
+    """
+
+    __slots__ = ('_view', '_pos', '_layout', '_cache')
+
+    def __init__(self, view: memoryview, pos: int, layout: _Tuple):
+        self._view = view
+        self._pos = pos
+        self._layout = layout
+        self._cache = {}
+
+    def __getattr__(self, name: str):
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+        try:
+            head, node = self._layout.fields[name]
+        except KeyError:
+            raise AttributeError(
+                f'{self._layout.schema.model.__name__!r} view has no field '
+                f'{name!r}'
+            ) from None
+        value = _read_value(self._view, self._pos, head, node)
+        self._cache[name] = value
+        return value
+
+    def __dir__(self):
+        return list(self._layout.fields)
+
+    @property
+    def model(self) -> type:
+        """The model class of this view"""
+        return self._layout.schema.model
+
+    def to_model(self):
+        """Decode all the fields and return an instance of the model"""
+        values = {
+            name: _materialize(getattr(self, name))
+            for name in self._layout.fields
+        }
+        return self.model.parse_obj(values)
+
+    def __repr__(self):
+        return f'<LazyModel {self.model.__name__}>'
+
+
+class LazyArray(Sequence):
+    """Read-only sequence over an array of the standard ABI encoding.
+
+    Elements are decoded when accessed, and are not cached. Slicing returns
+    another `LazyArray` over the same data.
+    """
+
+    __slots__ = ('_view', '_base', '_element', '_indices')
+
+    def __init__(self, view: memoryview, base: int, element: _Node,
+                 indices: range):
+        self._view = view
+        self._base = base
+        self._element = element
+        self._indices = indices
+
+    def __len__(self):
+        return len(self._indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return LazyArray(self._view, self._base, self._element,
+                             self._indices[index])
+        idx = self._indices[index]
+        element = self._element
+        return _read_value(self._view, self._base, idx * element.size,
+                           element)
+
+    def __iter__(self):
+        view = self._view
+        base = self._base
+        element = self._element
+        size = element.size
+        for idx in self._indices:
+            yield _read_value(view, base, idx * size, element)
+
+    def __repr__(self):
+        return f'<LazyArray of {len(self)} elements>'
+
+
+def _materialize(value):
+    if isinstance(value, LazyModel):
+        return value.to_model()
+    if isinstance(value, LazyArray):
+        return [_materialize(item) for item in value]
+    return value
@@ -0,0 +1,276 @@
+"""
+Specialized ABI codecs for models with a static layout
+
+For a model whose fields are all fixed-size ABI values (uintN, intN,
+address, bool and bytesN, possibly inside nested models), every field
+lives at a known offset of the encoding. This module generates, once per
+model, Python source for an encoder and a decoder that read or write each
+slot directly with slicing and `int.from_bytes`, instead of going through
+the eth_abi registry.
+
+The generated functions only handle values they can check cheaply. Any
+value out of range, with unexpected type or with non-empty padding is
+handed to the generic eth_abi path, so results and errors are the same as
+eth_abi's.
+"""
+from collections.abc import Callable
+from functools import partial
+import re
+from typing import Annotated, get_args, get_origin
+
+from .models import _construct
+
+_INT_TYPE = re.compile(r'(u?)int(\d*)')
+_BYTES_TYPE = re.compile(r'bytes(\d+)')
+
+_ZERO = bytes(32)
+_TRUE = bytes(31) + b'\x01'
+_FALSE = _ZERO
+
+# Python type each ABI type decodes to, for checking that the model fields
+# would accept the decoded values without conversion
+_PYTHON_TYPES = {'int': int, 'address': str, 'bool': bool, 'bytes': bytes}
+
+
+def compile_static_codec(
+    schema,
+    fallback_encode: Callable,
+    fallback_decode: Callable,
+) -> tuple[Callable, Callable] | None:
+    """Return an `(encode, decode)` pair specialized for a model schema.
+
+    Returns None if the layout of the model is not static.
+
+    Parameters
+    ----------
+    schema : ModelSchema
+        Schema of the model, as returned by `abi.get_model_schema`
+    fallback_encode : Callable
+        Generic encoder, called with the object when a value cannot be
+        handled by the generated code
+    fallback_decode : Callable
+        Generic decoder, called with the data when it cannot be handled by
+        the generated code
+    """
+    gen = _Generator()
+    try:
+        value = gen.add_model(schema, 'obj')
+    except _NotStatic:
+        return None
+
+    size = gen.offset
+    encode_src = [
+        'def encode(obj):',
+        '    try:',
+        *(f'        {line}' for line in gen.fetch),
+        '    except AttributeError:',
+        '        return fallback(obj)',
+        *(f'    {line}' for line in gen.encode),
+        f'    return b"".join(({", ".join(gen.parts)},))',
+    ]
+    decode_src = [
+        'def decode(data):',
+        f'    if type(data) is not bytes or len(data) < {size}:',
+        '        return fallback(data)',
+        *(f'    {line}' for line in gen.decode),
+        f'    return {value}',
+    ]
+
+    encode = _exec(encode_src, 'encode', gen.namespace, fallback_encode)
+    decode = _exec(decode_src, 'decode', gen.namespace, fallback_decode)
+    encode.__qualname__ = f'encode[{schema.model.__name__}]'
+    decode.__qualname__ = f'decode[{schema.model.__name__}]'
+    return encode, decode
+
+
+class _NotStatic(Exception):
+    """The model has a type that is not handled by the generator"""
+
+
+class _Generator:
+    """Accumulates the lines of the generated encoder and decoder"""
+
+    def __init__(self):
+        self.offset = 0
+        self.count = 0
+        self.namespace = {
+            '_ZERO': _ZERO,
+            '_TRUE': _TRUE,
+            '_FALSE': _FALSE,
+            '_encode_address': _encode_address,
+        }
+        self.fetch = []
+        self.encode = []
+        self.decode = []
+        self.parts = []
+
+    def add_model(self, schema, path: str) -> str:
+        """Generate the code for the fields of a model and return the
+        expression that builds the model in the decoder"""
+        items = []
+        constructible = _is_constructible(schema.model)
+        for field, abi_type, nested in zip(schema.fields, schema.types,
+                                           schema.nested):
+            field_path = f'{path}.{field}'
+            if nested is not None:
+                kind, nested_schema = nested
+                if kind != 'model':
+                    raise _NotStatic()
+                value = self.add_model(nested_schema, field_path)
+                if constructible and not _is_model_field(schema.model, field,
+                                                         nested_schema.model):
+                    constructible = False
+            else:
+                kind = self.add_value(abi_type, field_path)
+                if constructible and not _is_plain_field(
+                    schema.model, field, _PYTHON_TYPES[kind]
+                ):
+                    constructible = False
+                value = f'v{self.count - 1}'
+            items.append(f'{field!r}: {value}')
+
+        name = f'_new{len(self.namespace)}'
+        if constructible:
+            self.namespace[name] = partial(_construct, schema.model)
+        else:
+            self.namespace[name] = schema.model.parse_obj
+        return f'{name}({{{", ".join(items)}}})'
+
+    def add_value(self, abi_type: str, path: str) -> str:
+        """Generate the code for a single 32-byte slot, returning its kind"""
+        var = f'v{self.count}'
+        start = self.offset
+        end = start + 32
+        self.count += 1
+        self.offset = end
+        self.fetch.append(f'{var} = {path}')
+
+        match = _INT_TYPE.fullmatch(abi_type)
+        if match is not None:
+            unsigned, bits = match.groups()
+            bits = int(bits or 256)
+            if unsigned:
+                low, high, signed = 0, 2**bits - 1, False
+            else:
+                low, high, signed = -2**(bits - 1), 2**(bits - 1) - 1, True
+            self.encode += [
+                f'if type({var}) is not int or not {low} <= {var} <= {high}:',
+                '    return fallback(obj)',
+            ]
+            self.parts.append(f'{var}.to_bytes(32, "big", signed={signed})')
+            self.decode += [
+                f'{var} = int.from_bytes(data[{start}:{end}], "big", '
+                f'signed={signed})',
+                f'if not {low} <= {var} <= {high}:',
+                '    return fallback(data)',
+            ]
+            return 'int'
+
+        if abi_type == 'bool':
+            self.encode += [
+                f'if type({var}) is not bool:',
+                '    return fallback(obj)',
+            ]
+            self.parts.append(f'(_TRUE if {var} else _FALSE)')
+            self.decode += [
+                f'{var} = data[{start}:{end}]',
+                f'if {var} == _TRUE:',
+                f'    {var} = True',
+                f'elif {var} == _FALSE:',
+                f'    {var} = False',
+                'else:',
+                '    return fallback(data)',
+            ]
+            return 'bool'
+
+        if abi_type == 'address':
+            self.encode += [
+                f'{var} = _encode_address({var})',
+                f'if {var} is None:',
+                '    return fallback(obj)',
+            ]
+            self.parts.append(var)
+            self.decode += [
+                f'if data[{start}:{start + 12}] != _ZERO[:12]:',
+                '    return fallback(data)',
+                f'{var} = "0x" + data[{start + 12}:{end}].hex()',
+            ]
+            return 'address'
+
+        match = _BYTES_TYPE.fullmatch(abi_type)
+        if match is not None:
+            size = int(match.group(1))
+            if not 1 <= size <= 32:
+                raise _NotStatic()
+            self.encode += [
+                f'if type({var}) is not bytes or len({var}) > {size}:',
+                '    return fallback(obj)',
+            ]
+            self.parts.append(f'{var}.ljust(32, b"\\x00")')
+            self.decode += [
+                f'if data[{start + size}:{end}] != _ZERO[{size}:]:',
+                '    return fallback(data)',
+                f'{var} = data[{start}:{start + size}]',
+            ]
+            return 'bytes'
+
+        raise _NotStatic()
+
+
+def _exec(lines: list[str], name: str, namespace: dict, fallback: Callable):
+    namespace = dict(namespace, fallback=fallback)
+    exec('\n'.join(lines), namespace)
+    return namespace[name]
+
+
+def _encode_address(value) -> bytes | None:
+    """Encode a lowercase or uppercase hex address, or return None.
+
+    Mixed case addresses need their checksum verified, which is left to
+    eth_abi.
+    """
+    if type(value) is not str or len(value) != 42 or value[:2] != '0x':
+        return None
+    digits = value[2:]
+    if digits != digits.lower() and digits != digits.upper():
+        return None
+    try:
+        address = bytes.fromhex(digits)
+    except ValueError:
+        return None
+    if len(address) != 20:
+        return None
+    return _ZERO[:12] + address
+
+
+def _has_validators(model) -> bool:
+    return bool(
+        model.__validators__
+        or model.__pre_root_validators__
+        or model.__post_root_validators__
+    )
+
+
+def _is_constructible(model) -> bool:
+    """Whether decoded values can be stored in the model without running
+    pydantic's validation"""
+    return not _has_validators(model)
+
+
+def _is_plain_field(model, field: str, python_type: type) -> bool:
+    model_field = model.__fields__[field]
+    return (
+        _strip_annotated(model_field.outer_type_) is python_type
+        and not model_field.field_info.get_constraints()
+    )
+
+
+def _is_model_field(model, field: str, nested_model: type) -> bool:
+    return _strip_annotated(model.__fields__[field].outer_type_) is \
+        nested_model
+
+
+def _strip_annotated(field_type):
+    if get_origin(field_type) is Annotated:
+        return get_args(field_type)[0]
+    return field_type
@@ -0,0 +1,267 @@
+"""
+Streaming encoder for the standard ABI encoding
+
+The model is encoded in two passes. The first one computes the size of
+every dynamic value, which gives the offsets stored in the heads, and the
+second one writes the encoding piece by piece into the sink, in order,
+without building intermediate lists or byte strings.
+"""
+from abc import ABC, abstractmethod
+import re
+
+from eth_abi.exceptions import EncodingTypeError, ValueOutOfBounds
+
+from . import _packed
+
+WORD_SIZE = 32
+
+_ARRAY = re.compile(r'(?P<element>.+)\[(?P<length>\d*)\]')
+_ZERO = bytes(WORD_SIZE)
+
+
+class _Node(ABC):
+    """Layout of an ABI type for encoding
+
+    Attributes
+    ----------
+    dynamic : bool
+        Whether the value is stored in the tail, pointed by an offset
+    size : int
+        Size of the value in the head
+    memo : bool
+        Whether the size of a dynamic value is worth keeping, instead of
+        being computed again when writing
+    """
+    dynamic = False
+    size = WORD_SIZE
+    memo = True
+
+    @abstractmethod
+    def tail_size(self, value, sizes: dict) -> int:
+        """Size of the encoding of a dynamic value"""
+
+    @abstractmethod
+    def write(self, value, emit, sizes: dict):
+        """Write the encoding of the value with `emit`"""
+
+
+class _Word(_Node):
+    def __init__(self, encode):
+        self.encode = encode
+
+    def tail_size(self, value, sizes: dict) -> int:
+        # Static values have no tail
+        return 0
+
+    def write(self, value, emit, sizes: dict):
+        emit(self.encode(value))
+
+
+class _Bytes(_Node):
+    dynamic = True
+
+    def __init__(self, type_str: str):
+        self.is_string = type_str == 'string'
+        self.type_str = type_str
+        # Only strings have to be encoded to know their size
+        self.memo = self.is_string
+
+    def _data(self, value, sizes: dict):
+        if self.is_string:
+            if not isinstance(value, str):
+                raise EncodingTypeError(
+                    f'Value {value!r} cannot be encoded as string'
+                )
+            # Keep the encoded string for writing it later
+            data = sizes.get((id(self), id(value)), (None, None))[1]
+            if data is None:
+                data = value.encode('utf-8')
+            return data
+        if not isinstance(value, (bytes, bytearray, memoryview)):
+            raise EncodingTypeError(
+                f'Value {value!r} cannot be encoded as {self.type_str}'
+            )
+        return value
+
+    def tail_size(self, value, sizes: dict) -> int:
+        data = self._data(value, sizes)
+        size = WORD_SIZE + _ceil32(len(data))
+        if self.memo:
+            sizes[id(self), id(value)] = (size, data)
+        return size
+
+    def write(self, value, emit, sizes: dict):
+        data = self._data(value, sizes)
+        length = len(data)
+        emit(length.to_bytes(WORD_SIZE, 'big'))
+        emit(data)
+        padding = -length % WORD_SIZE
+        if padding:
+            emit(_ZERO[:padding])
+
+
+class _Sequence(_Node):
+    """Base for arrays and tuples, which share the head and tail layout"""
+
+    @abstractmethod
+    def _items(self, value) -> list:
+        """Return the items of the value, in encoding order"""
+
+    def _items_size(self, items: list, nodes, sizes: dict) -> int:
+        total = 0
+        for node, item in zip(nodes, items):
+            total += node.size
+            if node.dynamic:
+                total += _tail_size(node, item, sizes)
+        return total
+
+    def _write_items(self, items: list, nodes, emit, sizes: dict):
+        offset = sum(node.size for node in nodes)
+        for node, item in zip(nodes, items):
+            if node.dynamic:
+                emit(offset.to_bytes(WORD_SIZE, 'big'))
+                offset += _tail_size(node, item, sizes)
+            else:
+                node.write(item, emit, sizes)
+        for node, item in zip(nodes, items):
+            if node.dynamic:
+                node.write(item, emit, sizes)
+
+
+class _Array(_Sequence):
+    def __init__(self, type_str: str, element: _Node, length: int | None):
+        self.type_str = type_str
+        self.element = element
+        self.length = length
+        self.dynamic = length is None or element.dynamic
+        self.memo = element.dynamic
+        if not self.dynamic:
+            self.size = length * element.size
+
+    def _items(self, value) -> list:
+        if not isinstance(value, (list, tuple)):
+            raise EncodingTypeError(
+                f'Value {value!r} cannot be encoded as {self.type_str}'
+            )
+        if self.length is not None and len(value) != self.length:
+            raise ValueOutOfBounds(
+                f'Expected {self.length} elements for {self.type_str}, got '
+                f'{len(value)}'
+            )
+        return value
+
+    def tail_size(self, value, sizes: dict) -> int:
+        items = self._items(value)
+        size = self._items_size(items, [self.element] * len(items), sizes)
+        if self.length is None:
+            size += WORD_SIZE
+        return size
+
+    def write(self, value, emit, sizes: dict):
+        items = self._items(value)
+        if self.length is None:
+            emit(len(items).to_bytes(WORD_SIZE, 'big'))
+        element = self.element
+        if not element.dynamic:
+            for item in items:
+                element.write(item, emit, sizes)
+        else:
+            self._write_items(items, [element] * len(items), emit, sizes)
+
+
+class _Tuple(_Sequence):
+    def __init__(self, fields: list[tuple[str, _Node]]):
+        self.names = [name for name, _ in fields]
+        self.nodes = [node for _, node in fields]
+        self.dynamic = any(node.dynamic for node in self.nodes)
+        if not self.dynamic:
+            self.size = sum(node.size for node in self.nodes)
+
+    def _items(self, value) -> list:
+        return [getattr(value, name) for name in self.names]
+
+    def tail_size(self, value, sizes: dict) -> int:
+        return self._items_size(self._items(value), self.nodes, sizes)
+
+    def write(self, value, emit, sizes: dict):
+        self._write_items(self._items(value), self.nodes, emit, sizes)
+
+
+def _tail_size(node: _Node, value, sizes: dict) -> int:
+    """Size of a dynamic value, computed once per value and encoding.
+
+    The sizes are keyed by the identity of the node and of the value, which
+    stays valid while the model being encoded is alive.
+    """
+    if not node.memo:
+        return node.tail_size(value, sizes)
+    key = (id(node), id(value))
+    known = sizes.get(key)
+    if known is not None:
+        return known[0]
+    size = node.tail_size(value, sizes)
+    if key not in sizes:
+        sizes[key] = (size, None)
+    return size
+
+
+def _ceil32(size: int) -> int:
+    return -(-size // WORD_SIZE) * WORD_SIZE
+
+
+def compile_layout(schema) -> _Tuple:
+    """Return the encoding layout of a model schema.
+
+    Raises ValueError if a type is not supported.
+    """
+    fields = []
+    for field, abi_type, nested in zip(schema.fields, schema.types,
+                                       schema.nested):
+        if nested is None:
+            node = _compile_type(abi_type)
+        elif nested[0] == 'list':
+            node = _Array(abi_type, compile_layout(nested[1]), None)
+        else:
+            node = compile_layout(nested[1])
+        fields.append((field, node))
+    return _Tuple(fields)
+
+
+def _compile_type(abi_type: str) -> _Node:
+    match = _ARRAY.fullmatch(abi_type)
+    if match is not None:
+        element = _compile_type(match.group('element'))
+        length = match.group('length')
+        return _Array(abi_type, element, int(length) if length else None)
+    if abi_type in ('bytes', 'string'):
+        return _Bytes(abi_type)
+    return _Word(_packed.word_encoder(abi_type))
+
+
+def encoded_size(layout: _Tuple, obj, sizes: dict) -> int:
+    """Size of the encoding of a model, filling `sizes` for `write_model`"""
+    if layout.dynamic:
+        return _tail_size(layout, obj, sizes)
+    return layout.size
+
+
+def write_model(layout: _Tuple, obj, sink, sizes: dict | None = None) -> int:
+    """Encode a model into a bytearray, by appending, or into a file-like
+    object, by calling `write`. Returns the number of bytes written."""
+    if sizes is None:
+        sizes = {}
+    size = encoded_size(layout, obj, sizes)
+
+    if isinstance(sink, bytearray):
+        # Appending grows the buffer in place, without zero filling it first
+        start = len(sink)
+        try:
+            layout.write(obj, sink.extend, sizes)
+        except Exception:
+            del sink[start:]
+            raise
+        if len(sink) != start + size:
+            raise RuntimeError('Encoded size does not match the layout')
+    else:
+        layout.write(obj, sink.write, sizes)
+    return size
@@ -0,0 +1,139 @@
+"""
+Incremental scanner for the top-level items of a JSON object
+
+The scanner walks the top level of the document only as far as needed to
+find the keys it is asked for, and records where the value of each key
+starts and ends, without decoding the values. A large document is then
+not parsed just to read a few of its keys, such as the `op` used for
+routing.
+
+As with `json.loads`, the last value of a repeated key wins. The scanner
+stops as soon as none of the keys appears in the rest of the text, so a
+key that is missing from the object is usually known to be missing without
+scanning the object to its end.
+
+Only the scanned part of the top level is validated. Malformed JSON in
+the rest of the document is detected when the whole document is decoded.
+"""
+import json
+from json.decoder import scanstring
+import re
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_PLAIN_KEY = re.compile(r'[^"\\/\x00-\x1f]*')
+_SCALAR = re.compile(
+    r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?|true|false|null'
+)
+
+
+class ObjectScanner:
+    """Scanner over the text of a JSON object.
+
+    Raises ValueError if the text does not start a JSON object, and from
+    `find` if the scanned part of the object is malformed.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.spans: dict[str, tuple[int, int]] = {}
+        self._searches: dict[str, tuple[int, int]] = {}
+        pos = _skip_whitespace(text, 0)
+        if text[pos:pos + 1] != '{':
+            raise ValueError('Expecting a JSON object')
+        self.pos = _skip_whitespace(text, pos + 1)
+        self.done = False
+        if text[self.pos:self.pos + 1] == '}':
+            self._finish(self.pos + 1)
+
+    def find(self, keys) -> dict[str, tuple[int, int]]:
+        """Return the spans of the values of the keys, scanning as far as
+        needed. Missing keys are left out."""
+        keys = [key for key in keys if isinstance(key, str)]
+        while not self.done and not self._found(keys):
+            self._scan_item()
+        return {key: self.spans[key] for key in keys if key in self.spans}
+
+    def value(self, key: str):
+        """Decode the value of a key found by `find`"""
+        start, end = self.spans[key]
+        return _DECODER.raw_decode(self.text, start)[0]
+
+    def _found(self, keys: list[str]) -> bool:
+        """Whether the final value of every key is known, which is when
+        the keys cannot appear in the rest of the text"""
+        rest = self.pos
+        escapes = self._occurs('\\', rest)
+        for key in keys:
+            # A later key could be written with escapes, which only \u can
+            # do for keys without characters that have short escapes
+            if escapes and (not _PLAIN_KEY.fullmatch(key)
+                            or self._occurs('\\u', rest)):
+                return False
+            if self._occurs(json.dumps(key, ensure_ascii=False), rest):
+                return False
+        return True
+
+    def _occurs(self, needle: str, pos: int) -> bool:
+        """Whether `needle` occurs in the text from `pos` on.
+
+        Searches are remembered, since the scanner only moves forward.
+        """
+        known = self._searches.get(needle)
+        if known is not None:
+            start, index = known
+            if index == -1 and pos >= start:
+                return False
+            if index >= pos:
+                return True
+        index = self.text.find(needle, pos)
+        self._searches[needle] = (pos, index)
+        return index != -1
+
+    def _scan_item(self):
+        text = self.text
+        pos = self.pos
+        if text[pos:pos + 1] != '"':
+            raise ValueError(f'Expecting a key at position {pos}')
+        key, pos = scanstring(text, pos + 1)
+
+        pos = _skip_whitespace(text, pos)
+        if text[pos:pos + 1] != ':':
+            raise ValueError(f"Expecting ':' at position {pos}")
+        start = _skip_whitespace(text, pos + 1)
+        end = _skip_value(text, start)
+        self.spans[key] = (start, end)
+
+        pos = _skip_whitespace(text, end)
+        char = text[pos:pos + 1]
+        if char == ',':
+            self.pos = _skip_whitespace(text, pos + 1)
+        elif char == '}':
+            self._finish(pos + 1)
+        else:
+            raise ValueError(f"Expecting ',' or '}}' at position {pos}")
+
+    def _finish(self, pos: int):
+        if _skip_whitespace(self.text, pos) != len(self.text):
+            raise ValueError(f'Extra data at position {pos}')
+        self.pos = pos
+        self.done = True
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    return _WHITESPACE.match(text, pos).end()
+
+
+def _skip_value(text: str, pos: int) -> int:
+    """Return the end of the value starting at `pos`"""
+    char = text[pos:pos + 1]
+    if char == '"':
+        return scanstring(text, pos + 1)[1]
+    if char == '{' or char == '[':
+        # Nested values are decoded by the C decoder, which is faster than
+        # skipping them in Python
+        return _DECODER.raw_decode(text, pos)[1]
+    match = _SCALAR.match(text, pos)
+    if match is None:
+        raise ValueError(f'Expecting a value at position {pos}')
+    return match.end()
@@ -0,0 +1,434 @@
+"""
+Codec for the non-standard packed ABI encoding
+
+In the packed encoding, as produced by Solidity's `abi.encodePacked`, the
+values are concatenated without padding nor offsets:
+
+- `intN` and `uintN` take N / 8 bytes, `bool` takes 1 byte, `address` 20
+  bytes and `bytesN` N bytes;
+- `bytes` and `string` are copied as they are, without their length;
+- array elements are padded to 32 bytes, as in the standard encoding;
+- tuples are the concatenation of their packed components.
+
+Since dynamic values carry no length, `bytes`, `string` and dynamic arrays
+can only be decoded as the last value, taking the rest of the data. This
+is how the portals append the extra data to their inputs.
+
+The layout of a type list is compiled once into the offsets of each value
+and the functions for reading and writing them, and cached.
+"""
+from collections.abc import Callable, Sequence
+from functools import lru_cache
+import re
+from typing import Any, NamedTuple
+
+from Crypto.Hash import keccak
+from eth_abi.exceptions import (
+    DecodingError,
+    EncodingTypeError,
+    InsufficientDataBytes,
+    NonEmptyPaddingBytes,
+    ValueOutOfBounds,
+)
+
+_TYPE = re.compile(
+    r'(?P<base>uint|int|bool|address|bytes|string)(?P<sub>\d*)'
+    r'(?P<array>\[\d*\])?'
+)
+_HEX_DIGITS = re.compile(r'[0-9a-fA-F]{40}')
+
+WORD_SIZE = 32
+
+
+class _Codec(NamedTuple):
+    """How to read and write the bytes of a value
+
+    A size of None means the value takes the rest of the data.
+    """
+    size: int | None
+    decode: Callable[[memoryview], Any]
+    encode: Callable[[Any], bytes]
+
+
+def decode_packed(types: Sequence[str], data: bytes) -> tuple:
+    """Decode packed data into a tuple of values of the given types"""
+    return compile_decoder(tuple(types))(data)
+
+
+def encode_packed(types: Sequence[str], values: Sequence) -> bytes:
+    """Encode the values of the given types with the packed encoding"""
+    return compile_encoder(tuple(types))(values)
+
+
+@lru_cache(maxsize=None)
+def compile_decoder(types: tuple[str, ...]) -> Callable[[bytes], tuple]:
+    """Return a function that decodes packed data of the given types.
+
+    Raises ValueError if a type is not supported or if a dynamic type is not
+    the last one.
+    """
+    layout = _compile_layout(types)
+    min_size = sum(codec.size or 0 for codec in layout)
+    steps = []
+    offset = 0
+    for codec in layout:
+        end = offset + codec.size if codec.size is not None else None
+        steps.append((offset, end, codec.decode))
+        if end is not None:
+            offset = end
+
+    def decode(data: bytes) -> tuple:
+        view = memoryview(data)
+        if len(view) < min_size:
+            raise InsufficientDataBytes(
+                f'Tried to read {min_size} bytes, only got {len(view)} bytes.'
+            )
+        return tuple(read(view[start:end]) for start, end, read in steps)
+
+    return decode
+
+
+@lru_cache(maxsize=None)
+def compile_encoder(types: tuple[str, ...]) -> Callable[[Sequence], bytes]:
+    """Return a function that encodes values of the given types.
+
+    Raises ValueError if a type is not supported.
+    """
+    encoders = [codec.encode for codec in _compile_layout(types,
+                                                          encoding=True)]
+    count = len(encoders)
+
+    def encode(values: Sequence) -> bytes:
+        if len(values) != count:
+            raise ValueError(
+                f'Expected {count} values, got {len(values)}.'
+            )
+        return b''.join(
+            [write(value) for write, value in zip(encoders, values)]
+        )
+
+    return encode
+
+
+def word_decoder(type_str: str) -> Callable[[memoryview], Any]:
+    """Return a function that decodes a 32-byte word of the standard
+    encoding holding a value of a static elementary type.
+
+    Raises ValueError if the type is not a static elementary type.
+    """
+    return _word_codec(type_str).decode
+
+
+def word_encoder(type_str: str) -> Callable[[Any], bytes]:
+    """Return a function that encodes a value of a static elementary type
+    into a 32-byte word of the standard encoding.
+
+    Raises ValueError if the type is not a static elementary type.
+    """
+    return _word_codec(type_str).encode
+
+
+def _word_codec(type_str: str) -> _Codec:
+    match = _TYPE.fullmatch(type_str.replace(' ', ''))
+    if match is None or match.group('array') is not None:
+        raise ValueError(f'Type {type_str} is not a static elementary type.')
+    base, sub = match.group('base', 'sub')
+    codec = _scalar_codec(base + sub, base, sub, packed=False)
+    if codec.size is None:
+        raise ValueError(f'Type {type_str} is not a static elementary type.')
+    return codec
+
+
+def _compile_layout(types: tuple[str, ...], encoding: bool = False):
+    layout = [_compile_type(type_str) for type_str in types]
+    if not encoding:
+        for type_str, codec in zip(types[:-1], layout):
+            if codec.size is None:
+                raise ValueError(
+                    f'Type {type_str} can only be decoded as the last value '
+                    'of the packed encoding.'
+                )
+    return layout
+
+
+def _compile_type(type_str: str) -> _Codec:
+    type_str = type_str.replace(' ', '')
+    if type_str.startswith('('):
+        return _tuple_codec(type_str)
+
+    match = _TYPE.fullmatch(type_str)
+    if match is None:
+        raise ValueError(f'Type {type_str} is not supported in the packed '
+                         'encoding.')
+    base, sub, array = match.group('base', 'sub', 'array')
+    scalar = base + sub
+
+    if array is None:
+        return _scalar_codec(scalar, base, sub, packed=True)
+
+    element = _scalar_codec(scalar, base, sub, packed=False)
+    if element.size is None:
+        raise ValueError(f'Type {type_str} is not supported in the packed '
+                         'encoding.')
+    length = int(array[1:-1]) if array != '[]' else None
+    return _array_codec(type_str, element, length)
+
+
+def _scalar_codec(type_str: str, base: str, sub: str, packed: bool):
+    """Codec for a single value, either packed or padded to 32 bytes"""
+    if base in ('uint', 'int'):
+        bits = int(sub) if sub else 256
+        if bits % 8 or not 8 <= bits <= 256:
+            raise ValueError(f'Invalid type {type_str}')
+        size = bits // 8 if packed else WORD_SIZE
+        return _int_codec(type_str, bits, base == 'int', size)
+
+    if base == 'bytes' and sub:
+        length = int(sub)
+        if not 1 <= length <= 32:
+            raise ValueError(f'Invalid type {type_str}')
+        size = length if packed else WORD_SIZE
+        return _fixed_bytes_codec(type_str, length, size)
+
+    if sub:
+        raise ValueError(f'Invalid type {type_str}')
+    if base == 'bool':
+        return _bool_codec(type_str, 1 if packed else WORD_SIZE)
+    if base == 'address':
+        return _address_codec(type_str, 20 if packed else WORD_SIZE)
+    if base == 'bytes':
+        return _Codec(None, bytes, _bytes_encoder(type_str))
+    return _Codec(None, _decode_string, _string_encoder(type_str))
+
+
+def _int_codec(type_str: str, bits: int, signed: bool, size: int):
+    if signed:
+        low, high = -2**(bits - 1), 2**(bits - 1) - 1
+    else:
+        low, high = 0, 2**bits - 1
+    check_range = size * 8 > bits
+
+    def decode(view: memoryview) -> int:
+        value = int.from_bytes(view, 'big', signed=signed)
+        if check_range and not low <= value <= high:
+            raise NonEmptyPaddingBytes(
+                f'Padding bytes were not empty: {bytes(view)!r}'
+            )
+        return value
+
+    def encode(value) -> bytes:
+        if type(value) is not int:
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise EncodingTypeError(
+                    f'Value {value!r} cannot be encoded as {type_str}'
+                )
+        if not low <= value <= high:
+            raise ValueOutOfBounds(
+                f'Value {value!r} cannot be encoded in {bits} bits'
+            )
+        return value.to_bytes(size, 'big', signed=signed)
+
+    return _Codec(size, decode, encode)
+
+
+def _bool_codec(type_str: str, size: int):
+    true = (1).to_bytes(size, 'big')
+    false = bytes(size)
+
+    def decode(view: memoryview) -> bool:
+        if view == true:
+            return True
+        if view == false:
+            return False
+        raise NonEmptyPaddingBytes(
+            f'Boolean must be either 0x0 or 0x1.  Got: {bytes(view)!r}'
+        )
+
+    def encode(value) -> bytes:
+        if not isinstance(value, bool):
+            raise EncodingTypeError(
+                f'Value {value!r} cannot be encoded as {type_str}'
+            )
+        return true if value else false
+
+    return _Codec(size, decode, encode)
+
+
+def _address_codec(type_str: str, size: int):
+    padding = size - 20
+    zeros = bytes(padding)
+
+    def decode(view: memoryview) -> str:
+        if view[:padding] != zeros:
+            raise NonEmptyPaddingBytes(
+                f'Padding bytes were not empty: {bytes(view[:padding])!r}'
+            )
+        return '0x' + view[padding:].hex()
+
+    def encode(value) -> bytes:
+        return zeros + address_to_bytes(value)
+
+    return _Codec(size, decode, encode)
+
+
+def _fixed_bytes_codec(type_str: str, length: int, size: int):
+    zeros = bytes(size - length)
+
+    def decode(view: memoryview) -> bytes:
+        if view[length:] != zeros:
+            raise NonEmptyPaddingBytes(
+                f'Padding bytes were not empty: {bytes(view[length:])!r}'
+            )
+        return bytes(view[:length])
+
+    def encode(value) -> bytes:
+        if not isinstance(value, (bytes, bytearray)):
+            raise EncodingTypeError(
+                f'Value {value!r} cannot be encoded as {type_str}'
+            )
+        if len(value) > length:
+            raise ValueOutOfBounds(
+                f'Value {value!r} exceeds total byte size for {type_str} '
+                'encoding'
+            )
+        return bytes(value).ljust(size, b'\x00')
+
+    return _Codec(size, decode, encode)
+
+
+def _bytes_encoder(type_str: str):
+    def encode(value) -> bytes:
+        if not isinstance(value, (bytes, bytearray)):
+            raise EncodingTypeError(
+                f'Value {value!r} cannot be encoded as {type_str}'
+            )
+        return bytes(value)
+    return encode
+
+
+def _string_encoder(type_str: str):
+    def encode(value) -> bytes:
+        if not isinstance(value, str):
+            raise EncodingTypeError(
+                f'Value {value!r} cannot be encoded as {type_str}'
+            )
+        return value.encode('utf-8')
+    return encode
+
+
+def _decode_string(view: memoryview) -> str:
+    return str(view, 'utf-8')
+
+
+def _array_codec(type_str: str, element: _Codec, length: int | None):
+    read = element.decode
+    write = element.encode
+
+    def decode(view: memoryview) -> tuple:
+        if len(view) % WORD_SIZE:
+            raise DecodingError(
+                f'Data for {type_str} is not a multiple of {WORD_SIZE} bytes'
+            )
+        return tuple(
+            read(view[pos:pos + WORD_SIZE])
+            for pos in range(0, len(view), WORD_SIZE)
+        )
+
+    def encode(value) -> bytes:
+        if not isinstance(value, (list, tuple)):
+            raise EncodingTypeError(
+                f'Value {value!r} cannot be encoded as {type_str}'
+            )
+        if length is not None and len(value) != length:
+            raise ValueOutOfBounds(
+                f'Expected {length} elements for {type_str}, got '
+                f'{len(value)}'
+            )
+        return b''.join([write(item) for item in value])
+
+    size = length * WORD_SIZE if length is not None else None
+    return _Codec(size, decode, encode)
+
+
+def _tuple_codec(type_str: str) -> _Codec:
+    if not type_str.endswith(')'):
+        raise ValueError(f'Type {type_str} is not supported in the packed '
+                         'encoding.')
+    components = [
+        _compile_type(component)
+        for component in _split_components(type_str[1:-1])
+    ]
+    if any(codec.size is None for codec in components):
+        raise ValueError(f'Tuple {type_str} must have only static types in '
+                         'the packed encoding.')
+    size = sum(codec.size for codec in components)
+    steps = []
+    offset = 0
+    for codec in components:
+        steps.append((offset, offset + codec.size, codec.decode))
+        offset += codec.size
+    encoders = [codec.encode for codec in components]
+
+    def decode(view: memoryview) -> tuple:
+        return tuple(read(view[start:end]) for start, end, read in steps)
+
+    def encode(value) -> bytes:
+        if (
+            not isinstance(value, (list, tuple))
+            or len(value) != len(encoders)
+        ):
+            raise EncodingTypeError(
+                f'Value {value!r} cannot be encoded as {type_str}'
+            )
+        return b''.join(
+            [write(item) for write, item in zip(encoders, value)]
+        )
+
+    return _Codec(size, decode, encode)
+
+
+def _split_components(types: str) -> list[str]:
+    """Split a comma separated list of types, skipping nested tuples"""
+    components = []
+    depth = 0
+    start = 0
+    for pos, char in enumerate(types):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            components.append(types[start:pos])
+            start = pos + 1
+    components.append(types[start:])
+    return [component for component in components if component]
+
+
+def address_to_bytes(value) -> bytes:
+    """Return the 20 bytes of an address given as hex string or bytes.
+
+    Mixed case hex strings must have a valid EIP-55 checksum.
+    """
+    if isinstance(value, (bytes, bytearray)) and len(value) == 20:
+        return bytes(value)
+    if isinstance(value, str):
+        digits = value[2:] if value[:2] in ('0x', '0X') else value
+        if _HEX_DIGITS.fullmatch(digits) and (
+            digits == digits.lower() or digits == digits.upper()
+            or _has_valid_checksum(digits)
+        ):
+            return bytes.fromhex(digits)
+    raise EncodingTypeError(
+        f'Value {value!r} cannot be encoded as address'
+    )
+
+
+def _has_valid_checksum(digits: str) -> bool:
+    """Verify the EIP-55 checksum of the hex digits of an address"""
+    lower = digits.lower()
+    digest = keccak.new(digest_bits=256, data=lower.encode('ascii'))
+    expected = ''.join(
+        char.upper() if int(nibble, 16) >= 8 else char
+        for char, nibble in zip(lower, digest.hexdigest())
+    )
+    return expected == digits
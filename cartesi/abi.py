@@ -1,15 +1,19 @@
 """
 ABI Types and Helpers for Router and Codecs
 """
+from collections.abc import Callable, Iterable
+from functools import partial
 from inspect import isclass
 from typing import Annotated, get_type_hints, TypeVar, get_args, get_origin
+import dataclasses
 from dataclasses import dataclass
+import threading
 
 import eth_abi
-import eth_abi.packed
 import pydantic
 
-from . import _eth_abi_packed
+from . import _abi_batch, _abi_lazy, _abi_static, _abi_stream, _packed
+from ._abi_lazy import LazyArray, LazyModel  # noqa
 
 
 # Type Aliases for ABI encoding
@@ -89,8 +93,52 @@ def _get_abi_for_type(field, field_type) -> str:
     return abi_type.name
 
 
-def get_abi_types_from_model(model: pydantic.BaseModel) -> list[str]:
-    """Return a list of types representing the Pydantic Model
+@dataclass(frozen=True)
+class ModelSchema:
+    """ABI layout of a Pydantic model, derived from its type hints.
+
+    Attributes
+    ----------
+    model : type[pydantic.BaseModel]
+        The model class
+    fields : tuple[str, ...]
+        Field names, in encoding order
+    types : tuple[str, ...]
+        ABI type of each field, with nested models flattened into tuples
+    nested : tuple
+        For each field, None for a plain value, or a pair `(kind, schema)`
+        where kind is `'model'` for a nested model and `'list'` for a list
+        of nested models
+    dependencies : frozenset
+        Nested model classes, at any depth
+    encoder : Callable | None
+        Specialized encoder, for models with a static layout
+    decoder : Callable | None
+        Specialized decoder, for models with a static layout
+    layout : object | None
+        Layout of the standard encoding, for lazy decoding
+    stream : object | None
+        Layout of the standard encoding, for streaming encoding
+    """
+    model: type
+    fields: tuple[str, ...]
+    types: tuple[str, ...]
+    nested: tuple
+    dependencies: frozenset
+    encoder: Callable | None = dataclasses.field(default=None, compare=False)
+    decoder: Callable | None = dataclasses.field(default=None, compare=False)
+    layout: object | None = dataclasses.field(default=None, compare=False)
+    stream: object | None = dataclasses.field(default=None, compare=False)
+
+
+_SCHEMAS: dict[type, ModelSchema] = {}
+_SCHEMAS_LOCK = threading.Lock()
+
+
+def get_model_schema(model) -> ModelSchema:
+    """Return the ABI schema of a model class or instance.
+
+    Schemas are derived once per class and cached.
 
     Parameters
     ----------
@@ -99,12 +147,51 @@ def get_abi_types_from_model(model: pydantic.BaseModel) -> list[str]:
 
     Returns
     -------
-    list[str]
-        List of Solidity ABI types
+    ModelSchema
+        Cached schema of the model
+    """
+    if not isclass(model):
+        model = type(model)
+    schema = _SCHEMAS.get(model)
+    if schema is not None:
+        return schema
+
+    schema = _build_schema(model)
+    with _SCHEMAS_LOCK:
+        return _SCHEMAS.setdefault(model, schema)
+
+
+def clear_schema_cache(model: type | None = None):
+    """Remove cached schemas.
+
+    Parameters
+    ----------
+    model : type[pydantic.BaseModel], optional
+        Remove only the schema of this model and of the models that nest it.
+        By default, remove all schemas.
     """
-    fields = model.__fields__.keys()
+    with _SCHEMAS_LOCK:
+        if model is None:
+            _SCHEMAS.clear()
+            return
+        for key, schema in list(_SCHEMAS.items()):
+            if key is model or model in schema.dependencies:
+                del _SCHEMAS[key]
+
+
+def cached_schemas() -> dict[type, ModelSchema]:
+    """Return a snapshot of the schema cache, mapping models to schemas"""
+    with _SCHEMAS_LOCK:
+        return dict(_SCHEMAS)
+
+
+def _build_schema(model) -> ModelSchema:
+    """Derive the schema of a model from its type hints"""
+    fields = tuple(model.__fields__.keys())
     hints = get_type_hints(model, include_extras=True)
     types = []
+    nested = []
+    dependencies = set()
 
     for field in fields:
         field_type = hints[field]
@@ -121,21 +208,70 @@ def get_abi_types_from_model(model: pydantic.BaseModel) -> list[str]:
                 isclass(nested_type) and
                 issubclass(nested_type, pydantic.BaseModel)
             ):
-                nested_types = get_abi_types_from_model(nested_type)
-                types.append(f'({",".join(nested_types)})[]')
+                nested_schema = get_model_schema(nested_type)
+                types.append(f'({",".join(nested_schema.types)})[]')
+                nested.append(('list', nested_schema))
+                dependencies.add(nested_type)
+                dependencies.update(nested_schema.dependencies)
             else:
                 types.append(_get_abi_for_type(field, nested_type) + '[]')
+                nested.append(None)
 
             continue
 
         if isclass(field_type) and issubclass(field_type, pydantic.BaseModel):
-            nested_types = get_abi_types_from_model(field_type)
-            types.append(f'({",".join(nested_types)})')
+            nested_schema = get_model_schema(field_type)
+            types.append(f'({",".join(nested_schema.types)})')
+            nested.append(('model', nested_schema))
+            dependencies.add(field_type)
+            dependencies.update(nested_schema.dependencies)
             continue
 
         types.append(_get_abi_for_type(field, field_type))
+        nested.append(None)
+
+    schema = ModelSchema(
+        model=model,
+        fields=fields,
+        types=tuple(types),
+        nested=tuple(nested),
+        dependencies=frozenset(dependencies),
+    )
+
+    codec = _abi_static.compile_static_codec(
+        schema,
+        fallback_encode=partial(_encode_generic, schema),
+        fallback_decode=partial(_decode_generic, schema),
+    )
+    if codec is not None:
+        schema = dataclasses.replace(schema, encoder=codec[0],
+                                     decoder=codec[1])
+
+    try:
+        layout = _abi_lazy.compile_layout(schema)
+    except ValueError:
+        layout = None
+    try:
+        stream = _abi_stream.compile_layout(schema)
+    except ValueError:
+        stream = None
+    return dataclasses.replace(schema, layout=layout, stream=stream)
+
+
+def get_abi_types_from_model(model: pydantic.BaseModel) -> list[str]:
+    """Return a list of types representing the Pydantic Model
+
+    Parameters
+    ----------
+    model : pydantic.BaseModel
+        Pydantic model with ABIType annotations
 
-    return types
+    Returns
+    -------
+    list[str]
+        List of Solidity ABI types
+    """
+    return list(get_model_schema(model).types)
 
 
 def _get_resolved_values(value):
@@ -198,15 +334,83 @@ def encode_model(obj: pydantic.BaseModel, packed: bool = False) -> bytes:
     bytes
         Serialized version of the model
     """
+    schema = get_model_schema(obj)
     if packed:
-        encode = eth_abi.packed.encode_packed
-    else:
-        encode = eth_abi.encode
+        data = _get_values_from_model(obj)
+        return _packed.encode_packed(schema.types, data)
+
+    if schema.encoder is not None:
+        return schema.encoder(obj)
+    if schema.stream is not None:
+        data = bytearray()
+        _abi_stream.write_model(schema.stream, obj, data)
+        return bytes(data)
+    return _encode_generic(schema, obj)
+
+
+def _encode_generic(schema: ModelSchema, obj: pydantic.BaseModel) -> bytes:
+    """Encode a model with eth_abi"""
+    return eth_abi.encode(schema.types, _get_values_from_model(obj))
+
+
+def encode_model_into(obj: pydantic.BaseModel, sink,
+                      packed: bool = False) -> int:
+    """Serialize the model using ABI encoding, writing into `sink`.
+
+    With a `bytearray`, the pieces of the encoding are appended to it in
+    place, so the same buffer can be reused, or prefixed with a header,
+    without further copies. Any
+    other sink must be a file-like object with a `write` method, which is
+    called with the pieces of the encoding in order.
+
+    Models with dynamic types are encoded in two passes, computing the size
+    of every dynamic value before writing, instead of building the nested
+    lists and intermediate byte strings of `encode_model`. The result is
+    the same as `encode_model`.
+
+    Parameters
+    ----------
+    obj : pydantic.BaseModel
+        Object with data to be serialized. Fields must use types with ABIType
+        metadata.
+    sink : bytearray | file-like
+        Destination of the encoded data
+    packed : bool, optional
+        Use non-standard packed mode. By default False.
+
+    Returns
+    -------
+    int
+        Number of bytes written
+    """
+    schema = get_model_schema(obj)
+    if packed or schema.encoder is not None or schema.stream is None:
+        data = encode_model(obj, packed=packed)
+        if isinstance(sink, bytearray):
+            sink += data
+        else:
+            sink.write(data)
+        return len(data)
+    return _abi_stream.write_model(schema.stream, obj, sink)
+
 
-    data = _get_values_from_model(obj)
-    types = get_abi_types_from_model(obj)
+def encoded_size(obj: pydantic.BaseModel) -> int:
+    """Return the size of the standard ABI encoding of the model.
+
+    Parameters
+    ----------
+    obj : pydantic.BaseModel
+        Object with data to be serialized
 
-    return encode(types, data)
+    Returns
+    -------
+    int
+        Number of bytes `encode_model_into` would write
+    """
+    schema = get_model_schema(obj)
+    if schema.stream is None:
+        return len(encode_model(obj))
+    return _abi_stream.encoded_size(schema.stream, obj, {})
 
 
 M = TypeVar('M', bound=pydantic.BaseModel)
@@ -227,41 +431,22 @@ def _parse_to_model(model: M, data: list[any]) -> M:
     pydantic.BaseModel
         Parsed model
     """
-    fields = model.__fields__.keys()
-    hints = get_type_hints(model, include_extras=True)
-
-    # Substitute values with parsed models if needed
-    for idx, field in enumerate(fields):
-        field_type = hints[field]
-
-        base_type = get_origin(field_type)
-        if base_type is list:
-            type_args = get_args(field_type)
-            if len(type_args) != 1:
-                raise ValueError(f'Field {field} must declare the type of the '
-                                 'list element.')
-            nested_type = type_args[0]
+    return _parse_with_schema(get_model_schema(model), data)
 
-            if (
-                isclass(nested_type) and
-                issubclass(nested_type, pydantic.BaseModel)
-            ):
-                new_data = [
-                    _parse_to_model(nested_type, x) for x in data[idx]
-                ]
-                if isinstance(data, tuple):
-                    data = list(data)
-                data[idx] = new_data
 
-        elif (
-            isclass(field_type) and
-            issubclass(field_type, pydantic.BaseModel)
-        ):
-            if isinstance(data, tuple):
-                data = list(data)
-            data[idx] = _parse_to_model(field_type, data[idx])
+def _parse_with_schema(schema: ModelSchema, data) -> pydantic.BaseModel:
+    """Parse a list of values into the model of a schema"""
+    values = {}
+    for field, nested, value in zip(schema.fields, schema.nested, data):
+        if nested is not None:
+            kind, nested_schema = nested
+            if kind == 'list':
+                value = [_parse_with_schema(nested_schema, x) for x in value]
+            else:
+                value = _parse_with_schema(nested_schema, value)
+        values[field] = value
 
-    return model.parse_obj(dict(zip(fields, data)))
+    return schema.model.parse_obj(values)
 
 
 def decode_to_model(data: bytes, model: M, packed: bool = False) -> M:
@@ -281,12 +466,123 @@ def decode_to_model(data: bytes, model: M, packed: bool = False) -> M:
     pydantic.BaseModel
         Object containing decoded data
     """
+    schema = get_model_schema(model)
     if packed:
-        decode = _eth_abi_packed.decode_packed
-    else:
-        decode = eth_abi.decode
+        decoded = _packed.decode_packed(schema.types, data)
+        return _parse_with_schema(schema, decoded)
+
+    if schema.decoder is not None:
+        return schema.decoder(data)
+    return _decode_generic(schema, data)
+
+
+def _decode_generic(schema: ModelSchema, data: bytes) -> pydantic.BaseModel:
+    """Decode a model with eth_abi"""
+    return _parse_with_schema(schema, eth_abi.decode(schema.types, data))
+
+
+def decode_batch(
+    payloads: Iterable[bytes],
+    model: type[pydantic.BaseModel],
+    packed: bool = False,
+) -> dict:
+    """Decode many payloads of the same model into NumPy column arrays.
+
+    Each field of the model becomes one array, with one element per
+    payload, decoded for all the payloads at once from its fixed offset.
+    The fields of nested models are named with dots, as in `inner.value`.
+    The column types are:
+
+    - `intN`/`uintN` up to 64 bits: the narrowest fitting NumPy integer
+    - wider integers: object arrays of Python integers
+    - `bool`: NumPy bool
+    - `address` and `bytesN`: fixed width bytes `S20` and `S<N>`, holding
+      the raw bytes. Note that NumPy strips trailing zero bytes from the
+      elements of these arrays, use `tobytes()` to read them in full.
+    - a trailing `bytes` or `string` field, only in packed mode: object
+      arrays
+
+    The models must have a static layout, except for the trailing field in
+    packed mode. NumPy must be installed.
+
+    Parameters
+    ----------
+    payloads : Iterable[bytes]
+        Payloads to decode
+    model : pydantic.BaseModel
+        Pydantic model containing ABI compatible type hints
+    packed : bool
+        Whether the payloads use the packed ABI encoding
+
+    Returns
+    -------
+    dict[str, numpy.ndarray]
+        Column arrays, by field name
+    """
+    return _abi_batch.decode_batch(get_model_schema(model), payloads, packed)
+
+
+def compile_decoder(model: type[M], packed: bool = False
+                    ) -> Callable[[bytes], M]:
+    """Return a function that decodes ABI Encoded data into `model`.
+
+    The ABI types of the model are derived once, when compiling, so the
+    returned function only decodes the data and builds the model.
+
+    Parameters
+    ----------
+    model : pydantic.BaseModel
+        Pydantic model containing ABI compatible type hints
+    packed : bool
+        Whether the input is coded as a Packed ABI encoding
+
+    Returns
+    -------
+    Callable[[bytes], pydantic.BaseModel]
+        Decoder function
+    """
+    schema = get_model_schema(model)
+    if not packed:
+        if schema.decoder is not None:
+            return schema.decoder
+        return partial(_decode_generic, schema)
+
+    decode = _packed.compile_decoder(schema.types)
+
+    def decoder(data: bytes) -> M:
+        return _parse_with_schema(schema, decode(data))
+
+    decoder.__qualname__ = f'decoder[{model.__name__}]'
+    return decoder
+
+
+def decode_lazy(data: bytes, model: type[M]) -> LazyModel:
+    """Return a lazy view of ABI Encoded data as `model`.
+
+    Unlike `decode_to_model`, nothing is decoded up front. Each field is
+    decoded from `data` when accessed, and arrays are returned as
+    `LazyArray` sequences that decode their elements on access. This keeps
+    the cost proportional to what the handler reads, for instance a few
+    elements of a large array.
+
+    The values are checked against their ABI types, but the model
+    validators are only run by `LazyModel.to_model()`. Only the standard
+    encoding is supported.
 
-    types = get_abi_types_from_model(model)
-    decoded = decode(types, data)
+    Parameters
+    ----------
+    data : bytes
+        Data to decode. It must not be modified while the view is in use.
+    model : pydantic.BaseModel
+        Pydantic model containing ABI compatible type hints
 
-    return _parse_to_model(model, decoded)
+    Returns
+    -------
+    LazyModel
+        View of the data with the fields of the model as attributes
+    """
+    schema = get_model_schema(model)
+    if schema.layout is None:
+        raise ValueError(f'Model {model.__name__} has types that cannot be '
+                         'decoded lazily.')
+    return schema.layout.read(memoryview(data), 0)
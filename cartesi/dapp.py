@@ -1,9 +1,13 @@
+import asyncio
+import inspect
 import os
 import logging
 
 from .models import RollupResponse
-from .rollup import Rollup, HTTPRollupServer
+from .rollup import Rollup, AsyncRollup, HTTPRollupServer
 from .router import Router
+from .router.index import DispatchIndex
+from .state import Journaled
 
 LOGGER = logging.getLogger(__name__)
 ROLLUP_SERVER = os.environ.get('ROLLUP_HTTP_SERVER_URL')
@@ -16,6 +20,9 @@ class DApp:
         self.default_advance_handler = lambda rollup, data: False
         self.default_inspect_handler = lambda rollup, data: False
         self.rollup: Rollup | None = None
+        self.states: list[Journaled] = []
+        self._index: DispatchIndex | None = None
+        self._journaled: list[Journaled] | None = None
 
     def advance(self):
         """Decorator for inserting handle advance"""
@@ -46,33 +53,145 @@ class DApp:
             handler = self.default_inspect_handler
         return handler
 
-    def _handle(self, request: RollupResponse) -> bool:
+    def _get_handler(self, request: RollupResponse):
+        """Get the handler for the request among the routers, or the default
+        one if none matches"""
 
         # Look for a handler among the routers:
         handler = None
-        for router in self.routers:
-            handler = router.get_handler(request)
-            if handler is not None:
-                break
+        if self._index is not None:
+            handler = self._index.get_handler(request)
+        else:
+            for router in self.routers:
+                handler = router.get_handler(request)
+                if handler is not None:
+                    break
 
         # Get the default handler if needed
         if handler is None:
             handler = self._get_default_handler(request)
 
-        logging.debug("Handler: %s", repr(handler))
+        logging.debug("Handler: %r", handler)
+        return handler
+
+    def _journaled_states(self) -> list[Journaled]:
+        """Get the states of the DApp and of its routers, each once"""
+        if self._journaled is not None:
+            return self._journaled
+        states = {}
+        for state in self.states:
+            states[id(state)] = state
+        for router in self.routers:
+            for state in router.journaled_states():
+                states[id(state)] = state
+        return list(states.values())
+
+    def _begin(self) -> list[Journaled]:
+        states = self._journaled_states()
+        for state in states:
+            state.begin()
+        return states
+
+    def _end(self, states: list[Journaled], request: RollupResponse,
+             status: bool):
+        """Keep the changes of an accepted advance, and undo those of a
+        rejected one or of an inspect"""
+        if status and request.request_type == 'advance_state':
+            for state in states:
+                state.commit()
+        else:
+            for state in states:
+                state.rollback()
+
+    def _handle(self, request: RollupResponse) -> bool:
+        handler = self._get_handler(request)
+        states = self._begin()
+        try:
+            status = handler(self.rollup, request.data)
+            if inspect.isawaitable(status):
+                status = asyncio.run(_await(status))
+        except Exception:
+            LOGGER.error("Exception while handling request", exc_info=True)
+            status = False
+
+        try:
+            if status and self.rollup is not None:
+                # The input is still rejected if any of its outputs failed,
+                # or if flushing them raises
+                accepted, status = status, False
+                status = self.rollup.flush() and accepted
+        finally:
+            self._end(states, request, status)
+        return status
+
+    async def _handle_async(self, request: RollupResponse) -> bool:
+        handler = self._get_handler(request)
+        states = self._begin()
         try:
             status = handler(self.rollup, request.data)
+            if inspect.isawaitable(status):
+                status = await status
         except Exception:
             LOGGER.error("Exception while handling request", exc_info=True)
             status = False
 
+        try:
+            if status and self.rollup is not None:
+                # The input is still rejected if any of its outputs failed,
+                # or if flushing them raises
+                accepted, status = status, False
+                flushed = self.rollup.flush()
+                if inspect.isawaitable(flushed):
+                    flushed = await flushed
+                status = flushed and accepted
+        finally:
+            self._end(states, request, status)
         return status
 
     def add_router(self, router: Router):
         self.routers.append(router)
+        if self._index is not None:
+            self.freeze()
+
+    def add_state(self, state: Journaled) -> Journaled:
+        """Register a state whose changes are undone when an input is
+        rejected.
+
+        Before handling each input, a transaction is begun on every state
+        of the DApp and of its routers, such as the wallet balances. It is
+        committed if the input is an advance that the handler accepts and
+        whose outputs were all sent, and rolled back otherwise, and after
+        every inspect. Returns the state, for convenience.
+        """
+        self.states.append(state)
+        if self._journaled is not None:
+            self.freeze()
+        return state
+
+    def freeze(self):
+        """Build a dispatch index over the routes of all routers.
+
+        From then on, requests are matched against the index instead of
+        asking each router in turn, with the same first-match results. This
+        is done when the DApp starts running. Routes registered in a router
+        afterwards are only seen after calling this method again, and so
+        are the journaled states of routers added to other routers.
+        """
+        self._index = DispatchIndex.from_routers(self.routers)
+        self._journaled = None
+        self._journaled = self._journaled_states()
+        LOGGER.debug('Dispatch index built with %d routes', self._index.size)
 
     def run(self):
+        self.freeze()
         if self.rollup is None:
             self.rollup = HTTPRollupServer()
-        self.rollup.set_handler(self._handle)
+        if isinstance(self.rollup, AsyncRollup):
+            self.rollup.set_handler(self._handle_async)
+        else:
+            self.rollup.set_handler(self._handle)
         self.rollup.main_loop()
+
+
+async def _await(awaitable):
+    return await awaitable
@@ -1,8 +1,11 @@
 import abc
+from functools import lru_cache
 import json
 
 from Crypto.Hash import keccak
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
+
+from ._json_scan import ObjectScanner
 
 
 def _hex2str(hex):
@@ -27,18 +30,121 @@ class RollupMetadata(BaseModel):
     timestamp: int
 
 
+_UNSET = object()
+
+# Payloads from this size on are scanned for the keys used for routing,
+# instead of being parsed up front
+SCAN_JSON_SIZE = 4096
+
+
 class RollupData(BaseModel):
+    """Data for a request.
+
+    The payload is kept as received, as a hex string. Its decoded forms are
+    computed on first use and cached, so every router and the handler share
+    a single decoding of the same input. Decoding errors are cached as well.
+    """
     metadata: RollupMetadata | None = None
     payload: str
 
+    _bytes: bytes | Exception | None = PrivateAttr(default=None)
+    _str: dict = PrivateAttr(default_factory=dict)
+    _json: object = PrivateAttr(default_factory=lambda: _UNSET)
+    _json_scanner: object = PrivateAttr(default=None)
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name == 'payload':
+            self._clear_cache()
+
+    def _copy_and_set_values(self, *args, **kwargs):
+        # `copy(update=...)` may replace the payload without `__setattr__`
+        copy = super()._copy_and_set_values(*args, **kwargs)
+        copy._clear_cache()
+        return copy
+
+    def _clear_cache(self):
+        self._bytes = None
+        self._str = {}
+        self._json = _UNSET
+        self._json_scanner = None
+
     def bytes_payload(self) -> bytes:
-        return bytes.fromhex(self.payload[2:])
+        """Return the payload decoded as bytes"""
+        value = self._bytes
+        if value is None:
+            try:
+                value = bytes.fromhex(self.payload[2:])
+            except ValueError as exc:
+                value = exc
+            self._bytes = value
+        if isinstance(value, Exception):
+            raise value.with_traceback(None)
+        return value
+
+    def memoryview_payload(self) -> memoryview:
+        """Return a read-only view of the decoded payload, without copying"""
+        return memoryview(self.bytes_payload())
 
     def str_payload(self, encoding='utf-8') -> str:
-        return bytes.fromhex(self.payload[2:]).decode(encoding)
-
-    def json_payload(self) -> bytes:
-        return json.loads(self.str_payload())
+        """Return the payload decoded as a string"""
+        value = self._str.get(encoding)
+        if value is None:
+            try:
+                value = self.bytes_payload().decode(encoding)
+            except ValueError as exc:
+                value = exc
+            self._str[encoding] = value
+        if isinstance(value, Exception):
+            raise value.with_traceback(None)
+        return value
+
+    def json_payload(self):
+        """Return the payload parsed as a JSON document.
+
+        The parsed document is shared by everyone who calls this method for
+        the same request, so it should not be modified.
+        """
+        value = self._json
+        if value is _UNSET:
+            try:
+                value = json.loads(self.str_payload())
+            except ValueError as exc:
+                value = exc
+            self._json = value
+        if isinstance(value, Exception):
+            raise value.with_traceback(None)
+        return value
+
+    def json_fields(self, keys) -> dict:
+        """Return the values of some top-level keys of a JSON object payload.
+
+        Keys missing from the object are left out. Large payloads that were
+        not parsed yet are scanned only as far as needed to find the keys,
+        so that the routers can reject a large input without parsing it.
+        The scanned part is checked, the rest of the document only when
+        parsed by `json_payload()`.
+
+        Raises ValueError if the payload is not a JSON object.
+        """
+        if self._json is _UNSET and len(self.payload) >= 2 * SCAN_JSON_SIZE:
+            scanner = self._json_scanner
+            if scanner is None:
+                try:
+                    scanner = ObjectScanner(self.str_payload())
+                except ValueError as exc:
+                    scanner = exc
+                self._json_scanner = scanner
+            if isinstance(scanner, Exception):
+                raise scanner.with_traceback(None)
+            return {
+                key: scanner.value(key) for key in scanner.find(keys)
+            }
+
+        doc = self.json_payload()
+        if not isinstance(doc, dict):
+            raise ValueError('Payload is not a JSON object')
+        return {key: doc[key] for key in keys if key in doc}
 
 
 class RollupResponse(BaseModel):
@@ -46,6 +152,64 @@ class RollupResponse(BaseModel):
     data: RollupData
 
 
+def parse_rollup_response(content, strict: bool = False) -> RollupResponse:
+    """Parse the body of a `/finish` response from the Rollup Server.
+
+    The trusted fast path decodes the JSON once and builds the models
+    directly, like `construct()` does, skipping the validation. Documents
+    that do not have the expected shape fall back to the strict path.
+
+    Parameters
+    ----------
+    content : bytes | str | dict
+        Response body, or the already decoded JSON document
+    strict : bool, optional
+        Fully validate the models with `parse_obj()`, useful for debugging.
+        By default False.
+
+    Returns
+    -------
+    RollupResponse
+        Parsed response
+    """
+    if isinstance(content, (bytes, bytearray, str)):
+        content = json.loads(content)
+    if strict:
+        return RollupResponse.parse_obj(content)
+
+    try:
+        data = content['data']
+        payload = data['payload']
+        metadata = data.get('metadata')
+        request_type = content['request_type']
+        if type(payload) is not str or type(request_type) is not str:
+            raise TypeError()
+        if metadata is not None:
+            if metadata.keys() != _METADATA_FIELDS:
+                raise KeyError()
+            metadata = _construct(RollupMetadata, metadata)
+    except (KeyError, TypeError, AttributeError):
+        return RollupResponse.parse_obj(content)
+
+    data = _construct(RollupData, {'metadata': metadata, 'payload': payload})
+    return _construct(
+        RollupResponse,
+        {'request_type': request_type, 'data': data},
+    )
+
+
+_METADATA_FIELDS = RollupMetadata.__fields__.keys()
+
+
+def _construct(model, values: dict):
+    """Lean version of `construct()` for a dict with all the fields"""
+    obj = model.__new__(model)
+    object.__setattr__(obj, '__dict__', values)
+    object.__setattr__(obj, '__fields_set__', set(values))
+    obj._init_private_attributes()
+    return obj
+
+
 class ABIHeader(BaseModel, abc.ABC):
 
     @abc.abstractmethod
@@ -67,10 +231,19 @@ class ABIFunctionSelectorHeader(ABIHeader):
     argument_types: list[str]
 
     def to_bytes(self) -> bytes:
-        signature = f'{self.function}({",".join(self.argument_types)})'
+        return function_selector(self.function, tuple(self.argument_types))
+
+
+@lru_cache(maxsize=1024)
+def function_selector(function: str, argument_types: tuple[str, ...]
+                      ) -> bytes:
+    """Return the first 4 bytes of the Keccak-256 of a function signature.
+
+    Selectors are cached by signature.
+    """
+    signature = f'{function}({",".join(argument_types)})'
 
-        sig_hash = keccak.new(digest_bits=256)
-        sig_hash.update(signature.encode('utf-8'))
+    sig_hash = keccak.new(digest_bits=256)
+    sig_hash.update(signature.encode('utf-8'))
 
-        selector = sig_hash.digest()[:4]
-        return selector
+    return sig_hash.digest()[:4]
@@ -0,0 +1,27 @@
+"""
+Notice Generation Helper
+"""
+from pydantic import BaseModel
+
+from . import abi
+
+
+def create_notice_from_model(model: BaseModel, packed: bool = False) -> str:
+    """
+    Generates a notice payload with the ABI encoding of a model.
+
+    Parameters
+    ----------
+    model : BaseModel
+        Pydantic model with ABI type annotations with the notice data
+    packed : bool, optional
+        Use non-standard packed mode. By default False.
+
+    Returns
+    -------
+    str
+        Hex encoded payload ready to be passed to rollup.notice().
+    """
+    payload = bytearray()
+    abi.encode_model_into(model, payload, packed=packed)
+    return '0x' + payload.hex()
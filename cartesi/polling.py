@@ -0,0 +1,116 @@
+"""
+Idle strategy for polling the Rollup Server
+"""
+from dataclasses import dataclass
+import random
+
+
+@dataclass
+class PollingStats:
+    """Counters for tuning the trade-off between idle CPU usage and latency
+
+    Attributes
+    ----------
+    idle_polls : int
+        Number of `/finish` requests answered with no pending input.
+    idle_time : float
+        Total time, in seconds, spent sleeping between idle polls.
+    wakeups : int
+        Number of inputs received after at least one idle poll.
+    last_wake_latency : float
+        Delay slept right before the poll that received the last input. This
+        is an upper bound on the latency added by the backoff.
+    max_wake_latency : float
+        Largest `last_wake_latency` observed.
+    total_wake_latency : float
+        Sum of the wake latencies, for computing the average.
+    """
+    idle_polls: int = 0
+    idle_time: float = 0.0
+    wakeups: int = 0
+    last_wake_latency: float = 0.0
+    max_wake_latency: float = 0.0
+    total_wake_latency: float = 0.0
+
+
+class IdlePolicy:
+    """Exponential backoff with jitter for polling while there is no input.
+
+    The first idle poll after an input waits `initial_delay` seconds, and
+    every further one multiplies the delay by `factor`, up to `max_delay`.
+    The delay is randomly spread by up to `jitter` times its value. As soon
+    as an input arrives, the delay is reset to `initial_delay`.
+
+    Setting `max_delay` to zero gives a spin loop, which polls again
+    immediately.
+
+    Parameters
+    ----------
+    initial_delay : float, optional
+        Delay, in seconds, after the first idle poll. By default 0.001.
+    max_delay : float, optional
+        Maximum delay, in seconds. By default 0.5.
+    factor : float, optional
+        Growth factor of the delay. By default 2.
+    jitter : float, optional
+        Fraction of the delay that is randomly added or subtracted. By
+        default 0.1.
+    rand : Callable, optional
+        Source of random numbers in [0, 1). By default `random.random`.
+    """
+
+    def __init__(
+        self,
+        initial_delay: float = 0.001,
+        max_delay: float = 0.5,
+        factor: float = 2.0,
+        jitter: float = 0.1,
+        rand=random.random,
+    ):
+        if initial_delay < 0 or max_delay < 0:
+            raise ValueError('Delays must not be negative')
+        if factor < 1:
+            raise ValueError('The backoff factor must be at least 1')
+        if not 0 <= jitter <= 1:
+            raise ValueError('The jitter must be between 0 and 1')
+
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.jitter = jitter
+        self.rand = rand
+        self.stats = PollingStats()
+        self._delay = None
+        self._last_sleep = None
+
+    def on_idle(self) -> float:
+        """Register an idle poll and return how long to sleep before the
+        next one."""
+        if self._delay is None:
+            delay = self.initial_delay
+        else:
+            delay = self._delay * self.factor
+        delay = min(delay, self.max_delay)
+        self._delay = delay
+
+        if self.jitter and delay:
+            delay *= 1 + self.jitter * (2 * self.rand() - 1)
+            delay = min(delay, self.max_delay)
+
+        stats = self.stats
+        stats.idle_polls += 1
+        stats.idle_time += delay
+        self._last_sleep = delay
+        return delay
+
+    def on_input(self):
+        """Register the arrival of an input, resetting the backoff."""
+        if self._last_sleep is not None:
+            stats = self.stats
+            latency = self._last_sleep
+            stats.wakeups += 1
+            stats.last_wake_latency = latency
+            stats.total_wake_latency += latency
+            stats.max_wake_latency = max(stats.max_wake_latency, latency)
+        self._delay = None
+        self._last_sleep = None
@@ -1,11 +1,22 @@
 from abc import ABC, abstractmethod
-from collections.abc import Callable
+import asyncio
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future
+import inspect
 import os
 import logging
+import queue
+import threading
+import time
 
-import requests
-
-from .models import RollupResponse
+from .models import RollupResponse, parse_rollup_response
+from .polling import IdlePolicy
+from .transport import (
+    Transport,
+    SessionTransport,
+    AsyncTransport,
+    AsyncSocketTransport,
+)
 
 LOGGER = logging.getLogger(__name__)
 
@@ -34,35 +45,116 @@ class Rollup(ABC):
     def report(self, payload) -> str:
         pass
 
+    def flush(self) -> bool:
+        """Wait until all outputs of the current input were sent.
+
+        Returns False if any of them failed.
+        """
+        return True
+
+
+class OutputSkipped(Exception):
+    """The output was not sent because a previous one failed"""
+
+
+class _AwaitableFuture(Future):
+    """A `concurrent.futures.Future` that async handlers can also await"""
+
+    def __await__(self):
+        return asyncio.wrap_future(self).__await__()
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
 
 class HTTPRollupServer(Rollup):
-    """HTTP Communication with Rollup Server based on Requests"""
+    """HTTP Communication with Rollup Server
 
-    def __init__(self, address: str = None):
+    Parameters
+    ----------
+    address : str, optional
+        Base URL of the Rollup Server. By default, the value of the
+        `ROLLUP_HTTP_SERVER_URL` environment variable.
+    transport : Transport, optional
+        Transport used for sending the requests. By default, a keep-alive
+        `SessionTransport`.
+    buffer_outputs : bool, optional
+        Queue the outputs in memory and send them, in order, from a
+        background thread while the handler keeps running. The output
+        methods then return a `concurrent.futures.Future` with the response
+        content, which async handlers can also await. The queue is drained
+        before the next `/finish`. By default False.
+    idle_policy : IdlePolicy, optional
+        Strategy for polling again when there is no pending input. By
+        default, an exponential backoff with jitter.
+    strict_parsing : bool, optional
+        Fully validate the requests received from the server, instead of
+        trusting their shape. Useful for debugging. By default False.
+
+    If any output fails, the input is rejected. When buffering, the outputs
+    queued after a failed one are not sent.
+
+    Async handlers are run in an event loop of their own. Without
+    buffering, the output methods called from them return an awaitable
+    with the response content instead of the content itself, so the same
+    handler also works with the `AsyncHTTPRollupServer`.
+    """
+
+    def __init__(
+        self,
+        address: str = None,
+        transport: Transport = None,
+        buffer_outputs: bool = False,
+        idle_policy: IdlePolicy = None,
+        strict_parsing: bool = False,
+    ):
         super().__init__()
         if address is None:
             address = os.environ.get(
                 'ROLLUP_HTTP_SERVER_URL',
                 DEFAULT_ROLLUP_URL
             )
+        if transport is None:
+            transport = SessionTransport()
+        if idle_policy is None:
+            idle_policy = IdlePolicy()
         self.address = address
+        self.transport = transport
+        self.buffer_outputs = buffer_outputs
+        self.idle_policy = idle_policy
+        self.strict_parsing = strict_parsing
+        self._output_failed = False
+        self._queue: queue.Queue | None = None
+        self._writer: threading.Thread | None = None
 
     def main_loop(self):
 
         finish = {'status': 'accept'}
         while True:
 
-            LOGGER.info("Sending finish")
-            response = requests.post(self.address + "/finish", json=finish)
+            LOGGER.debug("Sending finish")
+            response = self.transport.post(self.address + "/finish", finish)
 
-            LOGGER.info(f"Received finish status {response.status_code}")
             if response.status_code == 202:
-                LOGGER.info("No pending rollup request, trying again")
+                delay = self.idle_policy.on_idle()
+                LOGGER.debug("No pending rollup request, trying again in "
+                             "%.3fs", delay)
+                if delay:
+                    time.sleep(delay)
                 continue
 
-            rollup_response = response.json()
-            # TODO: Error handling for this model creation
-            rollup_response = RollupResponse.parse_obj(rollup_response)
+            LOGGER.info(f"Received finish status {response.status_code}")
+            self.idle_policy.on_input()
+
+            rollup_response = parse_rollup_response(
+                response.content,
+                strict=self.strict_parsing,
+            )
 
             handler = self.handler
             if handler is not None:
@@ -70,31 +162,219 @@ class HTTPRollupServer(Rollup):
             else:
                 LOGGER.error("No handler found for message.")
                 status = False
+
+            status = self.flush() and status
+            self._output_failed = False
             finish = {'status': 'accept' if status else 'reject'}
 
-    def notice(self, payload: str):
-        LOGGER.info("Adding notice")
-        data = {
-            'payload': payload
-        }
-        response = requests.post(self.address + "/notice", json=data)
-        LOGGER.info(f"Received notice status {response.status_code} "
+    def flush(self) -> bool:
+        if self._queue is not None:
+            self._queue.join()
+        return not self._output_failed
+
+    def _submit(self, kind: str, data: dict):
+        if not self.buffer_outputs:
+            content = self._send_output(kind, data)
+            if not _in_event_loop():
+                return content
+            future = _AwaitableFuture()
+            future.set_result(content)
+            return future
+
+        if self._writer is None:
+            self._queue = queue.Queue()
+            self._writer = threading.Thread(
+                target=self._writer_loop,
+                name='rollup-output-writer',
+                daemon=True,
+            )
+            self._writer.start()
+
+        future = _AwaitableFuture()
+        self._queue.put((kind, data, future))
+        return future
+
+    def _writer_loop(self):
+        while True:
+            kind, data, future = self._queue.get()
+            try:
+                if self._output_failed:
+                    raise OutputSkipped(f'Previous output failed, {kind} '
+                                        'was not sent')
+                future.set_result(self._send_output(kind, data))
+            except Exception as exc:
+                future.set_exception(exc)
+            finally:
+                self._queue.task_done()
+
+    def _send_output(self, kind: str, data: dict) -> bytes:
+        LOGGER.info("Adding %s", kind)
+        try:
+            response = self.transport.post(f'{self.address}/{kind}', data)
+        except Exception:
+            LOGGER.error("Error sending %s", kind, exc_info=True)
+            self._output_failed = True
+            raise
+        LOGGER.info(f"Received {kind} status {response.status_code} "
                     f"body {response.content}")
+        if not 200 <= response.status_code < 300:
+            self._output_failed = True
         return response.content
 
+    def notice(self, payload: str):
+        return self._submit('notice', {'payload': payload})
+
     def report(self, payload: str):
-        LOGGER.info("Adding report")
-        data = {
-            'payload': payload
-        }
-        response = requests.post(self.address + "/report", json=data)
-        LOGGER.info(f"Received report status {response.status_code} "
-                    f"body {response.content}")
-        return response.content
+        return self._submit('report', {'payload': payload})
 
     def voucher(self, payload: dict):
-        LOGGER.info("Adding voucher")
-        response = requests.post(self.address + '/voucher', json=payload)
-        LOGGER.info(f"Received report status {response.status_code} "
+        return self._submit('voucher', payload)
+
+
+class AsyncRollup(Rollup):
+    """Abstract Base Class for asyncio based interaction with the Rollup
+    Server.
+
+    The handler may be either a regular function or a coroutine function.
+    Output methods schedule the request and return an awaitable with the
+    result, so they can be awaited or fired and forgotten.
+    """
+
+    def main_loop(self):
+        asyncio.run(self.main_loop_async())
+
+    @abstractmethod
+    async def main_loop_async(self):
+        pass
+
+    async def flush(self) -> bool:
+        """Coroutine version of `Rollup.flush`"""
+        return True
+
+
+class AsyncHTTPRollupServer(AsyncRollup):
+    """Asyncio HTTP Communication with Rollup Server
+
+    Outputs are sent as soon as they are created, concurrently with the
+    execution of the handler, and all of them are joined before the next
+    `/finish`. If any output fails, the input is rejected.
+
+    Parameters
+    ----------
+    address : str, optional
+        Base URL of the Rollup Server. By default, the value of the
+        `ROLLUP_HTTP_SERVER_URL` environment variable.
+    transport : AsyncTransport, optional
+        Transport used for sending the requests. By default, an
+        `AsyncSocketTransport`, which pipelines the outputs in order over a
+        single connection.
+    idle_policy : IdlePolicy, optional
+        Strategy for polling again when there is no pending input. By
+        default, an exponential backoff with jitter.
+    strict_parsing : bool, optional
+        Fully validate the requests received from the server, instead of
+        trusting their shape. Useful for debugging. By default False.
+    """
+
+    def __init__(
+        self,
+        address: str = None,
+        transport: AsyncTransport = None,
+        idle_policy: IdlePolicy = None,
+        strict_parsing: bool = False,
+    ):
+        super().__init__()
+        if address is None:
+            address = os.environ.get(
+                'ROLLUP_HTTP_SERVER_URL',
+                DEFAULT_ROLLUP_URL
+            )
+        if transport is None:
+            transport = AsyncSocketTransport()
+        if idle_policy is None:
+            idle_policy = IdlePolicy()
+        self.address = address
+        self.transport = transport
+        self.idle_policy = idle_policy
+        self.strict_parsing = strict_parsing
+        self._outputs: list[asyncio.Task] = []
+        self._output_failed = False
+
+    async def main_loop_async(self):
+
+        finish = {'status': 'accept'}
+        while True:
+
+            LOGGER.debug("Sending finish")
+            response = await self.transport.post(
+                self.address + "/finish",
+                finish,
+            )
+
+            if response.status_code == 202:
+                delay = self.idle_policy.on_idle()
+                LOGGER.debug("No pending rollup request, trying again in "
+                             "%.3fs", delay)
+                await asyncio.sleep(delay)
+                continue
+
+            LOGGER.info(f"Received finish status {response.status_code}")
+            self.idle_policy.on_input()
+
+            rollup_response = parse_rollup_response(
+                response.content,
+                strict=self.strict_parsing,
+            )
+
+            handler = self.handler
+            if handler is not None:
+                status = handler(rollup_response)
+                if inspect.isawaitable(status):
+                    status = await status
+            else:
+                LOGGER.error("No handler found for message.")
+                status = False
+
+            status = await self.flush() and status
+            self._output_failed = False
+            finish = {'status': 'accept' if status else 'reject'}
+
+    async def flush(self) -> bool:
+        outputs = self._outputs
+        self._outputs = []
+        if outputs:
+            await asyncio.gather(*outputs, return_exceptions=True)
+        return not self._output_failed
+
+    def _submit(self, kind: str, data: dict) -> Awaitable[bytes]:
+        LOGGER.info("Adding %s", kind)
+        task = asyncio.get_running_loop().create_task(
+            self._post_output(kind, data)
+        )
+        self._outputs.append(task)
+        return task
+
+    async def _post_output(self, kind: str, data: dict) -> bytes:
+        try:
+            response = await self.transport.post(
+                f'{self.address}/{kind}',
+                data,
+            )
+        except Exception:
+            LOGGER.error("Error sending %s", kind, exc_info=True)
+            self._output_failed = True
+            raise
+        LOGGER.info(f"Received {kind} status {response.status_code} "
                     f"body {response.content}")
+        if not 200 <= response.status_code < 300:
+            self._output_failed = True
         return response.content
+
+    def notice(self, payload: str) -> Awaitable[bytes]:
+        return self._submit('notice', {'payload': payload})
+
+    def report(self, payload: str) -> Awaitable[bytes]:
+        return self._submit('report', {'payload': payload})
+
+    def voucher(self, payload: dict) -> Awaitable[bytes]:
+        return self._submit('voucher', payload)
@@ -1,9 +1,16 @@
 from collections.abc import Callable
+from functools import partial
+import inspect
+from itertools import chain
+import typing
 
 from pydantic import BaseModel
 
 from .base import Router
-from ..models import RollupResponse, ABIHeader
+from .index import DispatchIndex, Route
+from .. import abi
+from ..models import RollupResponse, RollupData, ABIHeader
+from ..rollup import Rollup
 
 
 class ABIOperation(BaseModel):
@@ -16,10 +23,34 @@ class ABIOperation(BaseModel):
     summary: str | None = None
     description: str | None = None
     msg_sender: str | None = None
+    model: type[BaseModel] | None = None
+    packed: bool = False
 
 
 class ABIRouter(Router):
-    """Handle ABI-Encoded requests."""
+    """Handle ABI-Encoded requests.
+
+    Handlers receive the rollup and the raw `RollupData`, unless the route
+    declares a model, either with the `model` parameter of the decorator or
+    by annotating a handler parameter with a Pydantic model. In that case the
+    payload, without the header, is decoded into the model with a decoder
+    compiled when the route is registered, and the handler parameters are
+    filled in according to their annotations:
+
+    - Rollup - the rollup object
+    - RollupData - the raw data from the request
+    - the model - the decoded payload
+
+    Parameters without annotations get the arguments left, in that order,
+    so a handler without annotations is called as `handler(rollup, data,
+    decoded)`. A parameter that cannot be given any argument raises
+    ValueError when the route is registered. If the payload cannot be
+    decoded, an exception is raised and the input is rejected.
+
+    The model is only inferred from annotations that can be resolved, and
+    handlers without a model are registered unchanged. Passing `model` to
+    a handler whose annotations cannot be resolved raises ValueError.
+    """
 
     def __init__(self, namespace: str = ''):
         """Handle ABI requests.
@@ -33,6 +64,8 @@ class ABIRouter(Router):
         self.namespace = namespace
         self.advance_ops: list[ABIOperation] = []
         self.inspect_ops: list[ABIOperation] = []
+        self._index: DispatchIndex | None = None
+        self._indexed_count = None
 
     def advance(
         self,
@@ -40,21 +73,32 @@ class ABIRouter(Router):
         msg_sender: str = None,
         summary: str = None,
         description: str = None,
+        model: type[BaseModel] = None,
+        packed: bool = False,
     ):
-        """Decorator for inserting handle advance"""
+        """Decorator for inserting handle advance
+
+        If `model` is given, or if the handler has a parameter annotated with
+        a Pydantic model other than `RollupData`, the payload following the
+        header is decoded into the model and passed to the handler. See
+        `ABIRouter` for details.
+        """
         def decorator(func):
             _sender = msg_sender.lower() if msg_sender is not None else None
             _header = header.to_bytes() if header is not None else None
+            _model = model if model is not None else _infer_model(func)
             operation = ABIOperation(
                 operationId=func.__name__,
                 requestType='advance_state',
-                handler=func,
+                handler=_create_handler(func, _model, _header, packed),
                 header=header,
                 msg_sender=_sender,
                 header_bytes=_header,
                 namespace=self.namespace,
                 summary=summary,
                 description=description,
+                model=_model,
+                packed=packed,
             )
             self.advance_ops.append(operation)
             return func
@@ -65,46 +109,190 @@ class ABIRouter(Router):
         header: ABIHeader = None,
         summary: str = None,
         description: str = None,
+        model: type[BaseModel] = None,
+        packed: bool = False,
     ):
-        """Decorator for inserting handle inspect"""
+        """Decorator for inserting handle inspect
+
+        The `model` and `packed` parameters work as in `advance`.
+        """
         def decorator(func):
+            _header = header.to_bytes() if header is not None else None
+            _model = model if model is not None else _infer_model(func)
             operation = ABIOperation(
                 operationId=func.__name__,
                 requestType='inspect_state',
-                handler=func,
+                handler=_create_handler(func, _model, _header, packed),
                 header=header,
                 msg_sender=None,
-                header_bytes=header.to_bytes() if header is not None else None,
+                header_bytes=_header,
                 namespace=self.namespace,
                 summary=summary,
                 description=description,
+                model=_model,
+                packed=packed,
             )
             self.inspect_ops.append(operation)
             return func
         return decorator
 
     def get_handler(self, request: RollupResponse):
-        """Return first matching route for the given request"""
-        try:
-            req_data = request.data.bytes_payload()
-        except Exception:
+        """Return first matching route for the given request.
+
+        Operations are indexed by their exact header bytes and by their
+        sender, so the lookup does not depend on the number of operations.
+        """
+        count = self.route_count()
+        if self._index is None or self._indexed_count != count:
+            self._index = DispatchIndex(self.dispatch_routes())
+            self._indexed_count = count
+        return self._index.get_handler(request)
+
+    def route_count(self) -> int:
+        return len(self.advance_ops) + len(self.inspect_ops)
+
+    def dispatch_routes(self) -> list[Route]:
+        return [
+            Route(
+                match=partial(_match_operation, op),
+                request_type=op.requestType,
+                msg_sender=op.msg_sender,
+                header=op.header_bytes,
+            )
+            for op in chain(self.advance_ops, self.inspect_ops)
+        ]
+
+
+def _match_operation(op: ABIOperation, request: RollupResponse):
+    """Return the operation handler if it matches the request"""
+    try:
+        req_data = request.data.bytes_payload()
+    except Exception:
+        return None
+
+    # Skip if msg_sender doesn't match
+    if op.msg_sender is not None:
+        if request.data.metadata.msg_sender.lower() != op.msg_sender:
             return None
 
-        if request.request_type == 'advance_state':
-            ops = self.advance_ops
-        else:
-            ops = self.inspect_ops
+    # Skip if header doesn't match
+    if op.header_bytes is not None:
+        if not req_data.startswith(op.header_bytes):
+            return None
 
-        for op in ops:
-            # Skip if msg_sender doesn't match
-            if op.msg_sender is not None:
-                if request.data.metadata.msg_sender.lower() != op.msg_sender:
-                    continue
+    # At this point, this is a match. Return the handler.
+    return op.handler
 
-            # Skip if header doesn't match
-            if op.header_bytes is not None:
-                if not req_data.startswith(op.header_bytes):
-                    continue
 
-            # At this point, this is a match. Return the handler.
-            return op.handler
+def _get_annotations(func) -> dict:
+    """Return the resolved annotations of a function's parameters"""
+    try:
+        hints = typing.get_type_hints(func)
+    except Exception as exc:
+        raise ValueError(
+            f'Cannot resolve the annotations of handler {func.__name__}: '
+            f'{exc}'
+        ) from exc
+    hints.pop('return', None)
+    return hints
+
+
+def _infer_model(func) -> type[BaseModel] | None:
+    """Return the model a handler expects to receive, if any.
+
+    Handlers whose annotations cannot be resolved, or that annotate more
+    than one model, are registered unchanged, as they were before models
+    were inferred.
+    """
+    try:
+        hints = _get_annotations(func)
+    except ValueError:
+        return None
+    models = [
+        hint for hint in hints.values()
+        if inspect.isclass(hint) and issubclass(hint, BaseModel)
+        and not issubclass(hint, RollupData)
+    ]
+    return models[0] if len(models) == 1 else None
+
+
+def _create_handler(func, model, header: bytes | None, packed: bool):
+    """Return a handler that decodes the payload into `model` and calls
+    `func` with the arguments it requests.
+
+    The decoder and the arguments to pass are resolved here, once, instead
+    of on every request.
+    """
+    if model is None:
+        return func
+
+    decoder = abi.compile_decoder(model, packed=packed)
+    skip = len(header) if header is not None else 0
+
+    plan = _argument_plan(func, model)
+    if plan is None:
+        def _handler(rollup: Rollup, data: RollupData):
+            decoded = decoder(data.bytes_payload()[skip:])
+            return func(rollup, data, decoded)
+    else:
+        def _handler(rollup: Rollup, data: RollupData):
+            args = (rollup, data, decoder(data.bytes_payload()[skip:]))
+            return func(**{name: args[pos] for name, pos in plan})
+
+    return _handler
+
+
+def _argument_plan(func, model) -> list[tuple[str, int]] | None:
+    """Return the parameter names of a handler along with the position, in
+    `(rollup, data, decoded)`, of the argument each one receives, or None if
+    the handler takes the three of them by position.
+
+    Annotated parameters get the argument of their type, and the others get
+    the arguments left, in order. Raises ValueError if a parameter without
+    a default value cannot be given any argument.
+    """
+    hints = _get_annotations(func)
+    params = list(inspect.signature(func).parameters.values())
+    if any(param.kind == param.VAR_POSITIONAL for param in params):
+        return None
+
+    plan = []
+    unannotated = []
+    for param in params:
+        hint = hints.get(param.name)
+        if hint is None:
+            unannotated.append(param)
+        elif inspect.isclass(hint) and issubclass(hint, Rollup):
+            plan.append((param, 0))
+        elif hint is RollupData:
+            plan.append((param, 1))
+        elif hint is model:
+            plan.append((param, 2))
+        elif param.default is param.empty:
+            raise ValueError(
+                f'Parameter {param.name} of handler {func.__name__} has an '
+                f'unexpected annotation {hint!r}.'
+            )
+
+    taken = {pos for _, pos in plan}
+    left = [pos for pos in range(3) if pos not in taken]
+    for param in unannotated:
+        if left:
+            plan.append((param, left.pop(0)))
+        elif param.default is param.empty:
+            raise ValueError(
+                f'Parameter {param.name} of handler {func.__name__} cannot '
+                'be given any argument.'
+            )
+
+    plan.sort(key=lambda item: params.index(item[0]))
+    if [(param, pos) for param, pos in plan] == list(zip(params, range(3))) \
+            and all(param.kind != param.KEYWORD_ONLY for param in params[:3]):
+        return None
+    for param, _ in plan:
+        if param.kind == param.POSITIONAL_ONLY:
+            raise ValueError(
+                f'Parameter {param.name} of handler {func.__name__} must be '
+                'given by name.'
+            )
+    return [(param.name, pos) for param, pos in plan]
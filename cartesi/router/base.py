@@ -9,3 +9,26 @@ class Router(ABC):
     @abstractmethod
     def get_handler(self, request: RollupResponse):
         """Returns a handler for the current request or None if none found."""
+
+    def dispatch_routes(self) -> list | None:
+        """Return the routes of this router as a list of `Route`, in the
+        order they are tried, for building a dispatch index.
+
+        Returns None if the router cannot be indexed, in which case the
+        index will call `get_handler` instead.
+        """
+        return None
+
+    def route_count(self) -> int:
+        """Return the number of routes of this router.
+
+        Routers that index their routes rebuild the index when this number
+        changes, which happens when routes are added.
+        """
+        return 0
+
+    def journaled_states(self) -> list:
+        """Return the journaled states kept by this router, such as the
+        balances of a wallet, whose changes the DApp undoes when an input is
+        rejected."""
+        return []
@@ -0,0 +1,257 @@
+"""
+Dispatch index for finding the first matching route among many routers
+"""
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass
+import heapq
+import logging
+import re
+
+from ..models import RollupResponse
+
+LOGGER = logging.getLogger(__name__)
+
+REQUEST_TYPES = ('advance_state', 'inspect_state')
+
+_REGEX_CHARS = re.compile(r'[.^$*+?{}\[\]\\|()]')
+_JSON_OBJECT = re.compile(r'\s*\{')
+
+
+@dataclass
+class Route:
+    """A single route, as seen by the dispatch index.
+
+    The `match` callable receives the request and returns the handler if the
+    route matches, or None otherwise. The remaining attributes are keys that
+    every request matched by the route is guaranteed to have, and are used
+    only for narrowing down the candidates. A route without any key is
+    tried for every request of its type.
+
+    Attributes
+    ----------
+    match : Callable
+        Full matching of the request against this route
+    request_type : str | None
+        Request type, or None for any
+    msg_sender : str | None
+        Lowercase address of the message sender
+    header : bytes | None
+        Literal prefix of the payload, such as a 4-byte function selector
+    url_prefix : str | None
+        First path segment of URL-like payloads
+    json_item : tuple | None
+        Key and value of a top-level item of JSON payloads
+    """
+    match: Callable[[RollupResponse], Callable | None]
+    request_type: str | None = None
+    msg_sender: str | None = None
+    header: bytes | None = None
+    url_prefix: str | None = None
+    json_item: tuple[str, Hashable] | None = None
+
+
+def url_prefix(path: str) -> str | None:
+    """Return the first segment of a path template, if it is static"""
+    segment = path.split('/', 1)[0]
+    if _REGEX_CHARS.search(segment):
+        return None
+    return segment
+
+
+def json_item(route_dict: dict, preferred_key: str | None = None
+              ) -> tuple[str, Hashable] | None:
+    """Return the item of a route dict to use as index key.
+
+    This is the item of `preferred_key`, if the route has it with a hashable
+    value, or else the first item with a hashable value.
+    """
+    if preferred_key is not None and preferred_key in route_dict:
+        value = route_dict[preferred_key]
+        if _is_hashable(value):
+            return (preferred_key, value)
+    for key, value in route_dict.items():
+        if _is_hashable(value):
+            return (key, value)
+    return None
+
+
+def discriminator_key(route_dicts: Iterable[dict]) -> str | None:
+    """Return the key with a hashable value in most of the route dicts,
+    such as the `op` of `{"op": "transfer"}`, or None if there is none"""
+    counts: dict[str, int] = {}
+    for route_dict in route_dicts:
+        for key, value in route_dict.items():
+            if _is_hashable(value):
+                counts[key] = counts.get(key, 0) + 1
+    if not counts:
+        return None
+    # On ties, the key seen first wins
+    return max(counts, key=counts.__getitem__)
+
+
+def _is_hashable(value) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class _TypeIndex:
+    """Index for the routes of a single request type"""
+
+    def __init__(self):
+        self.residual: list = []
+        self.by_header: dict[bytes, list] = {}
+        self.header_sizes: list[int] = []
+        self.by_sender: dict[str, list] = {}
+        self.by_url: dict[str, list] = {}
+        self.by_json: dict[tuple, list] = {}
+        self.json_keys: list[str] = []
+
+    def add(self, order: int, route: Route):
+        entry = (order, route)
+        header = route.header
+        if header:
+            bucket = self.by_header.setdefault(header, [])
+            if len(header) not in self.header_sizes:
+                self.header_sizes.append(len(header))
+                self.header_sizes.sort()
+        elif route.msg_sender is not None:
+            bucket = self.by_sender.setdefault(route.msg_sender, [])
+        elif route.url_prefix is not None:
+            bucket = self.by_url.setdefault(route.url_prefix, [])
+        elif route.json_item is not None:
+            bucket = self.by_json.setdefault(route.json_item, [])
+            if route.json_item[0] not in self.json_keys:
+                self.json_keys.append(route.json_item[0])
+        else:
+            bucket = self.residual
+        bucket.append(entry)
+
+    def candidates(self, request: RollupResponse) -> list[list]:
+        data = request.data
+        found = []
+        if self.residual:
+            found.append(self.residual)
+
+        if self.by_header:
+            try:
+                payload = data.bytes_payload()
+            except Exception:
+                payload = b''
+            for size in self.header_sizes:
+                if size > len(payload):
+                    break
+                bucket = self.by_header.get(payload[:size])
+                if bucket is not None:
+                    found.append(bucket)
+
+        if self.by_sender and data.metadata is not None:
+            bucket = self.by_sender.get(data.metadata.msg_sender.lower())
+            if bucket is not None:
+                found.append(bucket)
+
+        if self.by_url:
+            try:
+                path = data.str_payload()
+            except Exception:
+                path = None
+            if path is not None:
+                path = path.partition('?')[0]
+                if path.endswith('\n'):
+                    # '$' also matches before a trailing newline
+                    path = path[:-1]
+                segment = path.split('/', 1)[0]
+                bucket = self.by_url.get(segment)
+                if bucket is not None:
+                    found.append(bucket)
+
+        if self.by_json:
+            # Only JSON objects can match, so avoid parsing anything else,
+            # and read only the keys of the index
+            try:
+                fields = {}
+                if _JSON_OBJECT.match(data.str_payload()):
+                    fields = data.json_fields(self.json_keys)
+            except Exception:
+                pass
+            for item in fields.items():
+                try:
+                    bucket = self.by_json.get(item)
+                except TypeError:
+                    continue
+                if bucket is not None:
+                    found.append(bucket)
+
+        return found
+
+
+class DispatchIndex:
+    """Index over the routes of several routers.
+
+    Routes are numbered in the order they would be tried by scanning the
+    routers one after the other, and each route is stored in a hash table
+    under one of its keys. For a request, only the routes stored under the
+    request's keys, plus the ones without any key, are tried, in their
+    original order. The result is the same first match as a full scan.
+    """
+
+    def __init__(self, routes: list[Route]):
+        self._indexes = {rt: _TypeIndex() for rt in REQUEST_TYPES}
+        self.size = len(routes)
+        for order, route in enumerate(routes):
+            if route.request_type is None:
+                for index in self._indexes.values():
+                    index.add(order, route)
+            else:
+                self._indexes[route.request_type].add(order, route)
+
+    @classmethod
+    def from_routers(cls, routers: list) -> 'DispatchIndex':
+        """Build an index with the routes of the routers, in order.
+
+        Routers that cannot be indexed are tried as a whole, in their place.
+        """
+        return cls(collect_routes(routers))
+
+    def get_handler(self, request: RollupResponse):
+        """Return the handler of the first matching route, or None"""
+        index = self._indexes.get(request.request_type)
+        if index is None:
+            return None
+
+        buckets = index.candidates(request)
+        if not buckets:
+            return None
+        if len(buckets) == 1:
+            entries = buckets[0]
+        else:
+            entries = heapq.merge(*buckets, key=_order)
+
+        for _, route in entries:
+            handler = route.match(request)
+            if handler is not None:
+                return handler
+        return None
+
+
+def collect_routes(routers: list) -> list[Route]:
+    """Return the routes of the routers, in the order they are tried.
+
+    Routers that cannot be indexed are a single route, calling their
+    `get_handler`.
+    """
+    routes = []
+    for router in routers:
+        router_routes = router.dispatch_routes()
+        if router_routes is None:
+            LOGGER.debug('Router %s cannot be indexed', repr(router))
+            routes.append(Route(match=router.get_handler))
+        else:
+            routes.extend(router_routes)
+    return routes
+
+
+def _order(entry):
+    return entry[0]
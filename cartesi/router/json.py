@@ -1,4 +1,8 @@
+from functools import partial
+from itertools import chain
+
 from .base import Router
+from .index import DispatchIndex, Route, discriminator_key, json_item
 from ..models import RollupResponse
 
 
@@ -22,6 +26,8 @@ class JSONRouter(Router):
     def __init__(self):
         self.advance_routes = []
         self.inspect_routes = []
+        self._index: DispatchIndex | None = None
+        self._indexed_count = None
 
     def advance(self, route_dict):
         """Decorator for inserting handle advance"""
@@ -38,17 +44,54 @@ class JSONRouter(Router):
         return decorator
 
     def get_handler(self, request: RollupResponse):
-        """Return first matching route for the given request"""
-        try:
-            req_data = request.data.json_payload()
-        except Exception:
-            return None
+        """Return first matching route for the given request.
+
+        Routes are indexed by the value of the key most of them have, such
+        as `op`, so the lookup does not depend on the number of routes.
+        Routes without that key are indexed by another of their items, or
+        tried for every request.
+        """
+        count = self.route_count()
+        if self._index is None or self._indexed_count != count:
+            self._index = DispatchIndex(self.dispatch_routes())
+            self._indexed_count = count
+        return self._index.get_handler(request)
+
+    def route_count(self) -> int:
+        return len(self.advance_routes) + len(self.inspect_routes)
+
+    def dispatch_routes(self) -> list[Route]:
+        key = discriminator_key(
+            route_dict for route_dict, _ in chain(self.advance_routes,
+                                                  self.inspect_routes)
+        )
+        routes = []
+        for request_type, handlers in (
+            ('advance_state', self.advance_routes),
+            ('inspect_state', self.inspect_routes),
+        ):
+            for route_dict, route_func in handlers:
+                routes.append(Route(
+                    match=partial(_match_route, route_dict, route_func),
+                    request_type=request_type,
+                    json_item=json_item(route_dict, key),
+                ))
+        return routes
 
-        if request.request_type == 'advance_state':
-            handlers = self.advance_routes
+
+def _match_route(route_dict, route_func, request: RollupResponse):
+    """Return the route function if the request matches the route dict.
+
+    Only the keys of the route dict are read from the payload, which is
+    parsed in full when the handler asks for it.
+    """
+    try:
+        if route_dict:
+            req_data = request.data.json_fields(route_dict)
         else:
-            handlers = self.inspect_routes
+            req_data = request.data.json_payload()
+    except Exception:
+        return None
 
-        for route_dict, route_func in handlers:
-            if _dict_contains(route_dict, req_data):
-                return route_func
+    if _dict_contains(route_dict, req_data):
+        return route_func
@@ -0,0 +1,248 @@
+from pydantic import BaseModel
+import pytest
+
+from .. import abi
+from ..models import (
+    ABIFunctionSelectorHeader,
+    ABILiteralHeader,
+    RollupData,
+    RollupResponse,
+)
+from ..rollup import Rollup
+from .abi import ABIRouter, _match_operation
+
+PORTAL = '0xFfdbe43d4c855BF7e0f105c400A50857f53AB044'
+OTHER = '0x' + '11' * 20
+
+
+def handler(name):
+    def _handler(rollup, data):
+        return name
+    return _handler
+
+
+def make_request(payload: bytes, sender: str = OTHER,
+                 request_type: str = 'advance_state'):
+    data = {'payload': '0x' + payload.hex()}
+    if request_type == 'advance_state':
+        data['metadata'] = {
+            'msg_sender': sender,
+            'epoch_index': 0,
+            'input_index': 0,
+            'block_number': 0,
+            'timestamp': 0,
+        }
+    return RollupResponse.parse_obj({'request_type': request_type,
+                                     'data': data})
+
+
+def linear_lookup(router: ABIRouter, request: RollupResponse):
+    if request.request_type == 'advance_state':
+        ops = router.advance_ops
+    else:
+        ops = router.inspect_ops
+    for op in ops:
+        handler = _match_operation(op, request)
+        if handler is not None:
+            return handler
+
+
+def selector(idx: int) -> bytes:
+    return ABIFunctionSelectorHeader(
+        function=f'method{idx}',
+        argument_types=['uint256'],
+    ).to_bytes()
+
+
+def build_router() -> ABIRouter:
+    router = ABIRouter()
+    for idx in range(50):
+        router.advance(header=ABIFunctionSelectorHeader(
+            function=f'method{idx}',
+            argument_types=['uint256'],
+        ))(handler(f'method{idx}'))
+    router.advance(msg_sender=PORTAL)(handler('portal'))
+    router.advance(
+        header=ABILiteralHeader(header=selector(3)),
+        msg_sender=PORTAL,
+    )(handler('shadowed'))
+    router.advance(header=ABILiteralHeader(header=b'\xaa'))(handler('short'))
+    router.advance(header=ABILiteralHeader(header=b'\xaa\xbb\xcc\xdd\xee'))(
+        handler('long'))
+    router.inspect(header=ABILiteralHeader(header=selector(7)))(
+        handler('inspect7'))
+    router.inspect()(handler('inspect_any'))
+    return router
+
+
+def test_indexed_lookup_should_match_linear_lookup():
+    router = build_router()
+    payloads = [selector(idx) + bytes(32) for idx in range(52)] + [
+        b'\xaa\xbb\xcc\xdd\xee\xff',
+        b'\xaa',
+        b'',
+        b'\x00',
+    ]
+    names = set()
+    for payload in payloads:
+        for sender in (PORTAL, PORTAL.lower(), OTHER):
+            for request_type in ('advance_state', 'inspect_state'):
+                request = make_request(payload, sender, request_type)
+                expected = linear_lookup(router, request)
+                assert router.get_handler(request) is expected
+                if expected is not None:
+                    names.add(expected(None, None))
+
+    assert {'method0', 'method49', 'portal', 'short', 'inspect7',
+            'inspect_any'} <= names
+
+
+def test_residual_operation_keeps_precedence():
+    router = ABIRouter()
+    router.advance()(handler('catch_all'))
+    router.advance(header=ABILiteralHeader(header=selector(1)))(
+        handler('method1'))
+
+    request = make_request(selector(1))
+    assert router.get_handler(request)(None, None) == 'catch_all'
+
+
+def test_should_index_operations_added_later():
+    router = build_router()
+    request = make_request(selector(100))
+    assert router.get_handler(request) is None
+
+    router.advance(header=ABILiteralHeader(header=selector(100)))(
+        handler('method100'))
+    assert router.get_handler(request)(None, None) == 'method100'
+
+
+class Transfer(BaseModel):
+    to: abi.Address
+    amount: abi.UInt256
+
+
+TRANSFER_HEADER = ABIFunctionSelectorHeader(
+    function='transfer',
+    argument_types=['address', 'uint256'],
+)
+TRANSFER = Transfer(to=OTHER, amount=1000)
+
+
+def test_should_decode_model_from_annotation():
+    router = ABIRouter()
+    received = []
+
+    @router.advance(header=TRANSFER_HEADER)
+    def transfer(rollup: Rollup, transfer: Transfer, data: RollupData):
+        received.append((rollup, transfer, data))
+        return True
+
+    payload = TRANSFER_HEADER.to_bytes() + abi.encode_model(TRANSFER)
+    request = make_request(payload)
+    assert router.get_handler(request)('rollup', request.data)
+    assert received == [('rollup', TRANSFER, request.data)]
+    assert router.advance_ops[0].model is Transfer
+
+
+def test_should_decode_explicit_model():
+    router = ABIRouter()
+
+    @router.inspect(model=Transfer)
+    def transfer(rollup, data, decoded):
+        return decoded
+
+    request = make_request(abi.encode_model(TRANSFER),
+                           request_type='inspect_state')
+    assert router.get_handler(request)(None, request.data) == TRANSFER
+
+
+def test_should_decode_packed_model():
+    router = ABIRouter()
+
+    @router.advance(msg_sender=PORTAL, packed=True)
+    def deposit(transfer: Transfer):
+        return transfer
+
+    payload = abi.encode_model(TRANSFER, packed=True)
+    request = make_request(payload, PORTAL)
+    assert router.get_handler(request)(None, request.data) == TRANSFER
+
+
+def test_should_raise_on_invalid_payload():
+    router = ABIRouter()
+
+    @router.advance(header=TRANSFER_HEADER)
+    def transfer(transfer: Transfer):
+        return True
+
+    request = make_request(TRANSFER_HEADER.to_bytes() + b'\x01')
+    with pytest.raises(Exception):
+        router.get_handler(request)(None, request.data)
+
+
+def test_should_not_decode_without_model():
+    router = ABIRouter()
+
+    @router.advance()
+    def raw(rollup: Rollup, data: RollupData):
+        return True
+
+    assert router.advance_ops[0].model is None
+    assert router.advance_ops[0].handler is raw
+
+
+def test_should_pass_unannotated_parameters_by_position():
+    router = ABIRouter()
+
+    @router.advance(header=TRANSFER_HEADER)
+    def transfer(rollup, data, transfer: Transfer):
+        return rollup, data, transfer
+
+    @router.inspect(header=TRANSFER_HEADER)
+    def inspect_transfer(transfer: Transfer, rollup, data=None, extra=1):
+        return rollup, data, transfer
+
+    payload = TRANSFER_HEADER.to_bytes() + abi.encode_model(TRANSFER)
+    for request_type in ('advance_state', 'inspect_state'):
+        request = make_request(payload, request_type=request_type)
+        handler = router.get_handler(request)
+        assert handler('rollup', request.data) == ('rollup', request.data,
+                                                   TRANSFER)
+
+
+def test_should_refuse_handlers_with_unresolved_parameters():
+    router = ABIRouter()
+
+    with pytest.raises(ValueError):
+        @router.advance(model=Transfer)
+        def too_many(rollup, data, transfer, other):
+            return True
+
+    with pytest.raises(ValueError):
+        @router.advance(model=Transfer)
+        def unknown(rollup, data, transfer: int):
+            return True
+
+    with pytest.raises(ValueError):
+        @router.advance(model=Transfer)
+        def unresolved(rollup, data, transfer: 'Unknown'):  # noqa: F821
+            return True
+
+
+def test_should_register_unresolved_handlers_unchanged():
+    router = ABIRouter()
+
+    @router.advance(header=TRANSFER_HEADER)
+    def unresolved(rollup: Rollup, data: RollupData,
+                   extra: 'Unknown' = None):  # noqa: F821
+        return True
+
+    @router.advance()
+    def two_models(rollup, data, first: Transfer = None,
+                   second: Transfer = None):
+        return True
+
+    assert router.advance_ops[0].model is None
+    assert router.advance_ops[0].handler is unresolved
+    assert router.advance_ops[1].handler is two_models
@@ -0,0 +1,158 @@
+import json
+from itertools import product
+
+from ..dapp import DApp
+from ..models import ABILiteralHeader, RollupData, RollupResponse
+from ..rollup import Rollup
+from .abi import ABIRouter
+from .base import Router
+from .index import DispatchIndex
+from .json import JSONRouter
+from .url import URLRouter
+
+SENDER_1 = '0x' + '11' * 20
+SENDER_2 = '0x' + '22' * 20
+
+
+def handler(name):
+    def _handler(rollup: Rollup, data: RollupData):
+        return name
+    _handler.__name__ = name
+    return _handler
+
+
+class OpaqueRouter(Router):
+
+    def get_handler(self, request):
+        if request.data.payload == '0xff':
+            return handler('opaque')
+
+
+def build_dapp() -> DApp:
+    dapp = DApp()
+
+    abi_router = ABIRouter()
+    abi_router.advance(header=ABILiteralHeader(header=b'\x01\x02\x03\x04'))(
+        handler('abi_header'))
+    abi_router.advance(header=ABILiteralHeader(header=b'\x01\x02'))(
+        handler('abi_short_header'))
+    abi_router.advance(
+        header=ABILiteralHeader(header=b'\x01\x02\x03\x04\x05'),
+        msg_sender=SENDER_1,
+    )(handler('abi_shadowed'))
+    abi_router.advance(msg_sender=SENDER_2.upper().replace('0X', '0x'))(
+        handler('abi_sender'))
+    abi_router.inspect(header=ABILiteralHeader(header=b'{"op'))(
+        handler('abi_inspect'))
+
+    url_router = URLRouter()
+    url_router.advance('hello/')(handler('url_hello'))
+    url_router.advance('hello/{name}')(handler('url_hello_name'))
+    url_router.inspect('{any}/world')(handler('url_any_world'))
+    url_router.inspect('a.c/x')(handler('url_regex'))
+    url_router.inspect('status')(handler('url_status'))
+
+    json_router = JSONRouter()
+    json_router.advance({'op': 'set'})(handler('json_set'))
+    json_router.advance({'op': 'set', 'key': 'x'})(handler('json_shadowed'))
+    json_router.advance({'kind': 1})(handler('json_kind'))
+    json_router.inspect({'list': [1, 2]})(handler('json_list'))
+    json_router.inspect({})(handler('json_any'))
+
+    dapp.add_router(abi_router)
+    dapp.add_router(OpaqueRouter())
+    dapp.add_router(url_router)
+    dapp.add_router(json_router)
+    return dapp
+
+
+PAYLOADS = [
+    b'\x01\x02\x03\x04\x05',
+    b'\x01\x02\x03',
+    b'\x01',
+    b'\xff',
+    b'hello/',
+    b'hello/earth?x=1',
+    b'earth/world',
+    b'abc/x',
+    b'hello',
+    b'status',
+    # '$' also matches before a trailing newline
+    b'status\n',
+    b'status\n\n',
+    json.dumps({'op': 'set', 'key': 'x'}).encode(),
+    json.dumps({'kind': True}).encode(),
+    json.dumps({'kind': [1]}).encode(),
+    json.dumps({'list': [1, 2]}).encode(),
+    json.dumps([1, 2]).encode(),
+    b'',
+]
+
+
+def make_request(request_type, payload, sender):
+    data = {'payload': '0x' + payload.hex()}
+    if request_type == 'advance_state':
+        data['metadata'] = {
+            'msg_sender': sender,
+            'epoch_index': 0,
+            'input_index': 0,
+            'block_number': 0,
+            'timestamp': 0,
+        }
+    return RollupResponse.parse_obj({'request_type': request_type,
+                                     'data': data})
+
+
+def name_of(handler):
+    return handler(None, None) if handler is not None else None
+
+
+def test_frozen_dispatch_should_match_sequential_dispatch():
+    sequential = build_dapp()
+    frozen = build_dapp()
+    frozen.freeze()
+
+    combinations = product(
+        ['advance_state', 'inspect_state'],
+        PAYLOADS,
+        [SENDER_1, SENDER_2, SENDER_2.upper().replace('0X', '0x')],
+    )
+    matched = set()
+    for request_type, payload, sender in combinations:
+        request = make_request(request_type, payload, sender)
+        expected = name_of(sequential._get_handler(request))
+        request = make_request(request_type, payload, sender)
+        assert name_of(frozen._get_handler(request)) == expected
+        matched.add(expected)
+
+    # Make sure the test exercises most routes
+    assert len(matched) >= 14
+
+
+def test_should_rebuild_when_adding_router():
+    dapp = build_dapp()
+    dapp.freeze()
+
+    late_router = URLRouter()
+    late_router.advance('late')(handler('late'))
+    dapp.add_router(late_router)
+
+    request = make_request('advance_state', b'late', SENDER_1)
+    assert name_of(dapp._get_handler(request)) == 'late'
+
+
+def test_should_only_try_candidate_routes():
+    tried = []
+
+    router = URLRouter()
+    for idx in range(100):
+        router.inspect(f'route{idx}/x')(handler(f'route{idx}'))
+    routes = router.dispatch_routes()
+    for route in routes:
+        route.match = (lambda m: lambda r: tried.append(1) or m(r))(
+            route.match)
+    index = DispatchIndex(routes)
+
+    request = make_request('inspect_state', b'route99/x', None)
+    assert name_of(index.get_handler(request)) == 'route99'
+    assert len(tried) == 1
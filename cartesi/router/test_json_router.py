@@ -0,0 +1,148 @@
+import json
+import random
+
+import pytest
+
+from .. import models
+from ..models import RollupResponse
+from .index import discriminator_key, json_item
+from .json import JSONRouter, _dict_contains
+
+
+def make_request(payload: bytes, request_type: str = 'advance_state'):
+    data = {'payload': '0x' + payload.hex()}
+    if request_type == 'advance_state':
+        data['metadata'] = {
+            'msg_sender': '0x' + '00' * 20,
+            'epoch_index': 0,
+            'input_index': 0,
+            'block_number': 0,
+            'timestamp': 0,
+        }
+    return RollupResponse.parse_obj({'request_type': request_type,
+                                     'data': data})
+
+
+def handler(name):
+    def _handler(rollup, data):
+        return name
+    return _handler
+
+
+def linear_lookup(router: JSONRouter, request: RollupResponse):
+    try:
+        req_data = request.data.json_payload()
+    except Exception:
+        return None
+    if request.request_type == 'advance_state':
+        routes = router.advance_routes
+    else:
+        routes = router.inspect_routes
+    for route_dict, route_func in routes:
+        if _dict_contains(route_dict, req_data):
+            return route_func
+
+
+def test_discriminator_key():
+    assert discriminator_key([]) is None
+    assert discriminator_key([{'a': [1]}]) is None
+    assert discriminator_key([
+        {'kind': 1, 'op': 'a'},
+        {'op': 'b'},
+        {'op': 'c', 'list': [1]},
+        {'kind': 2},
+    ]) == 'op'
+    # Ties are broken by the first key seen
+    assert discriminator_key([{'a': 1, 'b': 2}]) == 'a'
+
+
+@pytest.mark.parametrize('route_dict,key,item', [
+    ({'kind': 1, 'op': 'a'}, 'op', ('op', 'a')),
+    ({'kind': 1}, 'op', ('kind', 1)),
+    ({'op': [1], 'kind': 1}, 'op', ('kind', 1)),
+    ({'op': [1]}, 'op', None),
+    ({}, None, None),
+])
+def test_json_item(route_dict, key, item):
+    assert json_item(route_dict, key) == item
+
+
+def test_first_match_precedence():
+    router = JSONRouter()
+    router.advance({'kind': 'x'})(handler('kind'))
+    router.advance({'op': 'set', 'key': 'a'})(handler('set_a'))
+    router.advance({'op': 'set'})(handler('set'))
+    router.advance({'list': [1, 2]})(handler('list'))
+    router.advance({})(handler('any'))
+    router.inspect({'op': 'set'})(handler('inspect_set'))
+
+    def lookup(doc, request_type='advance_state'):
+        request = make_request(json.dumps(doc).encode(), request_type)
+        found = router.get_handler(request)
+        return found(None, None) if found is not None else None
+
+    assert lookup({'op': 'set', 'kind': 'x'}) == 'kind'
+    assert lookup({'op': 'set', 'key': 'a'}) == 'set_a'
+    assert lookup({'op': 'set', 'key': 'b'}) == 'set'
+    assert lookup({'op': 'get', 'list': [1, 2]}) == 'list'
+    assert lookup({'op': ['set']}) == 'any'
+    assert lookup([1, 2]) == 'any'
+    assert lookup({'op': 'set'}, 'inspect_state') == 'inspect_set'
+    assert lookup({'op': 'get'}, 'inspect_state') is None
+    assert router.get_handler(make_request(b'not json')) is None
+
+
+def test_routes_added_after_lookup():
+    router = JSONRouter()
+    router.advance({'op': 'a'})(handler('a'))
+    request = make_request(b'{"op": "b"}')
+    assert router.get_handler(request) is None
+    router.advance({'op': 'b'})(handler('b'))
+    assert router.get_handler(request)(None, None) == 'b'
+
+
+@pytest.mark.parametrize('scan_size', [0, models.SCAN_JSON_SIZE])
+def test_matches_linear_scan(monkeypatch, scan_size):
+    monkeypatch.setattr(models, 'SCAN_JSON_SIZE', scan_size)
+    rand = random.Random(19)
+    values = ['a', 'b', 1, 1.0, True, None, [1], {'x': 1}]
+    keys = ['op', 'kind', 'id']
+
+    for _ in range(50):
+        router = JSONRouter()
+        for idx in range(rand.randint(1, 20)):
+            route_dict = {
+                key: rand.choice(values)
+                for key in rand.sample(keys, rand.randint(0, 2))
+            }
+            if rand.random() < 0.5:
+                route_dict.setdefault('op', rand.choice(values[:3]))
+            router.advance(route_dict)(handler(idx))
+
+        for _ in range(30):
+            doc = {
+                key: rand.choice(values)
+                for key in rand.sample(keys, rand.randint(0, 3))
+            }
+            request = make_request(json.dumps(doc).encode())
+            expected = linear_lookup(router, make_request(
+                json.dumps(doc).encode()
+            ))
+            assert router.get_handler(request) is expected
+
+
+def test_large_payload_not_parsed_without_match():
+    router = JSONRouter()
+    for idx in range(10):
+        router.advance({'op': f'op{idx}'})(handler(idx))
+
+    doc = {'op': 'missing', 'items': [{'value': idx} for idx in range(5000)]}
+    request = make_request(json.dumps(doc).encode())
+    assert router.get_handler(request) is None
+    assert request.data._json is models._UNSET
+
+    doc['op'] = 'op3'
+    request = make_request(json.dumps(doc).encode())
+    assert router.get_handler(request)(None, None) == 3
+    assert request.data._json is models._UNSET
+    assert request.data.json_payload() == doc
@@ -0,0 +1,89 @@
+from itertools import product
+
+from ..dapp import DApp
+from ..models import ABILiteralHeader
+from .abi import ABIRouter
+from .multi import MultiRouter
+from .test_index import (
+    PAYLOADS,
+    SENDER_1,
+    SENDER_2,
+    build_dapp,
+    handler,
+    make_request,
+    name_of,
+)
+from .url import URLRouter
+
+
+def sequential_lookup(router: MultiRouter, request):
+    for child in router.routers:
+        found = child.get_handler(request)
+        if found is not None:
+            return found
+
+
+def build_multi_router() -> MultiRouter:
+    router = MultiRouter()
+    for child in build_dapp().routers:
+        router.add_router(child)
+    return router
+
+
+def combinations():
+    return product(
+        ['advance_state', 'inspect_state'],
+        PAYLOADS,
+        [SENDER_1, SENDER_2, SENDER_2.upper().replace('0X', '0x')],
+    )
+
+
+def test_indexed_lookup_should_match_sequential_lookup():
+    router = build_multi_router()
+    for request_type, payload, sender in combinations():
+        request = make_request(request_type, payload, sender)
+        expected = name_of(sequential_lookup(router, request))
+        request = make_request(request_type, payload, sender)
+        assert name_of(router.get_handler(request)) == expected
+
+
+def test_nested_multi_router_in_frozen_dapp():
+    def build():
+        inner = build_multi_router()
+        outer = MultiRouter()
+        first = ABIRouter()
+        first.advance(header=ABILiteralHeader(header=b'\x01'))(
+            handler('first'))
+        outer.add_router(first)
+        outer.add_router(inner)
+        dapp = DApp()
+        dapp.add_router(outer)
+        return dapp, outer
+
+    sequential, _ = build()
+    frozen, outer = build()
+    frozen.freeze()
+    assert frozen._index.size == len(outer.dispatch_routes())
+
+    for request_type, payload, sender in combinations():
+        request = make_request(request_type, payload, sender)
+        expected = name_of(sequential._get_handler(request))
+        request = make_request(request_type, payload, sender)
+        assert name_of(frozen._get_handler(request)) == expected
+
+
+def test_routes_added_after_lookup():
+    router = MultiRouter()
+    url_router = URLRouter()
+    router.add_router(url_router)
+    request = make_request('inspect_state', b'balance/ether', SENDER_1)
+    assert router.get_handler(request) is None
+
+    url_router.inspect('balance/ether')(handler('balance'))
+    assert name_of(router.get_handler(request)) == 'balance'
+
+    # Routers added before the routes that would match
+    other = URLRouter()
+    other.inspect('balance/{token}')(handler('other'))
+    router.routers.insert(0, other)
+    assert name_of(router.get_handler(request)) == 'other'
@@ -0,0 +1,226 @@
+import inspect
+import random
+
+import pytest
+
+from ..dapp import DApp
+from ..models import RollupData, RollupResponse
+from ..rollup import Rollup
+from . import url
+from .url import URLRouter, URLParameters, _match_route, _split_path
+
+
+def make_request(path: str, request_type: str = 'advance_state'):
+    data = {'payload': '0x' + path.encode('utf-8').hex()}
+    if request_type == 'advance_state':
+        data['metadata'] = {
+            'msg_sender': '0x' + '00' * 20,
+            'epoch_index': 0,
+            'input_index': 0,
+            'block_number': 0,
+            'timestamp': 0,
+        }
+    return RollupResponse.parse_obj({'request_type': request_type,
+                                     'data': data})
+
+
+def route_handler(name):
+    def _handler(params: URLParameters):
+        return name, params.path_params, params.query_params
+    return _handler
+
+
+def linear_lookup(router: URLRouter, request: RollupResponse):
+    for route in router.routes:
+        handler = _match_route(route, request)
+        if handler is not None:
+            return handler
+    return None
+
+
+def call(handler):
+    if handler is None:
+        return None
+    return handler(None, None)
+
+
+def build_router(paths: list[str]) -> URLRouter:
+    router = URLRouter()
+    for idx, path in enumerate(paths):
+        router.advance(path)(route_handler(idx))
+    return router
+
+
+@pytest.mark.parametrize('path,segments', [
+    ('a/b', [(False, 'a', None), (False, 'b', None)]),
+    ('a/{x}/c', [(False, 'a', None), (True, 'x', 'str'), (False, 'c', None)]),
+    ('', [(False, '', None)]),
+    ('a.b/{x}', [(False, 'a.b', None), (True, 'x', 'str')]),
+    ('a/{x:int}', [(False, 'a', None), (True, 'x', 'int')]),
+    ('{x}/a.b', None),
+    ('a/{x}.txt', None),
+    ('a/{x}-{y}', None),
+    ('items/[0-9]+', None),
+])
+def test_split_path(path, segments):
+    assert _split_path(path) == segments
+
+
+def test_first_match_precedence():
+    router = build_router([
+        'a/{x}',
+        'a/b',
+        '{x}/b',
+        'c/{x}/d',
+        'c/e/{y}',
+    ])
+    assert call(router.get_handler(make_request('a/b')))[0] == 0
+    assert call(router.get_handler(make_request('z/b')))[0] == 2
+    assert call(router.get_handler(make_request('c/e/d'))) == \
+        (3, {'x': 'e'}, {})
+    assert call(router.get_handler(make_request('c/e/f?q=1&q=2'))) == \
+        (4, {'y': 'f'}, {'q': ['1', '2']})
+    assert router.get_handler(make_request('a/')) is None
+    assert router.get_handler(make_request('a/b/c')) is None
+
+
+def test_regex_routes_keep_precedence():
+    router = build_router([
+        'files/{name}.txt',
+        'files/{name}',
+        'v1.0/info',
+        'items/[0-9]+',
+        'items/{id}',
+    ])
+    assert call(router.get_handler(make_request('files/a.txt'))) == \
+        (0, {'name': 'a'}, {})
+    assert call(router.get_handler(make_request('files/a.bin'))) == \
+        (1, {'name': 'a.bin'}, {})
+    # The tail of the path is a regex, as with the linear scan
+    assert call(router.get_handler(make_request('v1x0/info')))[0] == 2
+    assert call(router.get_handler(make_request('items/12')))[0] == 3
+    assert call(router.get_handler(make_request('items/ab')))[0] == 4
+
+
+def test_request_types():
+    router = URLRouter()
+    router.inspect('balance/{id}')(route_handler('inspect'))
+    router.advance('balance/{id}')(route_handler('advance'))
+    assert call(router.get_handler(make_request('balance/1')))[0] == \
+        'advance'
+    assert call(router.get_handler(
+        make_request('balance/1', 'inspect_state')
+    ))[0] == 'inspect'
+
+
+def test_routes_added_after_lookup():
+    router = build_router(['a/{x}'])
+    assert router.get_handler(make_request('b/1')) is None
+    router.advance('b/{x}')(route_handler(1))
+    assert call(router.get_handler(make_request('b/1')))[0] == 1
+
+
+def test_matches_linear_scan():
+    rand = random.Random(17)
+    words = ['a', 'b', 'c', 'a.b', '']
+    templates = words[:4] + ['{p}', '{q}', '{p}.b', '[ab]', 'a|c']
+
+    for _ in range(50):
+        paths = [
+            '/'.join(rand.choice(templates)
+                     for _ in range(rand.randint(1, 3)))
+            for _ in range(rand.randint(1, 15))
+        ]
+        paths = [path for path in paths if path.count('{p}') <= 1 and
+                 path.count('{q}') <= 1]
+        router = build_router(paths)
+        for _ in range(30):
+            path = '/'.join(rand.choice(words)
+                            for _ in range(rand.randint(1, 3)))
+            if rand.random() < 0.1:
+                path += '\n'
+            request = make_request(path)
+            assert call(router.get_handler(request)) == \
+                call(linear_lookup(router, request)), (paths, path)
+
+
+def test_typed_parameters():
+    router = build_router([
+        'wallet/{addr:address}/balance',
+        'item/{id:int}',
+        'item/{name}',
+        'item/{id:int}/{sub:int}.json',
+    ])
+    address = '0x' + 'aB' * 20
+    assert call(router.get_handler(make_request(
+        f'wallet/{address}/balance'
+    ))) == (0, {'addr': address.lower()}, {})
+    assert router.get_handler(make_request('wallet/0x12/balance')) is None
+
+    assert call(router.get_handler(make_request('item/42'))) == \
+        (1, {'id': 42}, {})
+    assert call(router.get_handler(make_request('item/x42'))) == \
+        (2, {'name': 'x42'}, {})
+    # Typed parameters in a regex route
+    assert call(router.get_handler(make_request('item/1/2.json'))) == \
+        (3, {'id': 1, 'sub': 2}, {})
+    for path in ['item/42', 'item/x42', 'item/1/2.json']:
+        request = make_request(path)
+        assert call(router.get_handler(request)) == \
+            call(linear_lookup(router, request))
+
+
+def test_unknown_parameter_type():
+    router = URLRouter()
+    with pytest.raises(ValueError):
+        router.advance('item/{id:float}')(route_handler(0))
+
+
+def test_injection_plan_built_once(monkeypatch):
+    calls = []
+    getfullargspec = inspect.getfullargspec
+
+    def counting_getfullargspec(func):
+        calls.append(func)
+        return getfullargspec(func)
+
+    monkeypatch.setattr(url.inspect, 'getfullargspec',
+                        counting_getfullargspec)
+
+    router = URLRouter()
+
+    @router.advance('a/{x}')
+    def handle(data: RollupData, params: URLParameters, *,
+               rollup: Rollup):
+        return rollup, data, params.path_params
+
+    @router.advance('b')
+    def handle_without_arguments():
+        return 'b'
+
+    assert len(calls) == 2
+    for _ in range(3):
+        handler = router.get_handler(make_request('a/1'))
+        assert handler('rollup', 'data') == ('rollup', 'data', {'x': '1'})
+        assert router.get_handler(make_request('b'))('rollup', 'data') == 'b'
+    assert len(calls) == 2
+
+
+def test_frozen_dapp_should_use_the_trie(monkeypatch):
+    paths = [f'balance/r{idx}/{{id}}' for idx in range(100)]
+    paths.insert(50, 'balance/{name}/7')
+    router = build_router(paths)
+    assert len(router.dispatch_routes()) == 1
+
+    dapp = DApp()
+    dapp.add_router(router)
+    dapp.freeze()
+
+    def fail(*args):
+        raise AssertionError('The routes should not be tried in order')
+    monkeypatch.setattr(url, '_match_route', fail)
+
+    for path in ('balance/r99/1', 'balance/r99/7', 'balance/r0/7', 'x'):
+        request = make_request(path)
+        expected = linear_lookup(router, make_request(path))
+        assert call(dapp._index.get_handler(request)) == call(expected)
@@ -1,4 +1,6 @@
 from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
 import inspect
 from itertools import chain
 import logging
@@ -9,7 +11,8 @@ from urllib.parse import parse_qs
 from pydantic import BaseModel
 
 from .base import Router
-from ..models import RollupResponse, RollupData
+from .index import REQUEST_TYPES, Route
+from ..models import RollupResponse, RollupData, _construct
 from ..rollup import Rollup
 
 LOGGER = logging.getLogger(__name__)
@@ -20,6 +23,28 @@ class URLParameters(BaseModel):
     query_params: dict
 
 
+@dataclass(frozen=True)
+class PathConverter:
+    """Type of a path parameter, declared as `{name:type}` in a template.
+
+    Attributes
+    ----------
+    regex : str
+        Regex matching the text of the parameter, within a path segment
+    convert : Callable[[str], Any]
+        Function converting the matched text into the parameter value
+    """
+    regex: str
+    convert: Callable[[str], typing.Any]
+
+
+CONVERTERS: dict[str, PathConverter] = {
+    'str': PathConverter('[^/]+', str),
+    'int': PathConverter('[0-9]+', int),
+    'address': PathConverter('0x[0-9a-fA-F]{40}', str.lower),
+}
+
+
 class URLOperation(BaseModel):
     path: str
     path_regex: re.Pattern
@@ -29,6 +54,8 @@ class URLOperation(BaseModel):
     namespace: str = ""
     summary: str | None = None
     description: str | None = None
+    converters: dict[str, Callable] = {}
+    invoker: Callable | None = None
 
 
 class URLRouter(Router):
@@ -36,6 +63,8 @@ class URLRouter(Router):
 
     def __init__(self):
         self.routes: list[URLOperation] = []
+        self._trie: _RouteTrie | None = None
+        self._indexed_count = None
 
     def advance(
         self,
@@ -56,10 +85,13 @@ class URLRouter(Router):
         - Rollup - the rollup object
         - RollupData - the raw data from the request
         - URLParameters - an object containing two attributes:
-            - path_params: A dict mapping a path parameter to its value as
-              string
+            - path_params: A dict mapping a path parameter to its value, as
+              string or converted according to its type
             - query_params: A dict mapping a query parameter name to a list
               of strings
+
+        Path parameters can declare a type, as in "data/{id:int}", and only
+        match text of that type. See `CONVERTERS` for the available types.
 """
         def decorator(func):
             operation = URLOperation(
@@ -71,6 +103,8 @@ class URLRouter(Router):
                 namespace=namespace,
                 summary=summary,
                 description=description,
+                converters=_path_converters(path),
+                invoker=_create_invoker(func),
             )
 
             self.routes.append(operation)
@@ -96,10 +130,13 @@ class URLRouter(Router):
         - Rollup - the rollup object
         - RollupData - the raw data from the request
         - URLParameters - an object containing two attributes:
-            - path_params: A dict mapping a path parameter to its value as
-              string
+            - path_params: A dict mapping a path parameter to its value, as
+              string or converted according to its type
             - query_params: A dict mapping a query parameter name to a list
               of strings
+
+        Path parameters can declare a type, as in "data/{id:int}", and only
+        match text of that type. See `CONVERTERS` for the available types.
         """
         def decorator(func):
             operation = URLOperation(
@@ -111,77 +148,132 @@ class URLRouter(Router):
                 namespace=namespace,
                 summary=summary,
                 description=description,
+                converters=_path_converters(path),
+                invoker=_create_invoker(func),
             )
             self.routes.append(operation)
             return func
         return decorator
 
     def get_handler(self, request: RollupResponse):
-        """Return first matching route for the given request"""
+        """Return first matching route for the given request.
+
+        Routes are looked up in a trie of path segments, so the lookup does
+        not depend on the number of routes. Paths that are not made of
+        static and `{param}` segments are matched with their regex.
+        """
         try:
             req_path = request.data.str_payload()
             LOGGER.debug("Looking for URL routes matching '%s'.", req_path)
         except Exception:
             return None
 
-        for route in self.routes:
-            if request.request_type != route.requestType:
-                continue
-
-            match, params = _match_url(route.path_regex, req_path)
-            if not match:
-                continue
-            LOGGER.info("Path '%s' matched route '%s'", req_path, repr(route))
-
-            return _create_handler(route.handler, params)
+        count = self.route_count()
+        if self._trie is None or self._indexed_count != count:
+            self._trie = _RouteTrie(self.routes)
+            self._indexed_count = count
 
+        path, _, querystring = req_path.partition('?')
+        found = self._trie.lookup(request.request_type, path)
+        if found is None:
+            return None
+        route, path_params = found
+        LOGGER.info("Path '%s' matched route '%r'", req_path, route)
+
+        params = _url_parameters(route, path_params, querystring)
+        return partial(route.invoker, params)
+
+    def route_count(self) -> int:
+        return len(self.routes)
+
+    def dispatch_routes(self) -> list[Route]:
+        # The trie already finds the first matching route of the router, so
+        # the dispatch index sees the router as a single route per request
+        # type, tried in its place
+        request_types = {route.requestType for route in self.routes}
+        return [
+            Route(match=self.get_handler, request_type=request_type)
+            for request_type in REQUEST_TYPES
+            if request_type in request_types
+        ]
+
+
+def _match_route(route: URLOperation, request: RollupResponse):
+    """Return a handler for the route if it matches the request"""
+    if request.request_type != route.requestType:
+        return None
+    try:
+        req_path = request.data.str_payload()
+    except Exception:
+        return None
 
-def _create_handler(route_handler, url_params: URLParameters):
-    """
-    Return a handler with the default router arguments, but applies additional
-    args to the user's function according to introspection
-    """
-    args = inspect.getfullargspec(route_handler)
+    path, _, querystring = req_path.partition('?')
+    match = route.path_regex.match(path)
+    if match is None:
+        return None
+    LOGGER.info("Path '%s' matched route '%r'", req_path, route)
 
-    def _handler(rollup: Rollup, data: RollupData):
-        kwargs = {}
-        for argname in chain(args.args, args.kwonlyargs):
-            argtype = args.annotations.get(argname)
-            if argtype is Rollup:
-                kwargs[argname] = rollup
-            elif argtype is RollupData:
-                kwargs[argname] = data
-            elif argtype is URLParameters:
-                kwargs[argname] = url_params
+    params = _url_parameters(route, match.groupdict(), querystring)
+    return partial(route.invoker, params)
 
-        return route_handler(**kwargs)
 
-    return _handler
+# Arguments a handler can request by annotation, by position in the
+# arguments of the invoker
+_INJECTED = ((URLParameters, 0), (Rollup, 1), (RollupData, 2))
 
 
-def _match_url(pattern, request_path: str):
-    """Tries to match the request_path against the pattern and extract the
-    parameters.
+def _create_invoker(route_handler):
     """
-    path, sep, querystring = request_path.partition('?')
-
-    match = pattern.match(path)
-    if match is None:
-        return (False, None)
+    Return a function that calls the user's function with the arguments it
+    requests by annotation.
 
+    The annotations are inspected once, when the route is registered. The
+    invoker is called as `invoker(url_params, rollup, data)`.
+    """
+    args = inspect.getfullargspec(route_handler)
+    plan = []
+    for argname in chain(args.args, args.kwonlyargs):
+        argtype = args.annotations.get(argname)
+        for injected_type, position in _INJECTED:
+            if argtype is injected_type:
+                plan.append((argname, position))
+                break
+    plan = tuple(plan)
+
+    def _invoker(url_params: URLParameters, rollup: Rollup,
+                 data: RollupData):
+        values = (url_params, rollup, data)
+        return route_handler(**{
+            argname: values[position] for argname, position in plan
+        })
+
+    return _invoker
+
+
+def _url_parameters(route: URLOperation, path_params: dict,
+                    querystring: str) -> URLParameters:
+    """Return the parameters of a request matched by the route, with the
+    path parameters converted to their types"""
+    for name, convert in route.converters.items():
+        path_params[name] = convert(path_params[name])
+    return _construct(URLParameters, {
+        'path_params': path_params,
+        'query_params': _parse_query(querystring),
+    })
+
+
+def _parse_query(querystring: str) -> dict:
+    if not querystring:
+        return {}
     try:
-        query_params = parse_qs(querystring)
+        return parse_qs(querystring)
     except ValueError:
-        query_params = {}
+        return {}
 
-    params = URLParameters(
-        path_params=match.groupdict(),
-        query_params=query_params
-    )
-    return (True, params)
 
-
-PARAM_REGEX = re.compile("{([a-zA-Z_][a-zA-Z0-9_]*)}")
+PARAM_REGEX = re.compile(
+    "{([a-zA-Z_][a-zA-Z0-9_]*)(?::([a-zA-Z_][a-zA-Z0-9_]*))?}"
+)
 
 
 def compile_path(path: str) -> typing.Pattern:
@@ -193,12 +285,179 @@ def compile_path(path: str) -> typing.Pattern:
     path_regex = "^"
     idx = 0
     for match in PARAM_REGEX.finditer(path):
-        param_name = match.groups()[0]
+        param_name, converter = match.groups()
 
         path_regex += re.escape(path[idx: match.start()])
-        path_regex += f"(?P<{param_name}>[^/]+)"
+        path_regex += f"(?P<{param_name}>{_get_converter(converter).regex})"
 
         idx = match.end()
 
     path_regex += path[idx:] + "$"
     return re.compile(path_regex)
+
+
+def _get_converter(name: str | None) -> PathConverter:
+    try:
+        return CONVERTERS[name or 'str']
+    except KeyError:
+        raise ValueError(f"Unknown path parameter type '{name}'") from None
+
+
+def _path_converters(path: str) -> dict[str, Callable]:
+    """Return the conversion function of each typed path parameter"""
+    converters = {}
+    for match in PARAM_REGEX.finditer(path):
+        param_name, converter = match.groups()
+        convert = _get_converter(converter).convert
+        if convert is not str:
+            converters[param_name] = convert
+    return converters
+
+
+_REGEX_CHARS = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+
+def _split_path(path: str) -> list[tuple[bool, str, str | None]] | None:
+    """Return the segments of a path template as `(is_param, text, type)`
+    triples, where the text of a parameter is its name.
+
+    Returns None if the template can only be matched by its regex: when a
+    parameter is only part of a segment, or when the text after the last
+    parameter, which `compile_path` does not escape, has regex characters.
+    """
+    tail = 0
+    for match in PARAM_REGEX.finditer(path):
+        tail = match.end()
+    if _REGEX_CHARS.search(path, tail):
+        return None
+
+    segments = []
+    for segment in path.split('/'):
+        match = PARAM_REGEX.fullmatch(segment)
+        if match is not None:
+            segments.append((True, match.group(1), match.group(2) or 'str'))
+        elif '{' in segment or '}' in segment:
+            return None
+        else:
+            segments.append((False, segment, None))
+    return segments
+
+
+class _TrieNode:
+    __slots__ = ('static', 'params', 'routes')
+
+    def __init__(self):
+        self.static: dict[str, _TrieNode] = {}
+        # Children for parameters, by type, as (type, pattern, node). The
+        # pattern is None for untyped parameters, matching any segment.
+        self.params: list[tuple[str, re.Pattern | None, _TrieNode]] = []
+        # Routes ending at this node, as (order, route, parameter names)
+        self.routes: list[tuple[int, URLOperation, list[str]]] = []
+
+
+class _RouteTrie:
+    """Trie of path segments of the routes, one per request type.
+
+    A segment is either static, matched exactly, or a `{param}`, matching
+    any non-empty segment, or only the segments of its type when typed.
+    Among the routes matching a path, the one registered first wins, as
+    when trying the routes in order. Routes that cannot be split into
+    segments are kept aside and matched with their regex, in registration
+    order.
+    """
+
+    def __init__(self, routes: list[URLOperation]):
+        self.roots: dict[str, _TrieNode] = {}
+        self.regex_routes: dict[str, list[tuple[int, URLOperation]]] = {}
+        self.routes = routes
+
+        for order, route in enumerate(routes):
+            segments = _split_path(route.path)
+            if segments is None:
+                self.regex_routes.setdefault(route.requestType, []).append(
+                    (order, route)
+                )
+                continue
+
+            node = self.roots.setdefault(route.requestType, _TrieNode())
+            names = []
+            for is_param, text, converter in segments:
+                if is_param:
+                    names.append(text)
+                    node = _param_child(node, converter)
+                else:
+                    node = node.static.setdefault(text, _TrieNode())
+            node.routes.append((order, route, names))
+
+    def lookup(self, request_type: str, path: str
+               ) -> tuple[URLOperation, dict] | None:
+        """Return the first route matching the path and its parameters"""
+        if path.endswith('\n'):
+            # '$' also matches before a trailing newline, which only the
+            # regexes know about
+            return self._scan(request_type, path)
+
+        best = None
+        root = self.roots.get(request_type)
+        if root is not None:
+            best = _find(root, path.split('/'), 0, [])
+
+        for order, route in self.regex_routes.get(request_type, ()):
+            if best is not None and order > best[0]:
+                break
+            match = route.path_regex.match(path)
+            if match is not None:
+                return route, match.groupdict()
+
+        if best is None:
+            return None
+        _, route, params = best
+        return route, params
+
+    def _scan(self, request_type: str, path: str):
+        for route in self.routes:
+            if route.requestType != request_type:
+                continue
+            match = route.path_regex.match(path)
+            if match is not None:
+                return route, match.groupdict()
+        return None
+
+
+def _find(node: _TrieNode, segments: list[str], idx: int, values: list):
+    """Return the first route matching the segments from `idx` on, as
+    `(order, route, params)`"""
+    if idx == len(segments):
+        if not node.routes:
+            return None
+        order, route, names = node.routes[0]
+        return order, route, dict(zip(names, values))
+
+    segment = segments[idx]
+    best = None
+    child = node.static.get(segment)
+    if child is not None:
+        best = _find(child, segments, idx + 1, values)
+    if not segment:
+        return best
+    for _, pattern, child in node.params:
+        if pattern is not None and pattern.fullmatch(segment) is None:
+            continue
+        values.append(segment)
+        found = _find(child, segments, idx + 1, values)
+        values.pop()
+        if found is not None and (best is None or found[0] < best[0]):
+            best = found
+    return best
+
+
+def _param_child(node: _TrieNode, converter: str) -> _TrieNode:
+    for name, _, child in node.params:
+        if name == converter:
+            return child
+    pattern = None
+    if converter != 'str':
+        pattern = re.compile(_get_converter(converter).regex)
+    child = _TrieNode()
+    node.params.append((converter, pattern, child))
+    return child
@@ -0,0 +1,106 @@
+"""
+State that is restored when an input is rejected
+
+The DApp begins a transaction on every journaled state before handling an
+input, and commits it if the input is accepted, or rolls it back if the
+input is rejected, the handler raises, or the input is an inspect. While
+the transaction is open, the states record the previous value of each key
+the first time it changes, so rolling back costs in proportion to the keys
+that changed, not to the size of the state.
+"""
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, MutableMapping
+
+_MISSING = object()
+
+
+class Journaled(ABC):
+    """State whose changes can be undone since the last `begin()`"""
+
+    @abstractmethod
+    def begin(self):
+        """Start recording the changes.
+
+        Raises RuntimeError if a transaction is already open.
+        """
+
+    @abstractmethod
+    def commit(self):
+        """Keep the changes made since `begin()` and stop recording"""
+
+    @abstractmethod
+    def rollback(self):
+        """Undo the changes made since `begin()` and stop recording.
+
+        Does nothing if no transaction is open.
+        """
+
+
+class JournaledDict(MutableMapping, Journaled):
+    """A dict whose changes are undone when the input is rejected.
+
+    Register it with `DApp.add_state()` to bind its transactions to the
+    inputs. Only assignments and deletions are recorded, so values should
+    be replaced instead of modified in place.
+
+    Examples
+    --------
+    >>> scores = dapp.add_state(JournaledDict())
+    >>> scores['alice'] = scores.get('alice', 0) + 1
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._data = dict(*args, **kwargs)
+        self._journal: dict | None = None
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        if self._journal is not None:
+            self._record(key)
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        if key not in self._data:
+            raise KeyError(key)
+        if self._journal is not None:
+            self._record(key)
+        del self._data[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self._data!r})'
+
+    def begin(self):
+        if self._journal is not None:
+            raise RuntimeError('A transaction is already open')
+        self._journal = {}
+
+    def commit(self):
+        self._journal = None
+
+    def rollback(self):
+        journal = self._journal
+        self._journal = None
+        if not journal:
+            return
+        data = self._data
+        for key, value in reversed(journal.items()):
+            if value is _MISSING:
+                data.pop(key, None)
+            else:
+                data[key] = value
+
+    def _record(self, key):
+        """Keep the value of a key before its first change"""
+        if key not in self._journal:
+            self._journal[key] = self._data.get(key, _MISSING)
@@ -194,3 +194,37 @@ def test_should_decode_lists():
     decoded = abi.decode_to_model(bytes.fromhex(ENCODED_LISTS), ModelWithLists)
     assert decoded.nums == [1, 2, 3]
     assert decoded.datas == [b'val1', b'val2']
+
+
+def test_should_cache_model_schema():
+    abi.clear_schema_cache()
+    schema = abi.get_model_schema(CompoundModel2)
+
+    assert schema.fields == ('message', 'keyvals')
+    assert schema.types == ('string', '(string,string)[]')
+    assert schema.nested[0] is None
+    assert schema.nested[1] == ('list', abi.get_model_schema(KeyVal))
+    assert schema.dependencies == {KeyVal}
+
+    assert abi.get_model_schema(CompoundModel2) is schema
+    model = CompoundModel2(message='', keyvals=[])
+    assert abi.get_model_schema(model) is schema
+    assert set(abi.cached_schemas()) == {CompoundModel2, KeyVal}
+
+
+def test_should_invalidate_dependent_schemas():
+    abi.get_model_schema(CompoundModel1)
+    abi.get_model_schema(CompoundModel2)
+    abi.get_model_schema(ModelWithLists)
+
+    abi.clear_schema_cache(KeyVal)
+    assert set(abi.cached_schemas()) == {ModelWithLists}
+
+    abi.clear_schema_cache()
+    assert abi.cached_schemas() == {}
+
+
+def test_should_not_cache_invalid_schema():
+    with raises(ValueError):
+        abi.get_model_schema(BogusABISpec1)
+    assert BogusABISpec1 not in abi.cached_schemas()
@@ -0,0 +1,176 @@
+import random
+from typing import Annotated
+
+from eth_abi.exceptions import InsufficientDataBytes, NonEmptyPaddingBytes
+from pydantic import BaseModel
+import pytest
+
+from . import abi
+
+np = pytest.importorskip('numpy')
+
+UInt24 = Annotated[int, abi.ABIType('uint24')]
+Int40 = Annotated[int, abi.ABIType('int40')]
+
+
+class Inner(BaseModel):
+    small: abi.UInt8
+    odd: UInt24
+
+
+class Record(BaseModel):
+    sender: abi.Address
+    amount: abi.UInt256
+    wide: abi.Int128
+    count: abi.UInt64
+    delta: abi.Int16
+    offset: Int40
+    flag: abi.Bool
+    tag: abi.Bytes4
+    inner: Inner
+
+
+class Deposit(BaseModel):
+    sender: abi.Address
+    amount: abi.UInt256
+    index: abi.UInt32
+    data: bytes
+
+
+def random_record(rand: random.Random) -> Record:
+    return Record(
+        sender='0x' + rand.randbytes(20).hex(),
+        amount=rand.getrandbits(256),
+        wide=rand.getrandbits(128) - 2**127,
+        count=rand.getrandbits(64),
+        delta=rand.getrandbits(16) - 2**15,
+        offset=rand.choice([-2**39, 2**39 - 1, rand.getrandbits(40) - 2**39]),
+        flag=rand.choice([True, False]),
+        tag=rand.randbytes(4),
+        inner=Inner(small=rand.getrandbits(8), odd=rand.getrandbits(24)),
+    )
+
+
+def as_row(columns: dict, idx: int) -> dict:
+    row = {}
+    for name, column in columns.items():
+        value = column[idx]
+        if column.dtype.kind == 'S':
+            value = column[idx:idx + 1].tobytes()
+        elif column.dtype.kind in 'iub':
+            value = value.item()
+        row[name] = value
+    return row
+
+
+def flatten(record: dict, prefix: str = '') -> dict:
+    result = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            result.update(flatten(value, f'{prefix}{key}.'))
+        else:
+            result[prefix + key] = value
+    return result
+
+
+def test_should_decode_columns_like_decode_to_model():
+    rand = random.Random(0)
+    records = [random_record(rand) for _ in range(200)]
+    payloads = [abi.encode_model(record) for record in records]
+
+    columns = abi.decode_batch(payloads, Record)
+    assert columns['sender'].dtype == np.dtype('S20')
+    assert columns['amount'].dtype == np.dtype(object)
+    assert columns['wide'].dtype == np.dtype(object)
+    assert columns['count'].dtype == np.uint64
+    assert columns['delta'].dtype == np.int16
+    assert columns['offset'].dtype == np.int64
+    assert columns['flag'].dtype == np.bool_
+    assert columns['tag'].dtype == np.dtype('S4')
+    assert columns['inner.small'].dtype == np.uint8
+    assert columns['inner.odd'].dtype == np.uint32
+
+    for idx, payload in enumerate(payloads):
+        expected = flatten(abi.decode_to_model(payload, Record).dict())
+        expected['sender'] = bytes.fromhex(expected['sender'][2:])
+        assert as_row(columns, idx) == expected
+
+
+def test_should_decode_packed_columns():
+    rand = random.Random(1)
+    deposits = [
+        Deposit(sender='0x' + rand.randbytes(20).hex(),
+                amount=rand.getrandbits(256), index=idx,
+                data=rand.randbytes(rand.randrange(10)))
+        for idx in range(50)
+    ]
+    payloads = [abi.encode_model(deposit, packed=True)
+                for deposit in deposits]
+
+    columns = abi.decode_batch(payloads, Deposit, packed=True)
+    assert list(columns['index']) == list(range(50))
+    assert columns['index'].dtype == np.uint32
+    assert list(columns['amount']) == [d.amount for d in deposits]
+    assert list(columns['data']) == [d.data for d in deposits]
+    assert columns['sender'][3:4].tobytes().hex() == deposits[3].sender[2:]
+
+
+@pytest.mark.parametrize('amounts', [
+    [0, 0],
+    [1, 2**64 - 1],
+    [2**64, 1],
+    [2**200 + 5, 2**256 - 1],
+])
+def test_should_decode_wide_integers(amounts):
+    payloads = [(amount).to_bytes(32, 'big') for amount in amounts]
+
+    class Amount(BaseModel):
+        amount: abi.UInt256
+
+    columns = abi.decode_batch(payloads, Amount)
+    assert list(columns['amount']) == amounts
+    assert all(type(value) is int for value in columns['amount'])
+
+
+def test_should_decode_empty_batch():
+    columns = abi.decode_batch([], Record)
+    assert all(len(column) == 0 for column in columns.values())
+
+
+@pytest.mark.parametrize('pos,value', [
+    (32 * 0, 1),        # address padding
+    (32 * 2, 0x7f),     # int128 sign extension
+    (32 * 3 + 23, 1),   # uint64 padding
+    (32 * 5 + 26, 0),   # int40 sign extension of a negative value
+    (32 * 6 + 31, 2),   # bool value
+    (32 * 7 + 4, 1),    # bytes4 padding
+])
+def test_should_reject_invalid_padding(pos, value):
+    record = random_record(random.Random(2))
+    record.offset = -1
+    payloads = [abi.encode_model(record)] * 3
+    corrupted = bytearray(payloads[1])
+    corrupted[pos] = value
+    payloads[1] = bytes(corrupted)
+
+    with pytest.raises(NonEmptyPaddingBytes, match='payload 1'):
+        abi.decode_batch(payloads, Record)
+    with pytest.raises(NonEmptyPaddingBytes):
+        abi.decode_to_model(payloads[1], Record)
+
+
+def test_should_reject_short_payloads():
+    payload = abi.encode_model(random_record(random.Random(3)))
+    with pytest.raises(InsufficientDataBytes, match='payload 1'):
+        abi.decode_batch([payload, payload[:-1]], Record)
+
+
+def test_should_reject_dynamic_models():
+    with pytest.raises(ValueError):
+        abi.decode_batch([], Deposit)
+
+    class WithList(BaseModel):
+        values: list[abi.UInt256]
+
+    with pytest.raises(ValueError):
+        abi.decode_batch([], WithList, packed=True)
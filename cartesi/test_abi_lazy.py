@@ -0,0 +1,120 @@
+import random
+
+import eth_abi
+from eth_abi.exceptions import InsufficientDataBytes, NonEmptyPaddingBytes
+from pydantic import BaseModel
+import pytest
+
+from . import abi
+
+
+class Item(BaseModel):
+    name: str
+    values: list[abi.UInt64]
+    owner: abi.Address
+
+
+class Point(BaseModel):
+    x: abi.Int32
+    y: abi.Int32
+
+
+class Document(BaseModel):
+    title: str
+    flag: abi.Bool
+    point: Point
+    numbers: list[abi.UInt256]
+    items: list[Item]
+    points: list[Point]
+    tag: abi.Bytes4
+    data: bytes
+
+
+def random_document(rand: random.Random) -> Document:
+    return Document(
+        title=''.join(rand.choice('abç') for _ in range(rand.randrange(40))),
+        flag=rand.choice([True, False]),
+        point=Point(x=rand.getrandbits(31), y=-rand.getrandbits(31)),
+        numbers=[rand.getrandbits(256) for _ in range(rand.randrange(20))],
+        items=[
+            Item(
+                name=str(rand.random()),
+                values=[rand.getrandbits(64)
+                        for _ in range(rand.randrange(5))],
+                owner='0x' + rand.randbytes(20).hex(),
+            )
+            for _ in range(rand.randrange(5))
+        ],
+        points=[Point(x=idx, y=-idx) for idx in range(rand.randrange(5))],
+        tag=rand.randbytes(4),
+        data=rand.randbytes(rand.randrange(70)),
+    )
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_lazy_view_should_match_decoded_model(seed):
+    document = random_document(random.Random(seed))
+    data = abi.encode_model(document)
+    view = abi.decode_lazy(data, Document)
+
+    assert view.data == document.data
+    assert view.title == document.title
+    assert view.flag == document.flag
+    assert view.point.y == document.point.y
+    assert list(view.numbers) == document.numbers
+    assert len(view.items) == len(document.items)
+    for lazy_item, item in zip(view.items, document.items):
+        assert lazy_item.owner == item.owner
+        assert list(lazy_item.values) == item.values
+        assert lazy_item.name == item.name
+    assert [p.x for p in view.points] == [p.x for p in document.points]
+    assert view.tag == document.tag
+    assert view.to_model() == abi.decode_to_model(data, Document)
+
+
+def test_lazy_array_should_behave_as_sequence():
+    numbers = list(range(100))
+    data = eth_abi.encode(['uint256[]'], [numbers])
+
+    class Numbers(BaseModel):
+        numbers: list[abi.UInt256]
+
+    view = abi.decode_lazy(data, Numbers).numbers
+    assert len(view) == 100
+    assert view[0] == 0
+    assert view[-1] == 99
+    assert list(view[10:20]) == numbers[10:20]
+    assert list(view[::-7]) == numbers[::-7]
+    assert list(view[90:][::2][1:]) == numbers[90:][::2][1:]
+    assert view[50:60][-1] == 59
+    assert 42 in view
+    with pytest.raises(IndexError):
+        view[100]
+
+
+def test_should_decode_only_accessed_fields():
+    document = random_document(random.Random(0))
+    data = bytearray(abi.encode_model(document))
+    # Corrupt the padding of the flag, which is never accessed
+    data[32] = 1
+    view = abi.decode_lazy(bytes(data), Document)
+
+    assert view.title == document.title
+    with pytest.raises(NonEmptyPaddingBytes):
+        view.flag
+
+
+def test_should_raise_on_truncated_data():
+    data = eth_abi.encode(['uint256[]'], [list(range(10))])
+
+    class Numbers(BaseModel):
+        numbers: list[abi.UInt256]
+
+    with pytest.raises(InsufficientDataBytes):
+        abi.decode_lazy(data[:-32], Numbers).numbers
+
+
+def test_should_raise_on_unknown_field():
+    view = abi.decode_lazy(abi.encode_model(Point(x=1, y=2)), Point)
+    with pytest.raises(AttributeError):
+        view.z
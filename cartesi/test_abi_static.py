@@ -0,0 +1,150 @@
+import random
+
+import eth_abi
+from pydantic import BaseModel, Field, ValidationError, validator
+import pytest
+
+from . import abi
+
+
+class Static(BaseModel):
+    amount: abi.UInt256
+    small: abi.UInt8
+    delta: abi.Int
+    offset: abi.Int32
+    flag: abi.Bool
+    owner: abi.Address
+    tag: abi.Bytes4
+    key: abi.Bytes32
+
+
+class Inner(BaseModel):
+    key: abi.Bytes32
+    value: abi.UInt64
+
+
+class Nested(BaseModel):
+    owner: abi.Address
+    inner: Inner
+    flag: abi.Bool
+
+
+class Validated(BaseModel):
+    amount: abi.UInt256
+
+    @validator('amount')
+    def double(cls, value):
+        return value * 2
+
+
+class Constrained(BaseModel):
+    amount: abi.UInt256 = Field(gt=0)
+
+
+class Dynamic(BaseModel):
+    owner: abi.Address
+    data: abi.Bytes
+
+
+def random_values(rand: random.Random) -> dict:
+    return {
+        'amount': rand.choice([0, 1, 2**256 - 1, rand.getrandbits(256)]),
+        'small': rand.choice([0, 255, rand.getrandbits(8)]),
+        'delta': rand.choice([-2**255, 2**255 - 1, -1,
+                              rand.getrandbits(255) - 2**254]),
+        'offset': rand.choice([-2**31, 2**31 - 1, rand.getrandbits(31)]),
+        'flag': rand.choice([True, False]),
+        'owner': '0x' + rand.randbytes(20).hex(),
+        'tag': rand.randbytes(rand.randint(0, 4)),
+        'key': rand.randbytes(32),
+    }
+
+
+def generic_encode(obj):
+    schema = abi.get_model_schema(obj)
+    return eth_abi.encode(schema.types, abi._get_values_from_model(obj))
+
+
+def generic_decode(model, data):
+    schema = abi.get_model_schema(model)
+    return abi._parse_to_model(model, eth_abi.decode(schema.types, data))
+
+
+def outcome(func, *args):
+    try:
+        return ('ok', func(*args))
+    except Exception as exc:
+        return (type(exc), str(exc))
+
+
+def test_should_compile_static_models():
+    assert abi.get_model_schema(Static).encoder is not None
+    assert abi.get_model_schema(Nested).decoder is not None
+    assert abi.get_model_schema(Validated).decoder is not None
+    assert abi.get_model_schema(Dynamic).encoder is None
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_should_match_eth_abi(seed):
+    rand = random.Random(seed)
+    obj = Static(**random_values(rand))
+
+    encoded = abi.encode_model(obj)
+    assert encoded == generic_encode(obj)
+    assert abi.decode_to_model(encoded, Static) == generic_decode(Static,
+                                                                  encoded)
+    assert abi.decode_to_model(encoded, Static) == Static(
+        **dict(obj, tag=obj.tag.ljust(4, b'\x00'))
+    )
+
+    nested = Nested(owner=obj.owner, flag=obj.flag,
+                    inner=Inner(key=obj.key, value=rand.getrandbits(64)))
+    encoded = abi.encode_model(nested)
+    assert encoded == generic_encode(nested)
+    assert abi.decode_to_model(encoded, Nested) == nested
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_should_match_eth_abi_on_malformed_data(seed):
+    rand = random.Random(seed)
+    data = bytearray(abi.encode_model(Static(**random_values(rand))))
+    # Flip a random byte, which may break padding or the range of a value
+    pos = rand.randrange(len(data))
+    data[pos] = rand.getrandbits(8)
+    data = bytes(data[:rand.choice([len(data), pos])])
+
+    assert outcome(abi.decode_to_model, data, Static) == \
+        outcome(generic_decode, Static, data)
+
+
+@pytest.mark.parametrize('field,value', [
+    ('amount', -1),
+    ('amount', 2**256),
+    ('small', 256),
+    ('offset', 2**31),
+    ('flag', 1),
+    ('owner', '0x' + '1' * 39),
+    ('owner', '0xAbCdEF' + '0' * 34),
+    ('owner', '0x8ba1f109551bD432803012645Ac136ddd64DBA72'),
+    ('owner', '12' * 20),
+    ('tag', b'12345'),
+    ('tag', bytearray(b'1')),
+])
+def test_should_match_eth_abi_on_invalid_values(field, value):
+    obj = Static(**random_values(random.Random(0)))
+    object.__setattr__(obj, '__dict__', dict(obj.__dict__, **{field: value}))
+
+    assert outcome(abi.encode_model, obj) == outcome(generic_encode, obj)
+
+
+def test_should_validate_models_with_validators():
+    decoded = abi.decode_to_model(abi.encode_model(Validated(amount=1)),
+                                  Validated)
+    assert decoded.amount == 4
+
+
+def test_should_validate_constrained_fields():
+    data = abi.encode_model(Constrained(amount=1))
+    assert abi.decode_to_model(data, Constrained).amount == 1
+    with pytest.raises(ValidationError):
+        abi.decode_to_model(bytes(32), Constrained)
@@ -0,0 +1,158 @@
+import io
+import random
+
+import eth_abi
+from eth_abi.exceptions import EncodingTypeError, ValueOutOfBounds
+from Crypto.Hash import keccak
+from pydantic import BaseModel
+import pytest
+
+from . import abi
+from .notices import create_notice_from_model
+from .vouchers import create_voucher_from_model
+
+
+class Item(BaseModel):
+    name: str
+    values: list[abi.UInt64]
+    owner: abi.Address
+
+
+class Point(BaseModel):
+    x: abi.Int32
+    y: abi.Int32
+
+
+class Document(BaseModel):
+    title: str
+    flag: abi.Bool
+    point: Point
+    numbers: list[abi.UInt256]
+    items: list[Item]
+    points: list[Point]
+    tag: abi.Bytes4
+    data: bytes
+
+
+def random_document(rand: random.Random) -> Document:
+    return Document(
+        title=''.join(rand.choice('abç') for _ in range(rand.randrange(40))),
+        flag=rand.choice([True, False]),
+        point=Point(x=rand.getrandbits(31), y=-rand.getrandbits(31)),
+        numbers=[rand.getrandbits(256) for _ in range(rand.randrange(20))],
+        items=[
+            Item(
+                name=str(rand.random()),
+                values=[rand.getrandbits(64)
+                        for _ in range(rand.randrange(5))],
+                owner='0x' + rand.randbytes(20).hex(),
+            )
+            for _ in range(rand.randrange(5))
+        ],
+        points=[Point(x=idx, y=-idx) for idx in range(rand.randrange(5))],
+        tag=rand.randbytes(4),
+        data=rand.randbytes(rand.randrange(70)),
+    )
+
+
+def reference_encode(obj) -> bytes:
+    schema = abi.get_model_schema(obj)
+    return eth_abi.encode(schema.types, abi._get_values_from_model(obj))
+
+
+def test_encode_matches_eth_abi():
+    rand = random.Random(15)
+    for _ in range(200):
+        doc = random_document(rand)
+        expected = reference_encode(doc)
+
+        buffer = bytearray()
+        assert abi.encode_model_into(doc, buffer) == len(expected)
+        assert buffer == expected
+        assert abi.encode_model(doc) == expected
+        assert abi.encoded_size(doc) == len(expected)
+
+
+def test_encode_appends_to_buffer():
+    doc = random_document(random.Random(1))
+    expected = reference_encode(doc)
+
+    buffer = bytearray(b'\x01\x02')
+    abi.encode_model_into(doc, buffer)
+    abi.encode_model_into(doc, buffer)
+    assert buffer == b'\x01\x02' + expected + expected
+
+
+def test_encode_into_file():
+    doc = random_document(random.Random(2))
+    sink = io.BytesIO()
+    size = abi.encode_model_into(doc, sink)
+    assert sink.getvalue() == reference_encode(doc)
+    assert size == len(sink.getvalue())
+
+
+@pytest.mark.parametrize('model', [Point(x=1, y=-2),
+                                   Item(name='a', values=[1], owner='0x' +
+                                        '12' * 20)])
+@pytest.mark.parametrize('packed', [False, True])
+def test_encode_into_static_and_packed(model, packed):
+    expected = abi.encode_model(model, packed=packed)
+    buffer = bytearray()
+    assert abi.encode_model_into(model, buffer, packed=packed) == \
+        len(expected)
+    assert buffer == expected
+
+    sink = io.BytesIO()
+    abi.encode_model_into(model, sink, packed=packed)
+    assert sink.getvalue() == expected
+
+
+def test_shared_values():
+    # The same objects appear several times in the model
+    item = Item(name='shared', values=[1, 2, 3], owner='0x' + '00' * 20)
+    doc = Document(title='shared', flag=True, point=Point(x=0, y=0),
+                   numbers=[], items=[item, item, item], points=[],
+                   tag=b'abcd', data=b'shared')
+    doc.items[1].values = doc.items[0].values
+    assert abi.encode_model(doc) == reference_encode(doc)
+
+
+@pytest.mark.parametrize('field,value,error', [
+    ('title', b'title', EncodingTypeError),
+    ('data', 'data', EncodingTypeError),
+    ('numbers', [2**256], ValueOutOfBounds),
+    ('numbers', 5, EncodingTypeError),
+    ('tag', b'abcde', ValueOutOfBounds),
+])
+def test_encode_errors(field, value, error):
+    doc = random_document(random.Random(3))
+    setattr(doc, field, value)
+    with pytest.raises(error):
+        reference_encode(doc)
+
+    buffer = bytearray(b'head')
+    with pytest.raises(error):
+        abi.encode_model_into(doc, buffer)
+    # The buffer is left as it was
+    assert buffer == b'head'
+
+
+def test_voucher_payload():
+    doc = random_document(random.Random(4))
+    voucher = create_voucher_from_model('0x' + '34' * 20, 'store', doc)
+
+    types = abi.get_abi_types_from_model(Document)
+    sig_hash = keccak.new(digest_bits=256)
+    sig_hash.update(f'store({",".join(types)})'.encode('utf-8'))
+    expected = sig_hash.digest()[:4] + reference_encode(doc)
+    assert voucher == {
+        'destination': '0x' + '34' * 20,
+        'payload': '0x' + expected.hex(),
+    }
+
+
+def test_notice_payload():
+    doc = random_document(random.Random(5))
+    assert create_notice_from_model(doc) == '0x' + reference_encode(doc).hex()
+    assert create_notice_from_model(doc.point, packed=True) == \
+        '0x' + abi.encode_model(doc.point, packed=True).hex()
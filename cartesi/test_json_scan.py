@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+from . import models
+from ._json_scan import ObjectScanner
+from .models import RollupData
+
+
+def values(text: str, keys) -> dict:
+    scanner = ObjectScanner(text)
+    return {key: scanner.value(key) for key in scanner.find(keys)}
+
+
+@pytest.mark.parametrize('doc', [
+    {},
+    {'op': 'x'},
+    {'op': 'x', 'data': 'a' * 1000, 'n': -1.5e3, 'flag': True, 'z': None},
+    {'items': [{'op': 1}, {'op': [2, '}']}], 'op': 'last'},
+    {'é': 'ü', 'op': '"quoted" \\ value'},
+    {'op': {'nested': {'deep': [1, 2, {'op': 3}]}}},
+])
+@pytest.mark.parametrize('indent', [None, 2])
+def test_scan_matches_json_loads(doc, indent):
+    text = json.dumps(doc, indent=indent)
+    keys = list(doc) + ['missing']
+    assert values(text, keys) == doc
+    for key in doc:
+        assert values(text, [key]) == {key: doc[key]}
+
+
+@pytest.mark.parametrize('text', [
+    '{"op": 1, "op": 2}',
+    '{"op": 1, "data": [1, 2], "op": 2}',
+    '{"op": 1, "data": "x\\"y", "o\\u0070": 2}',
+    '{"a/b": 1, "a\\/b": 2}',
+    '{"é": 1, "\\u00e9": 2}',
+    '{"é": 1, "é": 2}',
+])
+def test_last_duplicate_wins(text):
+    assert values(text, json.loads(text).keys()) == json.loads(text)
+
+
+def test_stops_at_found_keys():
+    text = '{"op": "x", "data": [1, 2, 3], "rest": oops}'
+    assert values(text, ['op']) == {'op': 'x'}
+    with pytest.raises(ValueError):
+        values(text, ['rest'])
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    '[1, 2]',
+    '"x"',
+    '{"op" 1, "x": 1}',
+    '{"op": 1,, "x": 1}',
+    '{"op": tru, "x": 1}',
+    '{"op": [1, 2}, "x": 1}',
+    '{op: 1, "x": 1}',
+    '{"op": 1} "x"',
+])
+def test_malformed(text):
+    with pytest.raises(ValueError):
+        values(text, ['x'])
+
+
+def test_missing_keys_without_scanning():
+    # Keys that do not appear in the rest of the text are missing, even if
+    # the rest is malformed
+    assert values('{"op": 1, "data": oops}', ['op', 'x']) == {'op': 1}
+
+
+def make_data(doc) -> RollupData:
+    text = doc if isinstance(doc, str) else json.dumps(doc)
+    return RollupData(payload='0x' + text.encode('utf-8').hex())
+
+
+@pytest.mark.parametrize('size', [0, 10**6])
+def test_json_fields(monkeypatch, size):
+    monkeypatch.setattr(models, 'SCAN_JSON_SIZE', size)
+    data = make_data({'op': 'x', 'list': [1, 2]})
+    assert data.json_fields(['op', 'missing']) == {'op': 'x'}
+    assert data.json_fields(['list']) == {'list': [1, 2]}
+
+    for doc in ['[1, 2]', 'not json', '"op"']:
+        with pytest.raises(ValueError):
+            make_data(doc).json_fields(['op'])
+
+
+def test_json_fields_does_not_parse_large_payloads(monkeypatch):
+    doc = {'op': 'x', 'items': list(range(5000))}
+    data = make_data(doc)
+    loads = []
+    json_loads = json.loads
+    monkeypatch.setattr(models.json, 'loads',
+                        lambda text: loads.append(text) or json_loads(text))
+
+    assert data.json_fields(['op']) == {'op': 'x'}
+    assert loads == []
+    assert data.json_payload() == doc
+    assert len(loads) == 1
+
+    # Once parsed, the document is used for the fields
+    assert data.json_fields(['op', 'items']) == doc
+
+    # Changing the payload drops the scanned spans
+    data.payload = '0x' + json.dumps({'op': 'y'}).encode().hex()
+    assert data.json_fields(['op']) == {'op': 'y'}
@@ -0,0 +1,128 @@
+import json
+
+from pydantic import ValidationError
+from pytest import raises
+
+from .models import RollupData, RollupResponse, parse_rollup_response
+
+
+def make_data(payload: bytes) -> RollupData:
+    return RollupData(payload='0x' + payload.hex())
+
+
+def test_should_decode_payload_once():
+    data = make_data(json.dumps({'op': 'x'}).encode('utf-8'))
+
+    assert data.bytes_payload() is data.bytes_payload()
+    assert data.str_payload() is data.str_payload()
+    assert data.json_payload() is data.json_payload()
+    assert data.json_payload() == {'op': 'x'}
+
+
+def test_memoryview_should_not_copy():
+    data = make_data(b'\x01\x02\x03')
+    view = data.memoryview_payload()
+
+    assert view.readonly
+    assert view.obj is data.bytes_payload()
+    assert view[1:].tobytes() == b'\x02\x03'
+
+
+def test_should_cache_errors():
+    data = RollupData(payload='0xzz')
+    for _ in range(2):
+        with raises(ValueError):
+            data.bytes_payload()
+
+    data = make_data(b'\xff')
+    for _ in range(2):
+        with raises(UnicodeDecodeError):
+            data.str_payload()
+
+    data = make_data(b'not json')
+    for _ in range(2):
+        with raises(json.JSONDecodeError):
+            data.json_payload()
+
+
+def test_should_cache_json_null():
+    data = make_data(b'null')
+    assert data.json_payload() is None
+    assert data.json_payload() is None
+
+
+def test_should_invalidate_cache_when_payload_changes():
+    data = make_data(b'abc')
+    assert data.str_payload() == 'abc'
+
+    data.payload = '0x' + b'def'.hex()
+    assert data.bytes_payload() == b'def'
+    assert data.str_payload() == 'def'
+
+
+def test_should_not_copy_cache_with_new_payload():
+    data = make_data(b'{"a": 1}')
+    assert data.json_payload() == {'a': 1}
+
+    copy = data.copy(update={'payload': '0x' + b'[2]'.hex()})
+    assert copy.bytes_payload() == b'[2]'
+    assert copy.str_payload() == '[2]'
+    assert copy.json_payload() == [2]
+    assert data.json_payload() == {'a': 1}
+    assert data.copy(deep=True).str_payload() == '{"a": 1}'
+
+
+def test_cache_is_not_shared_between_requests():
+    obj = {
+        'request_type': 'inspect_state',
+        'data': {'payload': '0x' + b'abc'.hex()},
+    }
+    first = RollupResponse.parse_obj(obj)
+    second = RollupResponse.parse_obj(obj)
+    first.data.payload = '0x' + b'def'.hex()
+
+    assert first.data.str_payload() == 'def'
+    assert second.data.str_payload() == 'abc'
+
+
+ADVANCE_RESPONSE = {
+    'request_type': 'advance_state',
+    'data': {
+        'metadata': {
+            'msg_sender': '0xdeadbeef7dc51b33c9a3e4a21ae053daa1872810',
+            'epoch_index': 0,
+            'input_index': 1,
+            'block_number': 2,
+            'timestamp': 3,
+        },
+        'payload': '0x' + b'abc'.hex(),
+    },
+}
+
+
+def test_fast_parse_should_match_strict_parse():
+    content = json.dumps(ADVANCE_RESPONSE).encode('utf-8')
+
+    fast = parse_rollup_response(content)
+    strict = parse_rollup_response(content, strict=True)
+
+    assert isinstance(fast, RollupResponse)
+    assert fast == strict
+    assert fast.data.metadata.input_index == 1
+    assert fast.data.str_payload() == 'abc'
+
+
+def test_fast_parse_inspect_without_metadata():
+    response = parse_rollup_response(
+        '{"request_type": "inspect_state", "data": {"payload": "0x00"}}'
+    )
+    assert response.data.metadata is None
+    assert response.data.bytes_payload() == b'\x00'
+
+
+def test_fast_parse_should_validate_malformed_responses():
+    with raises(ValidationError):
+        parse_rollup_response({'request_type': 'advance_state', 'data': {}})
+
+    with raises(ValidationError):
+        parse_rollup_response({'data': {'payload': None}})
@@ -0,0 +1,152 @@
+import random
+
+from eth_abi.exceptions import (
+    DecodingError,
+    EncodingError,
+    InsufficientDataBytes,
+    NonEmptyPaddingBytes,
+)
+import eth_abi.packed
+import pytest
+
+from . import _packed
+
+ADDRESS = '0x' + '1f' * 20
+CHECKSUM_ADDRESS = '0x8ba1f109551bD432803012645Ac136ddd64DBA72'
+
+
+def random_value(rand: random.Random, abi_type: str):
+    if abi_type.startswith('uint'):
+        bits = int(abi_type[4:] or 256)
+        return rand.choice([0, 2**bits - 1, rand.getrandbits(bits)])
+    if abi_type.startswith('int'):
+        bits = int(abi_type[3:] or 256)
+        return rand.getrandbits(bits) - 2**(bits - 1)
+    if abi_type == 'bool':
+        return rand.choice([True, False])
+    if abi_type == 'address':
+        return '0x' + rand.randbytes(20).hex()
+    if abi_type == 'string':
+        return ''.join(rand.choice('abcçã€') for _ in range(rand.randrange(9)))
+    if abi_type == 'bytes':
+        return rand.randbytes(rand.randrange(100))
+    size = int(abi_type[5:])
+    return rand.randbytes(size)
+
+
+SCALARS = [
+    'uint8', 'uint16', 'uint64', 'uint128', 'uint256', 'uint',
+    'int8', 'int32', 'int256', 'int',
+    'bool', 'address', 'bytes1', 'bytes4', 'bytes20', 'bytes32',
+]
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_should_encode_like_eth_abi(seed):
+    rand = random.Random(seed)
+    types = rand.sample(SCALARS, 6) + [rand.choice(['bytes', 'string'])]
+    values = [random_value(rand, abi_type) for abi_type in types]
+
+    encoded = _packed.encode_packed(types, values)
+    assert encoded == eth_abi.packed.encode_packed(types, values)
+    assert _packed.decode_packed(types, encoded) == tuple(values)
+
+
+def test_should_encode_tuples_like_eth_abi():
+    types = ['(uint8,(bool,address))', 'bytes2']
+    values = [(7, (True, ADDRESS)), b'ab']
+
+    encoded = _packed.encode_packed(types, values)
+    assert encoded == eth_abi.packed.encode_packed(types, values)
+    assert _packed.decode_packed(types, encoded) == tuple(values)
+
+
+def test_should_pad_array_elements():
+    types = ['uint8[2]', 'address', 'bool[]']
+    values = [(1, 2), ADDRESS, (True, False, True)]
+
+    encoded = _packed.encode_packed(types, values)
+    assert encoded == b''.join([
+        (1).to_bytes(32, 'big'),
+        (2).to_bytes(32, 'big'),
+        bytes.fromhex(ADDRESS[2:]),
+        (1).to_bytes(32, 'big'),
+        bytes(32),
+        (1).to_bytes(32, 'big'),
+    ])
+    assert _packed.decode_packed(types, encoded) == tuple(values)
+
+
+def test_should_decode_portal_payloads():
+    token = '0x' + '22' * 20
+    erc20 = (
+        b'\x01' + bytes.fromhex(token[2:]) + bytes.fromhex(ADDRESS[2:])
+        + (10**18).to_bytes(32, 'big') + b'extra'
+    )
+    assert _packed.decode_packed(
+        ['bool', 'address', 'address', 'uint256', 'bytes'],
+        erc20,
+    ) == (True, token, ADDRESS, 10**18, b'extra')
+
+    trailer = eth_abi.encode(['uint256[]', 'uint256[]', 'bytes', 'bytes'],
+                             [[1, 2], [10, 20], b'', b''])
+    batch = bytes.fromhex(token[2:] + ADDRESS[2:]) + trailer
+    assert _packed.decode_packed(['address', 'address', 'bytes'], batch) == \
+        (token, ADDRESS, trailer)
+
+
+def test_should_accept_checksum_addresses():
+    encoded = _packed.encode_packed(['address'], [CHECKSUM_ADDRESS])
+    assert encoded == bytes.fromhex(CHECKSUM_ADDRESS[2:])
+
+    with pytest.raises(EncodingError):
+        _packed.encode_packed(['address'], [CHECKSUM_ADDRESS.swapcase()])
+
+
+@pytest.mark.parametrize('abi_type,value', [
+    ('uint8', 256),
+    ('uint8', -1),
+    ('uint256', True),
+    ('int8', 128),
+    ('bool', 1),
+    ('address', '0x1234'),
+    ('bytes2', b'abc'),
+    ('bytes', 'abc'),
+    ('string', b'abc'),
+    ('uint8[2]', [1]),
+    ('uint8[2]', [1, 256]),
+])
+def test_should_reject_invalid_values(abi_type, value):
+    with pytest.raises(EncodingError):
+        _packed.encode_packed([abi_type], [value])
+    with pytest.raises(EncodingError):
+        eth_abi.packed.encode_packed([abi_type], [value])
+
+
+@pytest.mark.parametrize('types,data,error', [
+    (['uint256'], bytes(31), InsufficientDataBytes),
+    (['address', 'bytes'], bytes(19), InsufficientDataBytes),
+    (['bool'], b'\x02', NonEmptyPaddingBytes),
+    (['uint8[1]'], (256).to_bytes(32, 'big'), NonEmptyPaddingBytes),
+    (['address[1]'], b'\x01' * 32, NonEmptyPaddingBytes),
+    (['bytes1[1]'], b'\x01' * 32, NonEmptyPaddingBytes),
+    (['uint256[]'], bytes(33), DecodingError),
+])
+def test_should_reject_invalid_data(types, data, error):
+    with pytest.raises(error):
+        _packed.decode_packed(types, data)
+
+
+@pytest.mark.parametrize('types', [
+    ['bytes', 'uint256'],
+    ['string', 'bool'],
+    ['uint256[]', 'address'],
+    ['uint7'],
+    ['bytes33'],
+    ['(uint8,bytes)'],
+    ['uint8[2][2]'],
+    ['fixed128x18'],
+])
+def test_should_reject_unsupported_layouts(types):
+    with pytest.raises(ValueError):
+        _packed.compile_decoder(tuple(types))
@@ -0,0 +1,51 @@
+from pytest import approx, raises
+
+from .polling import IdlePolicy
+
+
+def test_should_back_off_exponentially_up_to_max():
+    policy = IdlePolicy(initial_delay=0.01, max_delay=0.05, factor=2,
+                        jitter=0)
+    delays = [policy.on_idle() for _ in range(5)]
+    assert delays == approx([0.01, 0.02, 0.04, 0.05, 0.05])
+    assert policy.stats.idle_polls == 5
+    assert policy.stats.idle_time == approx(0.17)
+
+
+def test_should_reset_on_input():
+    policy = IdlePolicy(initial_delay=0.01, max_delay=1, factor=3, jitter=0)
+    policy.on_idle()
+    policy.on_idle()
+    policy.on_input()
+
+    assert policy.stats.wakeups == 1
+    assert policy.stats.last_wake_latency == approx(0.03)
+    assert policy.on_idle() == approx(0.01)
+
+
+def test_input_without_idle_poll_is_not_a_wakeup():
+    policy = IdlePolicy()
+    policy.on_input()
+    assert policy.stats.wakeups == 0
+
+
+def test_should_apply_jitter():
+    policy = IdlePolicy(initial_delay=0.1, max_delay=1, jitter=0.5,
+                        rand=lambda: 0.0)
+    assert policy.on_idle() == approx(0.05)
+
+    policy = IdlePolicy(initial_delay=0.1, max_delay=0.1, jitter=0.5,
+                        rand=lambda: 0.999)
+    assert policy.on_idle() == approx(0.1)
+
+
+def test_spin_policy():
+    policy = IdlePolicy(initial_delay=0, max_delay=0)
+    assert [policy.on_idle() for _ in range(3)] == [0, 0, 0]
+
+
+def test_should_validate_parameters():
+    with raises(ValueError):
+        IdlePolicy(factor=0.5)
+    with raises(ValueError):
+        IdlePolicy(jitter=2)
@@ -0,0 +1,179 @@
+import asyncio
+
+import pytest
+
+from .dapp import DApp
+from .models import RollupResponse
+from .router import MultiRouter
+from .state import JournaledDict
+from .testclient import TestClient
+from .wallet.ledger import Ledger
+
+
+def test_should_undo_the_changes_on_rollback():
+    state = JournaledDict({'a': 1, 'b': 2, 'c': 3})
+    state.begin()
+    state['a'] = 10
+    state['a'] = 20
+    state['d'] = 4
+    del state['b']
+    state['b'] = 5
+    state.rollback()
+
+    assert state == {'a': 1, 'b': 2, 'c': 3}
+    assert 'd' not in state
+
+
+def test_should_keep_the_changes_on_commit():
+    state = JournaledDict()
+    state.begin()
+    state['a'] = 1
+    state.commit()
+    state.rollback()
+
+    assert state == {'a': 1}
+
+
+def test_should_not_journal_outside_transactions():
+    state = JournaledDict()
+    state['a'] = 1
+    state.rollback()
+
+    assert state == {'a': 1}
+    with pytest.raises(KeyError):
+        del state['b']
+
+
+def test_should_refuse_nested_transactions():
+    state = JournaledDict()
+    state.begin()
+    with pytest.raises(RuntimeError):
+        state.begin()
+
+
+class _Counter(MultiRouter):
+
+    def __init__(self):
+        super().__init__()
+        self.balance = Ledger()
+
+    def journaled_states(self) -> list:
+        return [self.balance, *super().journaled_states()]
+
+
+@pytest.fixture
+def app():
+    app = DApp()
+    app.scores = app.add_state(JournaledDict())
+    counter = _Counter()
+    app.add_router(counter)
+    app.balance = counter.balance
+
+    @app.advance()
+    def handle_advance(rollup, data):
+        payload = data.str_payload()
+        app.scores[payload] = app.scores.get(payload, 0) + 1
+        app.balance.credit(data.metadata.msg_sender, 1)
+        if payload == 'raise':
+            raise ValueError('Rejected')
+        return payload != 'reject'
+
+    @app.inspect()
+    def handle_inspect(rollup, data):
+        app.scores['inspected'] = True
+        return True
+
+    return app
+
+
+@pytest.mark.parametrize('freeze', [False, True])
+def test_dapp_should_commit_accepted_inputs(app, freeze):
+    if freeze:
+        app.freeze()
+    client = TestClient(app)
+    client.send_advance(hex_payload='0x' + b'accept'.hex())
+
+    assert client.rollup.status
+    assert app.scores == {'accept': 1}
+    assert len(app.balance) == 1
+
+
+@pytest.mark.parametrize('payload', [b'reject', b'raise'])
+def test_dapp_should_roll_back_rejected_inputs(app, payload):
+    client = TestClient(app)
+    client.send_advance(hex_payload='0x' + b'accept'.hex())
+    client.send_advance(hex_payload='0x' + payload.hex())
+
+    assert not client.rollup.status
+    assert app.scores == {'accept': 1}
+    assert list(app.balance.values()) == [1]
+
+
+def test_dapp_should_roll_back_inspects(app):
+    client = TestClient(app)
+    client.send_inspect(hex_payload='0x' + b'inspect'.hex())
+
+    assert client.rollup.status
+    assert app.scores == {}
+
+
+def test_dapp_should_begin_shared_states_once(app):
+    app.add_state(app.balance)
+    client = TestClient(app)
+    client.send_advance(hex_payload='0x' + b'reject'.hex())
+    client.send_advance(hex_payload='0x' + b'accept'.hex())
+
+    assert client.rollup.status
+    assert app.scores == {'accept': 1}
+
+
+def test_dapp_should_roll_back_when_flush_raises(app):
+    client = TestClient(app)
+
+    def flush():
+        raise ConnectionError('Rollup server is gone')
+
+    client.rollup.flush = flush
+    with pytest.raises(ConnectionError):
+        client.send_advance(hex_payload='0x' + b'accept'.hex())
+
+    assert app.scores == {}
+    assert len(app.balance) == 0
+
+    # The transaction was closed, so the next input is handled
+    del client.rollup.flush
+    client.send_advance(hex_payload='0x' + b'accept'.hex())
+
+    assert client.rollup.status
+    assert app.scores == {'accept': 1}
+
+
+def test_dapp_should_roll_back_when_async_flush_raises(app):
+    client = TestClient(app)
+
+    async def flush():
+        raise ConnectionError('Rollup server is gone')
+
+    client.rollup.flush = flush
+    request = RollupResponse.parse_obj({
+        'request_type': 'advance_state',
+        'data': {
+            'metadata': {
+                'msg_sender': '0x' + '00' * 20,
+                'epoch_index': 0,
+                'input_index': 0,
+                'block_number': 0,
+                'timestamp': 0,
+            },
+            'payload': '0x' + b'accept'.hex(),
+        },
+    })
+    with pytest.raises(ConnectionError):
+        asyncio.run(app._handle_async(request))
+
+    assert app.scores == {}
+    assert len(app.balance) == 0
+
+    del client.rollup.flush
+    assert asyncio.run(app._handle_async(request))
+    assert app.scores == {'accept': 1}
@@ -0,0 +1,123 @@
+from Crypto.Hash import keccak
+from eth_abi.exceptions import EncodingTypeError, ValueOutOfBounds
+from pydantic import BaseModel
+import pytest
+
+from . import abi
+from .models import ABIFunctionSelectorHeader, function_selector
+from .vouchers import (
+    VoucherFactory,
+    WithdrawEtherParams,
+    create_voucher_from_model,
+    withdraw_erc20,
+    withdraw_ether,
+)
+
+TOKEN = '0x' + '11' * 20
+RECEIVER = '0x' + '22' * 20
+
+
+class TransferParams(BaseModel):
+    to: abi.Address
+    amount: abi.UInt256
+
+
+class Point(BaseModel):
+    x: abi.Int32
+    y: abi.Int32
+
+
+class MessageParams(BaseModel):
+    text: abi.String
+    point: Point
+    values: list[abi.UInt8]
+
+
+def keccak_selector(signature: str) -> bytes:
+    sig_hash = keccak.new(digest_bits=256)
+    sig_hash.update(signature.encode('utf-8'))
+    return sig_hash.digest()[:4]
+
+
+def test_function_selector():
+    assert function_selector('transfer', ('address', 'uint256')) == \
+        bytes.fromhex('a9059cbb')
+    header = ABIFunctionSelectorHeader(function='transfer',
+                                       argument_types=['address', 'uint256'])
+    assert header.to_bytes() == bytes.fromhex('a9059cbb')
+
+    # Changing the header changes its selector
+    header.function = 'approve'
+    assert header.to_bytes() == keccak_selector('approve(address,uint256)')
+
+
+def test_factory_matches_create_voucher_from_model():
+    factory = VoucherFactory(TOKEN, 'transfer', TransferParams)
+    assert factory.selector == bytes.fromhex('a9059cbb')
+
+    params = TransferParams(to=RECEIVER, amount=10)
+    expected = create_voucher_from_model(TOKEN, 'transfer', params)
+    assert factory.create(params) == expected
+    assert factory.create_from_values((RECEIVER, 10)) == expected
+
+
+def test_factory_batch():
+    factory = VoucherFactory(TOKEN, 'transfer', TransferParams)
+    values = [('0x' + f'{idx:040x}', idx * 1000) for idx in range(50)]
+    vouchers = factory.create_batch(values)
+    assert vouchers == [
+        create_voucher_from_model(
+            TOKEN, 'transfer', TransferParams(to=to, amount=amount)
+        )
+        for to, amount in values
+    ]
+    assert factory.create_batch(iter(values[:2])) == vouchers[:2]
+    assert factory.create_batch([]) == []
+
+
+def test_factory_dynamic_arguments():
+    factory = VoucherFactory(TOKEN, 'send', MessageParams)
+    params = MessageParams(text='hello', point=Point(x=1, y=-1),
+                           values=[1, 2, 3])
+    expected = create_voucher_from_model(TOKEN, 'send', params)
+    assert factory.selector == \
+        keccak_selector('send(string,(int32,int32),uint8[])')
+    assert factory.create(params) == expected
+    assert factory.create_from_values(('hello', (1, -1), [1, 2, 3])) == \
+        expected
+
+
+@pytest.mark.parametrize('values,error', [
+    ((RECEIVER,), ValueError),
+    ((RECEIVER, 10, 20), ValueError),
+    ((RECEIVER, -1), ValueOutOfBounds),
+    ((RECEIVER, 'ten'), EncodingTypeError),
+    (('0x12', 10), EncodingTypeError),
+])
+def test_factory_invalid_values(values, error):
+    factory = VoucherFactory(TOKEN, 'transfer', TransferParams)
+    with pytest.raises(error):
+        factory.create_from_values(values)
+
+
+def test_factory_rejects_other_models():
+    factory = VoucherFactory(TOKEN, 'transfer', TransferParams)
+    with pytest.raises(ValueError):
+        factory.create(WithdrawEtherParams(receiver=RECEIVER, amount=1))
+
+
+def test_withdraw_helpers():
+    assert withdraw_ether(TOKEN, RECEIVER, 5) == {
+        'destination': TOKEN,
+        'payload': '0x' + (
+            keccak_selector('withdrawEther(address,uint256)') +
+            bytes(12) + bytes.fromhex('22' * 20) +
+            (5).to_bytes(32, 'big')
+        ).hex(),
+    }
+    voucher = withdraw_erc20(TOKEN, '0x' + '33' * 20, RECEIVER, 5)
+    assert voucher['payload'].startswith(
+        '0x' + keccak_selector(
+            'withdrawERC20Tokens(address,address,uint256)'
+        ).hex()
+    )
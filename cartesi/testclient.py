@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 from .models import RollupResponse
@@ -6,6 +7,21 @@ from .rollup import Rollup
 LOGGER = logging.getLogger(__name__)
 
 
+def _output_result(value=None):
+    """Return the output result, as an awaitable if called from a coroutine.
+
+    This allows async handlers to await the outputs, as they would when
+    running with the `AsyncHTTPRollupServer`.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return value
+    future = loop.create_future()
+    future.set_result(value)
+    return future
+
+
 class MockRollup(Rollup):
     """Mock the Rollup Server behavior for using in test suite"""
 
@@ -32,6 +48,7 @@ class MockRollup(Rollup):
             }
         }
         self.notices.append(data)
+        return _output_result()
 
     def report(self, payload: str):
         data = {
@@ -42,6 +59,7 @@ class MockRollup(Rollup):
             }
         }
         self.reports.append(data)
+        return _output_result()
 
     def voucher(self, payload: str):
         data = {
@@ -52,6 +70,7 @@ class MockRollup(Rollup):
             }
         }
         self.vouchers.append(data)
+        return _output_result()
 
     def send_advance(
             self,
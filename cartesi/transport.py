@@ -0,0 +1,449 @@
+"""
+HTTP Transports for the communication with the Rollup Server
+"""
+from abc import ABC, abstractmethod
+import asyncio
+from collections import deque
+import json
+import logging
+import select
+import socket
+from urllib.parse import urlsplit
+
+import requests
+
+LOGGER = logging.getLogger(__name__)
+
+
+class HTTPResponse:
+    """Minimal HTTP response, compatible with the subset of
+    `requests.Response` used by the rollup servers."""
+
+    __slots__ = ('status_code', 'headers', 'content')
+
+    def __init__(self, status_code: int, headers: dict, content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+    def __repr__(self):
+        return f'<HTTPResponse [{self.status_code}]>'
+
+
+class Transport(ABC):
+    """Abstract Base Class for sending HTTP requests to the Rollup Server"""
+
+    @abstractmethod
+    def post(self, url: str, data):
+        """Post `data` encoded as JSON to `url`.
+
+        Returns an object exposing `status_code`, `content` and `json()`.
+        """
+
+    def close(self):
+        """Release any resource held by the transport."""
+
+
+class SessionTransport(Transport):
+    """Transport based on a persistent `requests.Session`.
+
+    The session keeps the TCP connection alive between requests, so the
+    handshake is paid only once instead of once per request.
+    """
+
+    def __init__(self, session: requests.Session | None = None):
+        if session is None:
+            session = requests.Session()
+        self.session = session
+
+    def post(self, url: str, data):
+        return self.session.post(url, json=data)
+
+    def close(self):
+        self.session.close()
+
+
+class _Connection:
+    """A keep-alive socket and its buffered reader"""
+
+    def __init__(self, host: str, port: int, timeout: float | None):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile('rb')
+
+    def is_stale(self) -> bool:
+        """Whether the server closed the idle connection, or sent anything
+        on it, in which case it cannot be used for another request"""
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        return bool(readable)
+
+    def close(self):
+        try:
+            self.reader.close()
+        finally:
+            self.sock.close()
+
+
+class SocketTransport(Transport):
+    """Minimal HTTP/1.1 client over raw sockets.
+
+    Only what is needed to talk to the Rollup Server is supported: plain
+    HTTP, JSON request bodies, and responses delimited either by
+    `Content-Length`, chunked transfer encoding or connection close. One
+    keep-alive connection is held per host.
+    """
+
+    def __init__(self, timeout: float | None = None):
+        self.timeout = timeout
+        self._connections: dict[tuple[str, int], _Connection] = {}
+
+    def post(self, url: str, data):
+        key, request = _build_request(url, data)
+        conn = self._connections.get(key)
+        if conn is not None:
+            if conn.is_stale():
+                self._drop(key)
+            else:
+                try:
+                    return self._roundtrip(key, conn, request)
+                except _StaleConnection:
+                    # Nothing was written, so the request can be sent again
+                    pass
+            LOGGER.debug('Reconnecting to %s:%d', *key)
+
+        conn = _Connection(key[0], key[1], self.timeout)
+        self._connections[key] = conn
+        return self._roundtrip(key, conn, request, reused=False)
+
+    def _roundtrip(self, key, conn: _Connection, request: bytes,
+                   reused: bool = True):
+        # Once any byte of the request was written, the server may have
+        # processed it, so it is never sent again
+        request = memoryview(request)
+        sent = 0
+        try:
+            while sent < len(request):
+                sent += conn.sock.send(request[sent:])
+            status_line = conn.reader.readline()
+        except OSError:
+            self._drop(key)
+            if reused and not sent:
+                raise _StaleConnection()
+            raise
+        if not status_line:
+            self._drop(key)
+            raise ConnectionError('Connection closed by the server')
+
+        try:
+            response, keep_alive = _read_response(conn.reader, status_line)
+        except Exception:
+            self._drop(key)
+            raise
+        if not keep_alive:
+            self._drop(key)
+        return response
+
+    def _drop(self, key):
+        conn = self._connections.pop(key, None)
+        if conn is not None:
+            conn.close()
+
+    def close(self):
+        for key in list(self._connections):
+            self._drop(key)
+
+
+class _StaleConnection(Exception):
+    """A reused connection was found closed before the request was sent"""
+
+
+def _build_request(url: str, data) -> tuple[tuple[str, int], bytes]:
+    """Build a JSON POST request, returning the (host, port) and its bytes"""
+    parts = urlsplit(url)
+    if parts.scheme != 'http':
+        raise ValueError(f'Unsupported URL scheme for {url!r}')
+
+    target = parts.path or '/'
+    if parts.query:
+        target += '?' + parts.query
+    body = json.dumps(data).encode('utf-8')
+    request = (
+        f'POST {target} HTTP/1.1\r\n'
+        f'Host: {parts.netloc}\r\n'
+        'Content-Type: application/json\r\n'
+        f'Content-Length: {len(body)}\r\n'
+        '\r\n'
+    ).encode('latin-1') + body
+
+    return (parts.hostname, parts.port or 80), request
+
+
+def _read_response(reader, status_line: bytes):
+    """Read an HTTP/1.1 response whose status line was already read.
+
+    Returns the response and whether the connection can be reused.
+    """
+    while True:
+        version, status, _ = _parse_status_line(status_line)
+        headers = _read_headers(reader)
+        if status >= 200 or status < 100:
+            break
+        # Ignore informational responses, such as 100 Continue
+        status_line = reader.readline()
+
+    keep_alive, framing = _get_framing(version, status, headers)
+    if framing == 'chunked':
+        content = _read_chunked(reader)
+    elif framing == 'eof':
+        content = reader.read()
+    else:
+        content = reader.read(framing)
+        if len(content) != framing:
+            raise ConnectionError('Incomplete response body')
+
+    return HTTPResponse(status, headers, content), keep_alive
+
+
+def _get_framing(version: str, status: int, headers: dict):
+    """Return whether the connection can be kept alive and how the body is
+    delimited: its length, `'chunked'` or `'eof'`."""
+    connection = headers.get('connection', '').lower()
+    keep_alive = (
+        connection != 'close' if version == 'HTTP/1.1'
+        else connection == 'keep-alive'
+    )
+
+    if status in (204, 304):
+        return keep_alive, 0
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        return keep_alive, 'chunked'
+    if 'content-length' in headers:
+        return keep_alive, int(headers['content-length'])
+    return False, 'eof'
+
+
+def _parse_status_line(line: bytes):
+    try:
+        version, status, *reason = line.decode('latin-1').split(None, 2)
+        return version, int(status), reason[0].strip() if reason else ''
+    except ValueError:
+        raise ConnectionError(f'Malformed status line {line!r}') from None
+
+
+def _read_headers(reader) -> dict:
+    headers = {}
+    while True:
+        line = reader.readline()
+        if line in (b'\r\n', b'\n'):
+            return headers
+        if not line:
+            raise ConnectionError('Connection closed while reading headers')
+        _parse_header_line(line, headers)
+
+
+def _parse_header_line(line: bytes, headers: dict):
+    name, _, value = line.decode('latin-1').partition(':')
+    headers[name.strip().lower()] = value.strip()
+
+
+def _read_chunked(reader) -> bytes:
+    chunks = []
+    while True:
+        size_line = reader.readline()
+        if not size_line:
+            raise ConnectionError('Connection closed while reading body')
+        size = int(size_line.split(b';', 1)[0], 16)
+        if size == 0:
+            break
+        chunk = reader.read(size)
+        if len(chunk) != size:
+            raise ConnectionError('Incomplete response body')
+        chunks.append(chunk)
+        reader.readline()
+    # Skip trailers
+    _read_headers(reader)
+    return b''.join(chunks)
+
+
+class AsyncTransport(ABC):
+    """Abstract Base Class for sending HTTP requests from asyncio code"""
+
+    @abstractmethod
+    async def post(self, url: str, data):
+        """Post `data` encoded as JSON to `url`.
+
+        Returns an object exposing `status_code`, `content` and `json()`.
+        """
+
+    async def close(self):
+        """Release any resource held by the transport."""
+
+
+class _AsyncConnection:
+    """A keep-alive stream that reads pipelined responses in order"""
+
+    def __init__(self, reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.pending: deque[asyncio.Future] = deque()
+        self.closed = False
+        self.task = asyncio.get_running_loop().create_task(self._read_loop())
+
+    async def _read_loop(self):
+        error = ConnectionError('Connection closed by the server')
+        try:
+            while True:
+                status_line = await self.reader.readline()
+                if not status_line:
+                    break
+                if not self.pending:
+                    error = ConnectionError('Unexpected response')
+                    break
+                try:
+                    response, keep_alive = await _read_response_async(
+                        self.reader,
+                        status_line,
+                    )
+                except Exception as exc:
+                    error = exc
+                    break
+                future = self.pending.popleft()
+                if not future.done():
+                    future.set_result(response)
+                if not keep_alive:
+                    # Requests pipelined after this one will not be
+                    # processed by the server, so they can be sent again.
+                    error = _StaleConnection()
+                    break
+        except OSError as exc:
+            error = exc
+        finally:
+            self.closed = True
+            self.writer.close()
+            # Otherwise, the server may have processed the pending requests
+            # before closing, so they fail instead of being sent again
+            while self.pending:
+                future = self.pending.popleft()
+                if not future.done():
+                    future.set_exception(error)
+
+    def is_stale(self) -> bool:
+        """Whether the connection was closed, or the server closed it while
+        it was idle, so a request written to it might be lost"""
+        return (self.closed or self.reader.at_eof()
+                or self.writer.is_closing())
+
+    async def close(self):
+        self.writer.close()
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+
+class AsyncSocketTransport(AsyncTransport):
+    """Asyncio HTTP/1.1 client over a pipelined keep-alive connection.
+
+    Requests to the same host are written to a single connection in the
+    order `post` is called, without waiting for the previous responses,
+    and the responses are read back in the same order. This overlaps the
+    round trips while preserving the order in which the server receives
+    the requests.
+    """
+
+    def __init__(self):
+        self._connections: dict[tuple[str, int], _AsyncConnection] = {}
+        self._lock = asyncio.Lock()
+
+    async def post(self, url: str, data):
+        key, request = _build_request(url, data)
+
+        for attempt in range(2):
+            conn = await self._get_connection(key)
+            future = asyncio.get_running_loop().create_future()
+            conn.pending.append(future)
+            conn.writer.write(request)
+            try:
+                return await future
+            except _StaleConnection:
+                if attempt:
+                    raise ConnectionError(
+                        'Connection closed by the server'
+                    ) from None
+                LOGGER.debug('Reconnecting to %s:%d', *key)
+
+    async def _get_connection(self, key) -> _AsyncConnection:
+        conn = self._connections.get(key)
+        if conn is not None and not conn.is_stale():
+            return conn
+
+        async with self._lock:
+            conn = self._connections.get(key)
+            if conn is None or conn.is_stale():
+                reader, writer = await asyncio.open_connection(*key)
+                conn = _AsyncConnection(reader, writer)
+                self._connections[key] = conn
+        return conn
+
+    async def close(self):
+        connections = list(self._connections.values())
+        self._connections.clear()
+        for conn in connections:
+            await conn.close()
+
+
+async def _read_response_async(reader: asyncio.StreamReader,
+                               status_line: bytes):
+    """Asyncio version of `_read_response`"""
+    while True:
+        version, status, _ = _parse_status_line(status_line)
+        headers = await _read_headers_async(reader)
+        if status >= 200 or status < 100:
+            break
+        status_line = await reader.readline()
+
+    keep_alive, framing = _get_framing(version, status, headers)
+    if framing == 'chunked':
+        chunks = []
+        while True:
+            size_line = await reader.readline()
+            if not size_line:
+                raise ConnectionError('Connection closed while reading body')
+            size = int(size_line.split(b';', 1)[0], 16)
+            if size == 0:
+                break
+            try:
+                chunks.append(await reader.readexactly(size))
+            except asyncio.IncompleteReadError:
+                raise ConnectionError('Incomplete response body') from None
+            await reader.readline()
+        await _read_headers_async(reader)
+        content = b''.join(chunks)
+    elif framing == 'eof':
+        content = await reader.read()
+    else:
+        try:
+            content = await reader.readexactly(framing)
+        except asyncio.IncompleteReadError:
+            raise ConnectionError('Incomplete response body') from None
+
+    return HTTPResponse(status, headers, content), keep_alive
+
+
+async def _read_headers_async(reader: asyncio.StreamReader) -> dict:
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n'):
+            return headers
+        if not line:
+            raise ConnectionError('Connection closed while reading headers')
+        _parse_header_line(line, headers)
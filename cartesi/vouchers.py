@@ -1,10 +1,15 @@
 """
 Voucher Generation Helper
 """
+from collections.abc import Iterable, Sequence
+from functools import lru_cache
+from typing import Annotated
+
+import eth_abi
 from pydantic import BaseModel
-from Crypto.Hash import keccak
 
-from . import abi
+from . import abi, _packed
+from .models import function_selector
 
 
 def create_voucher_from_model(
@@ -32,22 +37,150 @@ def create_voucher_from_model(
     dict
         Dictionary ready to be passed to rollup.voucher().
     """
-    args_types = abi.get_abi_types_from_model(args_model)
-    signature = f'{function_name}({",".join(args_types)})'
-    sig_hash = keccak.new(digest_bits=256)
-    sig_hash.update(signature.encode('utf-8'))
-
-    selector = sig_hash.digest()[:4].hex()
+    args_types = abi.get_model_schema(args_model).types
+    selector = function_selector(function_name, args_types)
 
-    args = abi.encode_model(args_model).hex()
+    # Encode the arguments right after the selector, in a single buffer
+    payload = bytearray(selector)
+    abi.encode_model_into(args_model, payload)
 
     voucher = {
         'destination': destination,
-        'payload': '0x' + selector + args
+        'payload': '0x' + payload.hex()
     }
     return voucher
 
 
+class VoucherFactory:
+    """
+    Generates vouchers calling one function of a given contract.
+
+    The ABI types, the function selector and the encoder of the arguments
+    are computed once, when creating the factory, so that generating many
+    vouchers, as in a withdrawal sweep, only encodes the arguments.
+
+    Parameters
+    ----------
+    destination : abi.Address
+        Address of the contract that will be called
+    function_name : str
+        Name of the function to be called
+    args_model : type[BaseModel]
+        Pydantic model class with ABI type annotations with the parameters
+
+    Examples
+    --------
+    >>> transfer = VoucherFactory(token, 'transfer', TransferParams)
+    >>> voucher = transfer.create(TransferParams(to=receiver, amount=10))
+    >>> vouchers = transfer.create_batch([(receiver, 10), (other, 20)])
+    """
+
+    def __init__(
+        self,
+        destination: abi.Address,
+        function_name: str,
+        args_model: type[BaseModel],
+    ):
+        schema = abi.get_model_schema(args_model)
+        self.destination = destination
+        self.function_name = function_name
+        self.args_model = args_model
+        self.selector = function_selector(function_name, schema.types)
+        self._types = schema.types
+        self._prefix = '0x' + self.selector.hex()
+        self._encode_values = _compile_values_encoder(schema.types)
+
+    def create(self, args_model: BaseModel) -> dict:
+        """
+        Generates a voucher with the arguments in a model instance.
+
+        Parameters
+        ----------
+        args_model : BaseModel
+            Instance of the model of the factory
+
+        Returns
+        -------
+        dict
+            Dictionary ready to be passed to rollup.voucher().
+        """
+        if not isinstance(args_model, self.args_model):
+            raise ValueError(
+                f'Expected arguments of type {self.args_model.__name__}, got '
+                f'{type(args_model).__name__}'
+            )
+        payload = bytearray(self.selector)
+        abi.encode_model_into(args_model, payload)
+        return {'destination': self.destination,
+                'payload': '0x' + payload.hex()}
+
+    def create_from_values(self, values: Sequence) -> dict:
+        """
+        Generates a voucher with the arguments given as a tuple.
+
+        The values are in the order of the fields of the model, with nested
+        models as tuples. They are not validated by the model, only checked
+        against their ABI types while encoding.
+
+        Parameters
+        ----------
+        values : Sequence
+            Value of each argument
+
+        Returns
+        -------
+        dict
+            Dictionary ready to be passed to rollup.voucher().
+        """
+        if len(values) != len(self._types):
+            raise ValueError(
+                f'Expected {len(self._types)} arguments for '
+                f'{self.function_name}, got {len(values)}'
+            )
+        return {'destination': self.destination,
+                'payload': self._prefix + self._encode_values(values).hex()}
+
+    def create_batch(self, values: Iterable[Sequence]) -> list[dict]:
+        """
+        Generates one voucher per tuple of arguments.
+
+        See `create_from_values`.
+
+        Parameters
+        ----------
+        values : Iterable[Sequence]
+            Tuples with the value of each argument
+
+        Returns
+        -------
+        list[dict]
+            Dictionaries ready to be passed to rollup.voucher(), in order.
+        """
+        return [self.create_from_values(args) for args in values]
+
+
+def _compile_values_encoder(types: tuple[str, ...]):
+    """Return a function encoding a tuple of values of the given types"""
+    try:
+        encoders = [_packed.word_encoder(abi_type) for abi_type in types]
+    except ValueError:
+        # Dynamic or nested types, let eth_abi lay them out
+        return lambda values: eth_abi.encode(types, values)
+
+    def encode(values: Sequence) -> bytes:
+        return b''.join([
+            encoder(value) for encoder, value in zip(encoders, values)
+        ])
+
+    return encode
+
+
+@lru_cache(maxsize=64)
+def _get_factory(destination: str, function_name: str,
+                 args_model: type[BaseModel]) -> VoucherFactory:
+    return VoucherFactory(destination, function_name, args_model)
+
+
 class WithdrawEtherParams(BaseModel):
     receiver: abi.Address
     amount: abi.UInt256
@@ -62,11 +195,9 @@ def withdraw_ether(
         receiver=receiver_address,
         amount=amount,
     )
-    return create_voucher_from_model(
-        destination=rollup_address,
-        function_name='withdrawEther',
-        args_model=params,
-    )
+    factory = _get_factory(rollup_address, 'withdrawEther',
+                           WithdrawEtherParams)
+    return factory.create(params)
 
 
 class WithdrawERC20Params(BaseModel):
@@ -86,8 +217,106 @@ def withdraw_erc20(
         receiver=receiver_address,
         amount=amount,
     )
-    return create_voucher_from_model(
-        destination=rollup_address,
-        function_name='withdrawERC20Tokens',
-        args_model=params,
+    factory = _get_factory(rollup_address, 'withdrawERC20Tokens',
+                           WithdrawERC20Params)
+    return factory.create(params)
+
+
+class TransferERC20Params(BaseModel):
+    to: abi.Address
+    amount: abi.UInt256
+
+
+def transfer_erc20(
+    token: abi.Address,
+    receiver_address: abi.Address,
+    amount: abi.UInt256
+):
+    """Voucher calling `transfer` on an ERC20 token, which sends tokens
+    owned by the DApp to the receiver"""
+    params = TransferERC20Params(to=receiver_address, amount=amount)
+    factory = _get_factory(token, 'transfer', TransferERC20Params)
+    return factory.create(params)
+
+
+class TransferERC721Params(BaseModel):
+    sender: abi.Address
+    receiver: abi.Address
+    tokenId: abi.UInt256
+
+
+def transfer_erc721(
+    token: abi.Address,
+    rollup_address: abi.Address,
+    receiver_address: abi.Address,
+    token_id: abi.UInt256
+):
+    """Voucher calling `safeTransferFrom` on an ERC721 token, which sends
+    a token owned by the DApp at `rollup_address` to the receiver"""
+    params = TransferERC721Params(
+        sender=rollup_address,
+        receiver=receiver_address,
+        tokenId=token_id,
+    )
+    factory = _get_factory(token, 'safeTransferFrom', TransferERC721Params)
+    return factory.create(params)
+
+
+class TransferERC1155Params(BaseModel):
+    sender: abi.Address
+    receiver: abi.Address
+    tokenId: abi.UInt256
+    amount: abi.UInt256
+    data: abi.Bytes
+
+
+def transfer_erc1155(
+    token: abi.Address,
+    rollup_address: abi.Address,
+    receiver_address: abi.Address,
+    token_id: abi.UInt256,
+    amount: abi.UInt256,
+    data: bytes = b'',
+):
+    """Voucher calling `safeTransferFrom` on an ERC1155 token, which sends
+    tokens owned by the DApp at `rollup_address` to the receiver"""
+    params = TransferERC1155Params(
+        sender=rollup_address,
+        receiver=receiver_address,
+        tokenId=token_id,
+        amount=amount,
+        data=data,
+    )
+    factory = _get_factory(token, 'safeTransferFrom', TransferERC1155Params)
+    return factory.create(params)
+
+
+class TransferERC1155BatchParams(BaseModel):
+    sender: abi.Address
+    receiver: abi.Address
+    tokenIds: Annotated[list[int], abi.ABIType('uint256[]')]
+    amounts: Annotated[list[int], abi.ABIType('uint256[]')]
+    data: abi.Bytes
+
+
+def transfer_erc1155_batch(
+    token: abi.Address,
+    rollup_address: abi.Address,
+    receiver_address: abi.Address,
+    token_ids: list[int],
+    amounts: list[int],
+    data: bytes = b'',
+):
+    """Voucher calling `safeBatchTransferFrom` on an ERC1155 token, which
+    sends tokens of several ids owned by the DApp at `rollup_address` to
+    the receiver"""
+    params = TransferERC1155BatchParams(
+        sender=rollup_address,
+        receiver=receiver_address,
+        tokenIds=token_ids,
+        amounts=amounts,
+        data=data,
     )
+    factory = _get_factory(token, 'safeBatchTransferFrom',
+                           TransferERC1155BatchParams)
+    return factory.create(params)
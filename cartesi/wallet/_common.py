@@ -0,0 +1,88 @@
+"""
+Helpers shared by the wallets
+"""
+import json
+import logging
+
+from ..rollup import Rollup
+from ..router import URLRouter, URLParameters, DAppAddressRouter
+from .ledger import Ledger
+
+
+LOGGER = logging.getLogger(__name__)
+
+# Number of accounts listed per report by the balance inspects
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+_CONVERTERS = {'address': 'address', 'uint256': 'int'}
+
+
+def report_json(rollup: Rollup, document: dict):
+    response = json.dumps(document).encode('ascii')
+    rollup.report(payload='0x' + response.hex())
+
+
+def page_params(params: URLParameters) -> tuple[int, int]:
+    """Return the cursor and the limit of a page of balances.
+
+    Raises ValueError if they are not integers.
+    """
+    cursor = int(params.query_params.get('cursor', ['0'])[0])
+    limit = int(params.query_params.get('limit', [DEFAULT_PAGE_SIZE])[0])
+    return cursor, min(limit, MAX_PAGE_SIZE)
+
+
+def dapp_address(dapp_address_router: DAppAddressRouter) -> str | None:
+    """Return the DApp address, which the vouchers transfer assets from"""
+    address = dapp_address_router.address
+    if address is None:
+        LOGGER.error("Cannot withdraw before knowing the DApp address.")
+    return address
+
+
+def add_balance_inspects(url_router: URLRouter, ledger: Ledger, asset: str,
+                         key_names: tuple[str, ...]):
+    """Register the inspects of the balances of a ledger with tuple keys.
+
+    `balance/<asset>/<key>...` reports the balance of one account, and
+    `balance/<asset>?cursor=<cursor>&limit=<limit>` a page of balances, each
+    as a JSON object with the parts of the key named after `key_names`.
+    """
+    template = '/'.join(
+        [f'balance/{asset}'] + [
+            f'{{{name}:{_CONVERTERS[key_type]}}}'
+            for name, key_type in zip(key_names, ledger.key_types)
+        ]
+    )
+
+    @url_router.inspect(path=template)
+    def inspect_balance(rollup: Rollup, params: URLParameters) -> bool:
+        account = tuple(params.path_params[name] for name in key_names)
+        balance = ledger.get(account, 0)
+        report_json(rollup, _balance_document(key_names, account, balance))
+        return True
+
+    @url_router.inspect(path=f'balance/{asset}')
+    def inspect_balances(rollup: Rollup, params: URLParameters) -> bool:
+        try:
+            balances, next_cursor = ledger.page(*page_params(params))
+        except ValueError:
+            LOGGER.error("Invalid page of %s balances: %r", asset,
+                         params.query_params)
+            return False
+        report_json(rollup, {
+            'balances': [
+                _balance_document(key_names, account, balance)
+                for account, balance in balances
+            ],
+            'next_cursor': next_cursor,
+        })
+        return True
+
+
+def _balance_document(key_names: tuple[str, ...], account: tuple,
+                      balance: int) -> dict:
+    document = dict(zip(key_names, account))
+    document['balance'] = balance
+    return document
@@ -0,0 +1,285 @@
+import logging
+from typing import Annotated
+
+from eth_abi.exceptions import InsufficientDataBytes
+from pydantic import BaseModel
+
+from .. import abi, vouchers, _packed
+from ..models import RollupData, ABIFunctionSelectorHeader
+from ..rollup import Rollup
+from ..router import MultiRouter, ABIRouter, URLRouter, DAppAddressRouter
+from ._common import add_balance_inspects, dapp_address
+from .ledger import Ledger
+
+
+LOGGER = logging.getLogger(__name__)
+
+WORD_SIZE = 32
+
+UInt256Array = Annotated[list[int], abi.ABIType('uint256[]')]
+
+
+class DepositERC1155Payload(BaseModel):
+    token: abi.Address
+    sender: abi.Address
+    tokenId: abi.UInt256
+    amount: abi.UInt256
+    # Standard encoding of the base layer and execution layer data
+    data: bytes
+
+
+class DepositERC1155BatchPayload(BaseModel):
+    token: abi.Address
+    sender: abi.Address
+    # Standard encoding of the token ids, the amounts, and the base layer
+    # and execution layer data
+    data: bytes
+
+
+class WithdrawERC1155Payload(BaseModel):
+    token: abi.Address
+    tokenId: abi.UInt256
+    amount: abi.UInt256
+    execLayerData: bytes
+
+
+class WithdrawERC1155BatchPayload(BaseModel):
+    token: abi.Address
+    tokenIds: UInt256Array
+    amounts: UInt256Array
+    execLayerData: bytes
+
+
+_decode_deposit = _packed.compile_decoder(
+    tuple(abi.get_abi_types_from_model(DepositERC1155Payload))
+)
+_decode_batch_deposit = _packed.compile_decoder(
+    tuple(abi.get_abi_types_from_model(DepositERC1155BatchPayload))
+)
+
+
+class ERC1155Wallet(MultiRouter):
+    """ERC1155 Wallet
+
+    Handles the deposits of both the single and the batch portals. The
+    amounts of a batch are applied to the ledger in a single update, so a
+    batch is either credited entirely or rejected.
+
+    Withdrawals generate a voucher calling `safeTransferFrom`, or
+    `safeBatchTransferFrom`, on the token, from the DApp address, which the
+    wallet learns from the `DAppAddressRouter`. Batch withdrawals use the
+    standard ABI encoding, since their arrays cannot be packed.
+
+    Attributes
+    ----------
+    balance : Ledger
+        Maps a `(token, address, token_id)` tuple to its balance
+    """
+
+    def __init__(
+        self,
+        single_portal_address: str,
+        batch_portal_address: str,
+        dapp_address_router: DAppAddressRouter,
+        default_withdraw_route: bool = True,
+    ):
+        super().__init__()
+        self.balance = Ledger(key_types=('address', 'address', 'uint256'))
+        self.single_portal_address = single_portal_address
+        self.batch_portal_address = batch_portal_address
+        self.dapp_address_router = dapp_address_router
+
+        self.on_deposit = None
+
+        abi_router = ABIRouter()
+        url_router = URLRouter()
+        self.add_router(abi_router)
+        self.add_router(url_router)
+
+        @abi_router.advance(msg_sender=single_portal_address)
+        def deposit_erc1155(rollup: Rollup, data: RollupData) -> bool:
+            return _deposit_erc1155(rollup=rollup, data=data, wallet=self)
+
+        @abi_router.advance(msg_sender=batch_portal_address)
+        def deposit_erc1155_batch(rollup: Rollup, data: RollupData) -> bool:
+            return _deposit_erc1155_batch(rollup=rollup, data=data,
+                                          wallet=self)
+
+        withdraw_header = ABIFunctionSelectorHeader(
+            function='ERC1155Withdraw',
+            argument_types=abi.get_abi_types_from_model(
+                WithdrawERC1155Payload
+            )
+        )
+        batch_withdraw_header = ABIFunctionSelectorHeader(
+            function='ERC1155BatchWithdraw',
+            argument_types=abi.get_abi_types_from_model(
+                WithdrawERC1155BatchPayload
+            )
+        )
+
+        if default_withdraw_route:
+            @abi_router.advance(header=withdraw_header,
+                                model=WithdrawERC1155Payload, packed=True)
+            def withdraw_erc1155(rollup: Rollup, data: RollupData,
+                                 withdrawal: WithdrawERC1155Payload) -> bool:
+                return _withdraw_erc1155(rollup=rollup, data=data,
+                                         withdrawal=withdrawal, wallet=self)
+
+            @abi_router.advance(header=batch_withdraw_header,
+                                model=WithdrawERC1155BatchPayload)
+            def withdraw_erc1155_batch(
+                rollup: Rollup,
+                data: RollupData,
+                withdrawal: WithdrawERC1155BatchPayload,
+            ) -> bool:
+                return _withdraw_erc1155_batch(rollup=rollup, data=data,
+                                               withdrawal=withdrawal,
+                                               wallet=self)
+
+        add_balance_inspects(url_router, self.balance, 'erc1155',
+                             ('token', 'address', 'id'))
+
+    def journaled_states(self) -> list:
+        return [self.balance, *super().journaled_states()]
+
+
+def _deposit_erc1155(
+    wallet: ERC1155Wallet,
+    rollup: Rollup,
+    data: RollupData
+) -> bool:
+
+    payload = data.bytes_payload()
+    LOGGER.debug("Payload: %s", payload.hex())
+
+    token, sender, token_id, amount, _ = _decode_deposit(payload)
+    try:
+        wallet.balance.credit((token, sender, token_id), amount)
+    except OverflowError:
+        LOGGER.error("Balance of %s in token %s would overflow.", sender,
+                     token)
+        return False
+
+    _notify_deposit(wallet, rollup, data, DepositERC1155Payload)
+    return True
+
+
+def _deposit_erc1155_batch(
+    wallet: ERC1155Wallet,
+    rollup: Rollup,
+    data: RollupData
+) -> bool:
+
+    payload = data.bytes_payload()
+    LOGGER.debug("Payload: %s", payload.hex())
+
+    token, sender, batch = _decode_batch_deposit(payload)
+    batch = memoryview(batch)
+    token_ids = _uint256_array(batch, 0)
+    amounts = _uint256_array(batch, WORD_SIZE)
+    if len(token_ids) != len(amounts):
+        LOGGER.error("Batch deposit with %d token ids and %d amounts.",
+                     len(token_ids), len(amounts))
+        return False
+
+    try:
+        wallet.balance.apply_credits(zip(token_ids, amounts),
+                                     prefix=(token, sender))
+    except OverflowError:
+        LOGGER.error("Balance of %s in token %s would overflow.", sender,
+                     token)
+        return False
+
+    _notify_deposit(wallet, rollup, data, DepositERC1155BatchPayload)
+    return True
+
+
+def _uint256_array(data: memoryview, head: int) -> list[int]:
+    """Decode a `uint256[]` of the standard encoding, whose offset is at
+    `head`, reading the elements as a run of words"""
+    offset = int.from_bytes(data[head:head + WORD_SIZE], 'big')
+    length = int.from_bytes(data[offset:offset + WORD_SIZE], 'big')
+    start = offset + WORD_SIZE
+    end = start + length * WORD_SIZE
+    if len(data) < max(head, offset) + WORD_SIZE or len(data) < end:
+        raise InsufficientDataBytes(
+            f'Tried to read {end} bytes, only got {len(data)} bytes.'
+        )
+    return [
+        int.from_bytes(data[pos:pos + WORD_SIZE], 'big')
+        for pos in range(start, end, WORD_SIZE)
+    ]
+
+
+def _notify_deposit(wallet: ERC1155Wallet, rollup: Rollup, data: RollupData,
+                    model: type[BaseModel]):
+    if wallet.on_deposit is not None:
+        try:
+            deposit = abi.decode_to_model(data=data.bytes_payload(),
+                                          model=model, packed=True)
+            wallet.on_deposit(rollup, data, deposit)
+        except Exception:
+            LOGGER.error("Error handling ERC1155 deposit.", exc_info=True)
+
+
+def _withdraw_erc1155(
+    wallet: ERC1155Wallet,
+    rollup: Rollup,
+    data: RollupData,
+    withdrawal: WithdrawERC1155Payload,
+) -> bool:
+
+    rollup_address = dapp_address(wallet.dapp_address_router)
+    if rollup_address is None:
+        return False
+
+    address = data.metadata.msg_sender
+    try:
+        wallet.balance.debit((withdrawal.token, address, withdrawal.tokenId),
+                             withdrawal.amount)
+    except ValueError:
+        return False
+
+    voucher = vouchers.transfer_erc1155(token=withdrawal.token,
+                                        rollup_address=rollup_address,
+                                        receiver_address=address,
+                                        token_id=withdrawal.tokenId,
+                                        amount=withdrawal.amount)
+    rollup.voucher(voucher)
+
+    return True
+
+
+def _withdraw_erc1155_batch(
+    wallet: ERC1155Wallet,
+    rollup: Rollup,
+    data: RollupData,
+    withdrawal: WithdrawERC1155BatchPayload,
+) -> bool:
+
+    rollup_address = dapp_address(wallet.dapp_address_router)
+    if rollup_address is None:
+        return False
+    if len(withdrawal.tokenIds) != len(withdrawal.amounts):
+        return False
+
+    address = data.metadata.msg_sender
+    try:
+        wallet.balance.apply_debits(
+            zip(withdrawal.tokenIds, withdrawal.amounts),
+            prefix=(withdrawal.token, address),
+        )
+    except ValueError:
+        return False
+
+    voucher = vouchers.transfer_erc1155_batch(
+        token=withdrawal.token,
+        rollup_address=rollup_address,
+        receiver_address=address,
+        token_ids=withdrawal.tokenIds,
+        amounts=withdrawal.amounts,
+    )
+    rollup.voucher(voucher)
+
+    return True
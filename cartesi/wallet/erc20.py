@@ -0,0 +1,138 @@
+import logging
+
+from pydantic import BaseModel
+
+from .. import abi, vouchers, _packed
+from ..models import RollupData, ABIFunctionSelectorHeader
+from ..rollup import Rollup
+from ..router import MultiRouter, ABIRouter, URLRouter
+from ._common import add_balance_inspects
+from .ledger import Ledger
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class DepositERC20Payload(BaseModel):
+    success: abi.Bool
+    token: abi.Address
+    sender: abi.Address
+    depositAmount: abi.UInt256
+    execLayerData: bytes
+
+
+class WithdrawERC20Payload(BaseModel):
+    token: abi.Address
+    amount: abi.UInt256
+    execLayerData: bytes
+
+
+_decode_deposit = _packed.compile_decoder(
+    tuple(abi.get_abi_types_from_model(DepositERC20Payload))
+)
+
+
+class ERC20Wallet(MultiRouter):
+    """ERC20 Wallet
+
+    Deposits that the token contract refused to transfer are rejected.
+    Withdrawals generate a voucher calling `transfer` on the token.
+
+    Attributes
+    ----------
+    balance : Ledger
+        Maps a `(token, address)` pair to its balance
+    """
+
+    def __init__(
+        self,
+        portal_address: str,
+        default_withdraw_route: bool = True,
+    ):
+        super().__init__()
+        self.balance = Ledger(key_types=('address', 'address'))
+        self.portal_address = portal_address
+
+        self.on_deposit = None
+
+        abi_router = ABIRouter()
+        url_router = URLRouter()
+        self.add_router(abi_router)
+        self.add_router(url_router)
+
+        @abi_router.advance(msg_sender=portal_address)
+        def deposit_erc20(rollup: Rollup, data: RollupData) -> bool:
+            return _deposit_erc20(rollup=rollup, data=data, wallet=self)
+
+        withdraw_header = ABIFunctionSelectorHeader(
+            function='ERC20Withdraw',
+            argument_types=abi.get_abi_types_from_model(WithdrawERC20Payload)
+        )
+
+        if default_withdraw_route:
+            @abi_router.advance(header=withdraw_header,
+                                model=WithdrawERC20Payload, packed=True)
+            def withdraw_erc20(rollup: Rollup, data: RollupData,
+                               withdrawal: WithdrawERC20Payload) -> bool:
+                return _withdraw_erc20(rollup=rollup, data=data,
+                                       withdrawal=withdrawal, wallet=self)
+
+        add_balance_inspects(url_router, self.balance, 'erc20',
+                             ('token', 'address'))
+
+    def journaled_states(self) -> list:
+        return [self.balance, *super().journaled_states()]
+
+
+def _deposit_erc20(
+    wallet: ERC20Wallet,
+    rollup: Rollup,
+    data: RollupData
+) -> bool:
+
+    payload = data.bytes_payload()
+    LOGGER.debug("Payload: %s", payload.hex())
+
+    success, token, sender, amount, _ = _decode_deposit(payload)
+    if not success:
+        LOGGER.warning("Deposit of token %s failed.", token)
+        return False
+
+    try:
+        wallet.balance.credit((token, sender), amount)
+    except OverflowError:
+        LOGGER.error("Balance of %s in token %s would overflow.", sender,
+                     token)
+        return False
+
+    if wallet.on_deposit is not None:
+        try:
+            deposit = abi.decode_to_model(data=payload,
+                                          model=DepositERC20Payload,
+                                          packed=True)
+            wallet.on_deposit(rollup, data, deposit)
+        except Exception:
+            LOGGER.error("Error handling ERC20 deposit.", exc_info=True)
+
+    return True
+
+
+def _withdraw_erc20(
+    wallet: ERC20Wallet,
+    rollup: Rollup,
+    data: RollupData,
+    withdrawal: WithdrawERC20Payload,
+) -> bool:
+
+    address = data.metadata.msg_sender
+    try:
+        wallet.balance.debit((withdrawal.token, address), withdrawal.amount)
+    except ValueError:
+        return False
+
+    voucher = vouchers.transfer_erc20(token=withdrawal.token,
+                                      receiver_address=address,
+                                      amount=withdrawal.amount)
+    rollup.voucher(voucher)
+
+    return True
@@ -0,0 +1,138 @@
+import logging
+
+from pydantic import BaseModel
+
+from .. import abi, vouchers, _packed
+from ..models import RollupData, ABIFunctionSelectorHeader
+from ..rollup import Rollup
+from ..router import MultiRouter, ABIRouter, URLRouter, DAppAddressRouter
+from ._common import add_balance_inspects, dapp_address
+from .ledger import Ledger
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class DepositERC721Payload(BaseModel):
+    token: abi.Address
+    sender: abi.Address
+    tokenId: abi.UInt256
+    # Standard encoding of the base layer and execution layer data
+    data: bytes
+
+
+class WithdrawERC721Payload(BaseModel):
+    token: abi.Address
+    tokenId: abi.UInt256
+    execLayerData: bytes
+
+
+_decode_deposit = _packed.compile_decoder(
+    tuple(abi.get_abi_types_from_model(DepositERC721Payload))
+)
+
+
+class ERC721Wallet(MultiRouter):
+    """ERC721 Wallet
+
+    Withdrawals generate a voucher calling `safeTransferFrom` on the token,
+    from the DApp address, which the wallet learns from the
+    `DAppAddressRouter`.
+
+    Attributes
+    ----------
+    balance : Ledger
+        Maps a `(token, address, token_id)` tuple to 1 if the address owns
+        the token
+    """
+
+    def __init__(
+        self,
+        portal_address: str,
+        dapp_address_router: DAppAddressRouter,
+        default_withdraw_route: bool = True,
+    ):
+        super().__init__()
+        self.balance = Ledger(key_types=('address', 'address', 'uint256'))
+        self.portal_address = portal_address
+        self.dapp_address_router = dapp_address_router
+
+        self.on_deposit = None
+
+        abi_router = ABIRouter()
+        url_router = URLRouter()
+        self.add_router(abi_router)
+        self.add_router(url_router)
+
+        @abi_router.advance(msg_sender=portal_address)
+        def deposit_erc721(rollup: Rollup, data: RollupData) -> bool:
+            return _deposit_erc721(rollup=rollup, data=data, wallet=self)
+
+        withdraw_header = ABIFunctionSelectorHeader(
+            function='ERC721Withdraw',
+            argument_types=abi.get_abi_types_from_model(WithdrawERC721Payload)
+        )
+
+        if default_withdraw_route:
+            @abi_router.advance(header=withdraw_header,
+                                model=WithdrawERC721Payload, packed=True)
+            def withdraw_erc721(rollup: Rollup, data: RollupData,
+                                withdrawal: WithdrawERC721Payload) -> bool:
+                return _withdraw_erc721(rollup=rollup, data=data,
+                                        withdrawal=withdrawal, wallet=self)
+
+        add_balance_inspects(url_router, self.balance, 'erc721',
+                             ('token', 'address', 'id'))
+
+    def journaled_states(self) -> list:
+        return [self.balance, *super().journaled_states()]
+
+
+def _deposit_erc721(
+    wallet: ERC721Wallet,
+    rollup: Rollup,
+    data: RollupData
+) -> bool:
+
+    payload = data.bytes_payload()
+    LOGGER.debug("Payload: %s", payload.hex())
+
+    token, sender, token_id, _ = _decode_deposit(payload)
+    wallet.balance[token, sender, token_id] = 1
+
+    if wallet.on_deposit is not None:
+        try:
+            deposit = abi.decode_to_model(data=payload,
+                                          model=DepositERC721Payload,
+                                          packed=True)
+            wallet.on_deposit(rollup, data, deposit)
+        except Exception:
+            LOGGER.error("Error handling ERC721 deposit.", exc_info=True)
+
+    return True
+
+
+def _withdraw_erc721(
+    wallet: ERC721Wallet,
+    rollup: Rollup,
+    data: RollupData,
+    withdrawal: WithdrawERC721Payload,
+) -> bool:
+
+    rollup_address = dapp_address(wallet.dapp_address_router)
+    if rollup_address is None:
+        return False
+
+    address = data.metadata.msg_sender
+    try:
+        del wallet.balance[withdrawal.token, address, withdrawal.tokenId]
+    except KeyError:
+        return False
+
+    voucher = vouchers.transfer_erc721(token=withdrawal.token,
+                                       rollup_address=rollup_address,
+                                       receiver_address=address,
+                                       token_id=withdrawal.tokenId)
+    rollup.voucher(voucher)
+
+    return True
@@ -1,12 +1,15 @@
-import json
 import logging
 
 from pydantic import BaseModel
 
-from .. import abi
+from .. import abi, vouchers, _packed
 from ..models import RollupData, ABIFunctionSelectorHeader
 from ..rollup import Rollup
-from ..router import MultiRouter, ABIRouter, URLRouter, DAppAddressRouter
+from ..router import (
+    MultiRouter, ABIRouter, URLRouter, URLParameters, DAppAddressRouter
+)
+from ._common import dapp_address, page_params, report_json
+from .ledger import Ledger
 
 
 LOGGER = logging.getLogger(__name__)
@@ -23,12 +26,17 @@ class WithdrawEtherPayload(BaseModel):
     execLayerData: bytes
 
 
+_decode_deposit = _packed.compile_decoder(
+    tuple(abi.get_abi_types_from_model(DepositEtherPayload))
+)
+
+
 class EtherWallet(MultiRouter):
     """Ether Wallet
 
     Attributes
     ----------
-    balance : dict
+    balance : Ledger
         Maps an address to its balance
     """
 
@@ -39,7 +47,7 @@ class EtherWallet(MultiRouter):
         default_withdraw_route: bool = True,
     ):
         super().__init__()
-        self.balance: dict[str, int] = {}
+        self.balance = Ledger()
         self.portal_address = portal_address
         self.dapp_address_router = dapp_address_router
 
@@ -60,13 +68,27 @@ class EtherWallet(MultiRouter):
         )
 
         if default_withdraw_route:
-            @abi_router.advance(header=withdraw_header)
-            def withdraw_ether(rollup: Rollup, data: RollupData) -> bool:
-                return _withdraw_ether(rollup=rollup, data=data, wallet=self)
+            @abi_router.advance(header=withdraw_header,
+                                model=WithdrawEtherPayload, packed=True)
+            def withdraw_ether(rollup: Rollup, data: RollupData,
+                               withdrawal: WithdrawEtherPayload) -> bool:
+                return _withdraw_ether(rollup=rollup, data=data,
+                                       withdrawal=withdrawal, wallet=self)
 
         @url_router.inspect(path="balance/ether")
-        def inspect_ether_balance(rollup: Rollup) -> bool:
-            return _inpect_ether_balance(rollup=rollup, wallet=self)
+        def inspect_ether_balances(rollup: Rollup,
+                                   params: URLParameters) -> bool:
+            return _inspect_ether_balances(rollup=rollup, params=params,
+                                           wallet=self)
+
+        @url_router.inspect(path="balance/ether/{address:address}")
+        def inspect_ether_balance(rollup: Rollup,
+                                  params: URLParameters) -> bool:
+            return _inspect_ether_balance(rollup=rollup, params=params,
+                                          wallet=self)
+
+    def journaled_states(self) -> list:
+        return [self.balance, *super().journaled_states()]
 
 
 def _deposit_ether(
@@ -78,15 +100,19 @@ def _deposit_ether(
     payload = data.bytes_payload()
     LOGGER.debug("Payload: %s", payload.hex())
 
-    deposit = abi.decode_to_model(data=payload, model=DepositEtherPayload,
-                                  packed=True)
+    sender, amount, _ = _decode_deposit(payload)
 
-    sender = deposit.sender.lower()
-    wallet.balance.setdefault(sender, 0)
-    wallet.balance[sender] += deposit.depositAmount
+    try:
+        wallet.balance.credit(sender, amount)
+    except OverflowError:
+        LOGGER.error("Balance of %s would overflow.", sender)
+        return False
 
     if wallet.on_deposit is not None:
         try:
+            deposit = abi.decode_to_model(data=payload,
+                                          model=DepositEtherPayload,
+                                          packed=True)
             wallet.on_deposit(rollup, data, deposit)
         except Exception:
             LOGGER.error("Error handling ether deposit.", exc_info=True)
@@ -94,14 +120,40 @@ def _deposit_ether(
     return True
 
 
-def _inpect_ether_balance(
+def _inspect_ether_balance(
     rollup: Rollup,
-    # data: RollupData,
-    # params: URLParameters,
+    params: URLParameters,
     wallet: EtherWallet,
 ):
-    response_payload = '0x' + json.dumps(wallet.balance).encode('ascii').hex()
-    rollup.report(payload=response_payload)
+    address = params.path_params['address']
+    report_json(rollup, {
+        'address': address,
+        'balance': wallet.balance.get(address, 0),
+    })
+    return True
+
+
+def _inspect_ether_balances(
+    rollup: Rollup,
+    params: URLParameters,
+    wallet: EtherWallet,
+):
+    query = params.query_params
+    if 'cursor' not in query and 'limit' not in query:
+        # Without paging parameters, keep reporting every balance
+        report_json(rollup, dict(wallet.balance))
+        return True
+
+    try:
+        balances, next_cursor = wallet.balance.page(*page_params(params))
+    except ValueError:
+        LOGGER.error("Invalid page of ether balances: %r", query)
+        return False
+
+    report_json(rollup, {
+        'balances': dict(balances),
+        'next_cursor': next_cursor,
+    })
     return True
 
 
@@ -109,25 +161,22 @@ def _withdraw_ether(
     wallet: EtherWallet,
     rollup: Rollup,
     data: RollupData,
+    withdrawal: WithdrawEtherPayload,
 ) -> bool:
 
-    payload = data.bytes_payload()
-    LOGGER.debug("Payload: %s", payload.hex())
-
-    withdrawal = abi.decode_to_model(
-        data=payload,
-        model=WithdrawEtherPayload,
-        packed=True
-    )
+    rollup_address = dapp_address(wallet.dapp_address_router)
+    if rollup_address is None:
+        return False
 
     address = data.metadata.msg_sender
-    balance = wallet.balance.get(address.lower(), 0)
-
-    if balance < withdrawal.amount:
+    try:
+        wallet.balance.debit(address, withdrawal.amount)
+    except ValueError:
         return False
 
-    wallet.balance[address] -= withdrawal.amount
-
-    # Generate Voucher
+    voucher = vouchers.withdraw_ether(rollup_address=rollup_address,
+                                      receiver_address=address,
+                                      amount=withdrawal.amount)
+    rollup.voucher(voucher)
 
     return True
@@ -0,0 +1,514 @@
+"""
+Compact ledger of balances keyed by address
+
+The accounts are kept in two byte arrays, one with the fixed-size keys and
+one with the 32-byte balances, in insertion order, and located through an
+open addressing hash table of entry numbers. With 20-byte addresses as keys
+this takes about 60 bytes per account, against more than 150 for a dict of
+hex strings to Python integers.
+
+Keys may also combine several addresses and integers, such as a token, an
+owner and a token id, which are stored side by side in the key bytes.
+
+While a transaction is open, each insertion and removal is journaled, along
+with the first change to each balance, so that a rejected input is undone
+in proportion to the accounts it touched.
+"""
+from array import array
+from collections.abc import Iterable, Iterator, MutableMapping
+
+from ..state import Journaled
+
+ADDRESS_SIZE = 20
+BALANCE_SIZE = 32
+MAX_BALANCE = 2**256 - 1
+
+_EMPTY = -1
+_MIN_CAPACITY = 8
+
+# Kinds of journal records
+_INSERTED = 0
+_REMOVED = 1
+_WRITTEN = 2
+
+
+class Ledger(MutableMapping, Journaled):
+    """Balances of accounts, keyed by address.
+
+    Addresses may be given as hex strings, starting with `0x`, in any case,
+    or as 20 bytes, and are normalized so that all the forms of an address
+    refer to the same account. Iterating over the ledger yields the
+    addresses as lowercase hex strings, in the order the accounts were
+    created, so it can be used as the `dict` it replaces.
+
+    With more than one key type, such as `('address', 'address',
+    'uint256')` for token, owner and token id, the keys are tuples with one
+    value per type, and `uint256` values are non-negative integers.
+
+    Balances are unsigned 256-bit integers. `credit` and `debit` update a
+    balance in constant time, raising OverflowError or ValueError instead of
+    leaving the range, and `apply_credits` and `apply_debits` update many
+    balances either entirely or not at all.
+
+    The ledger is journaled: the changes made between `begin()` and
+    `rollback()` are undone, restoring the order of the accounts as well.
+
+    Parameters
+    ----------
+    balances : Mapping | Iterable, optional
+        Initial balances, as in `dict()`
+    key_types : tuple[str, ...], optional
+        Type of each part of the keys, either `'address'` or `'uint256'`.
+        By default a single address.
+    """
+
+    def __init__(self, balances=(), key_types: tuple[str, ...] = ('address',)):
+        try:
+            parts = [_KEY_PARTS[key_type] for key_type in key_types]
+        except KeyError as exc:
+            raise ValueError(f'Invalid key type {exc.args[0]!r}') from None
+        if not parts:
+            raise ValueError('The keys must have at least one part')
+        self.key_types = tuple(key_types)
+        self._parts = parts
+        self._key_size = sum(size for size, _, _ in parts)
+        if len(parts) == 1:
+            self._key, self._account = parts[0][1:]
+        else:
+            self._key, self._account = _compose(parts)
+
+        self._keys = bytearray()
+        self._values = bytearray()
+        self._slots = array('i', [_EMPTY]) * _MIN_CAPACITY
+        self._mask = _MIN_CAPACITY - 1
+        # Undo records and the keys whose balance is recorded, while a
+        # transaction is open
+        self._journal: list[tuple] | None = None
+        self._touched: set[bytes] | None = None
+        self.update(balances)
+
+    def __len__(self) -> int:
+        return len(self._keys) // self._key_size
+
+    def __iter__(self) -> Iterator:
+        keys = self._keys
+        size = self._key_size
+        account = self._account
+        for pos in range(0, len(keys), size):
+            yield account(bytes(keys[pos:pos + size]))
+
+    def __getitem__(self, account) -> int:
+        try:
+            key = self._key(account)
+        except ValueError:
+            raise KeyError(account) from None
+        entry = self._lookup(key)[1]
+        if entry == _EMPTY:
+            raise KeyError(account)
+        return self._balance(entry)
+
+    def __setitem__(self, account, balance: int):
+        _check_amount(balance)
+        if balance > MAX_BALANCE:
+            raise OverflowError(f'Balance of {account} above the maximum')
+        key = self._key(account)
+        slot, entry = self._lookup(key)
+        if entry == _EMPTY:
+            self._insert(slot, key, balance)
+        else:
+            self._write(entry, balance)
+
+    def __delitem__(self, account):
+        try:
+            key = self._key(account)
+        except ValueError:
+            raise KeyError(account) from None
+        slot, entry = self._lookup(key)
+        if entry == _EMPTY:
+            raise KeyError(account)
+        self._remove(slot, entry)
+
+    def __sizeof__(self) -> int:
+        return (object.__sizeof__(self) + self._keys.__sizeof__()
+                + self._values.__sizeof__() + self._slots.__sizeof__())
+
+    def credit(self, account, amount: int) -> int:
+        """Add `amount` to the balance of an account, creating it if needed.
+
+        Returns the new balance. Raises OverflowError if it would not fit in
+        256 bits and ValueError if the amount is negative.
+        """
+        _check_amount(amount)
+        key = self._key(account)
+        slot, entry = self._lookup(key)
+        if entry == _EMPTY:
+            if amount > MAX_BALANCE:
+                raise OverflowError(f'Balance of {account} above the maximum')
+            self._insert(slot, key, amount)
+            return amount
+        balance = self._balance(entry) + amount
+        if balance > MAX_BALANCE:
+            raise OverflowError(f'Balance of {account} above the maximum')
+        self._write(entry, balance)
+        return balance
+
+    def debit(self, account, amount: int) -> int:
+        """Subtract `amount` from the balance of an account.
+
+        Returns the new balance. Raises ValueError if the balance is not
+        enough, including when the account does not exist, or if the amount
+        is negative. The account is kept when its balance reaches zero.
+        """
+        _check_amount(amount)
+        entry = self._lookup(self._key(account))[1]
+        balance = self._balance(entry) if entry != _EMPTY else 0
+        if balance < amount:
+            raise ValueError(f'Insufficient balance for {account}')
+        if entry != _EMPTY:
+            self._write(entry, balance - amount)
+        return balance - amount
+
+    def apply_credits(self, credits: Iterable[tuple], prefix: tuple = ()):
+        """Credit many accounts at once, such as a batch of deposits.
+
+        The amounts for the same account are added together, and every new
+        balance is checked before changing any of them, so the ledger is
+        left untouched if any amount is invalid or any balance would
+        overflow.
+
+        Parameters
+        ----------
+        credits : Iterable[tuple]
+            Pairs of account and amount
+        prefix : tuple, optional
+            Leading parts of the keys, shared by all the accounts, which
+            are then given without them. For instance, the token and the
+            owner of a batch of token ids, given as `(token_id, amount)`
+            pairs. The prefix is only converted once.
+        """
+        updates = []
+        totals = self._totals(credits, prefix)
+        for key, (entry, balance, amount) in totals.items():
+            balance += amount
+            if balance > MAX_BALANCE:
+                raise OverflowError(
+                    f'Balance of {self._account(key)} above the maximum'
+                )
+            updates.append((key, entry, balance))
+        self._apply(updates)
+
+    def apply_debits(self, debits: Iterable[tuple], prefix: tuple = ()):
+        """Debit many accounts at once, such as a batch of withdrawals.
+
+        Like `apply_credits`, the ledger is left untouched if any amount is
+        invalid or any balance is not enough, raising ValueError.
+
+        Parameters
+        ----------
+        debits : Iterable[tuple]
+            Pairs of account and amount
+        prefix : tuple, optional
+            Leading parts of the keys, as in `apply_credits`
+        """
+        updates = []
+        totals = self._totals(debits, prefix)
+        for key, (entry, balance, amount) in totals.items():
+            if balance < amount:
+                raise ValueError(
+                    f'Insufficient balance for {self._account(key)}'
+                )
+            if entry != _EMPTY:
+                updates.append((key, entry, balance - amount))
+        self._apply(updates)
+
+    def begin(self):
+        if self._journal is not None:
+            raise RuntimeError('A transaction is already open')
+        self._journal = []
+        self._touched = set()
+
+    def commit(self):
+        self._journal = None
+        self._touched = None
+
+    def rollback(self):
+        journal = self._journal
+        self._journal = None
+        self._touched = None
+        if not journal:
+            return
+        for record in reversed(journal):
+            if record[0] == _WRITTEN:
+                _, key, balance = record
+                self._write(self._lookup(key)[1], balance)
+            elif record[0] == _INSERTED:
+                # The inserted account is the last one
+                key = record[1]
+                self._remove(*self._lookup(key))
+            else:
+                _, entry, key, balance = record
+                self._restore(entry, key, balance)
+
+    def page(self, cursor: int = 0, limit: int = 100
+             ) -> tuple[list[tuple], int | None]:
+        """Return up to `limit` accounts, starting at position `cursor`.
+
+        The accounts are in the order they were created, so paging through
+        the ledger while deposits are made still lists every account once.
+        Only removing accounts moves them around.
+
+        Returns
+        -------
+        tuple[list[tuple], int | None]
+            Pairs of account and balance, and the cursor of the next page,
+            or None if this is the last one
+        """
+        if cursor < 0 or limit < 0:
+            raise ValueError('The cursor and the limit cannot be negative')
+        stop = min(cursor + limit, len(self))
+        keys = self._keys
+        size = self._key_size
+        account = self._account
+        items = [
+            (account(bytes(keys[pos:pos + size])), self._balance(entry))
+            for entry, pos in zip(range(cursor, stop),
+                                  range(cursor * size, stop * size, size))
+        ]
+        return items, (stop if stop < len(self) else None)
+
+    def _totals(self, amounts: Iterable[tuple], prefix: tuple) -> dict:
+        """Add up the amounts of each account, along with its entry and its
+        current balance"""
+        to_key = self._key
+        if prefix:
+            to_key = self._suffix_key(prefix)
+        totals = {}
+        for account, amount in amounts:
+            _check_amount(amount)
+            key = to_key(account)
+            known = totals.get(key)
+            if known is None:
+                entry = self._lookup(key)[1]
+                balance = self._balance(entry) if entry != _EMPTY else 0
+                totals[key] = (entry, balance, amount)
+            else:
+                totals[key] = (known[0], known[1], known[2] + amount)
+        return totals
+
+    def _suffix_key(self, prefix: tuple):
+        """Return the function converting the rest of a key to bytes"""
+        count = len(prefix)
+        if not isinstance(prefix, tuple) or count >= len(self._parts):
+            raise ValueError(f'Invalid key prefix {prefix!r}')
+        head = b''.join([
+            to_key(value) for (_, to_key, _), value in zip(self._parts, prefix)
+        ])
+        rest = self._parts[count:]
+        if len(rest) == 1:
+            to_key = rest[0][1]
+        else:
+            to_key = _compose(rest)[0]
+        return lambda account: head + to_key(account)
+
+    def _apply(self, updates: list[tuple[bytes, int, int]]):
+        for key, entry, balance in updates:
+            if entry == _EMPTY:
+                # Earlier insertions may have moved the free slots
+                self._insert(self._lookup(key)[0], key, balance)
+            else:
+                self._write(entry, balance)
+
+    def _lookup(self, key: bytes) -> tuple[int, int]:
+        """Return the slot of a key and its entry, or the free slot where it
+        would be inserted and `_EMPTY`"""
+        slots = self._slots
+        keys = self._keys
+        size = self._key_size
+        mask = self._mask
+        slot = hash(key) & mask
+        while True:
+            entry = slots[slot]
+            if entry == _EMPTY:
+                return slot, entry
+            pos = entry * size
+            if keys[pos:pos + size] == key:
+                return slot, entry
+            slot = (slot + 1) & mask
+
+    def _balance(self, entry: int) -> int:
+        pos = entry * BALANCE_SIZE
+        return int.from_bytes(self._values[pos:pos + BALANCE_SIZE], 'big')
+
+    def _write(self, entry: int, balance: int):
+        pos = entry * BALANCE_SIZE
+        if self._journal is not None:
+            size = self._key_size
+            key = bytes(self._keys[entry * size:(entry + 1) * size])
+            if key not in self._touched:
+                self._touched.add(key)
+                self._journal.append((_WRITTEN, key, self._balance(entry)))
+        self._values[pos:pos + BALANCE_SIZE] = balance.to_bytes(BALANCE_SIZE,
+                                                                'big')
+
+    def _insert(self, slot: int, key: bytes, balance: int):
+        if self._journal is not None:
+            # Undoing the insertion drops the balance too
+            self._touched.add(key)
+            self._journal.append((_INSERTED, key))
+        entry = len(self)
+        self._keys += key
+        self._values += balance.to_bytes(BALANCE_SIZE, 'big')
+        self._slots[slot] = entry
+        self._grow()
+
+    def _grow(self):
+        # Keep the table at most two thirds full
+        if 3 * len(self) > 2 * len(self._slots):
+            self._resize(2 * len(self._slots))
+
+    def _remove(self, slot: int, entry: int):
+        """Remove an entry, moving the last one into its place"""
+        keys = self._keys
+        values = self._values
+        size = self._key_size
+        last = len(self) - 1
+        if self._journal is not None:
+            self._journal.append((_REMOVED, entry,
+                                  bytes(keys[entry * size:(entry + 1) * size]),
+                                  self._balance(entry)))
+        if entry != last:
+            pos = last * size
+            last_slot = self._lookup(bytes(keys[pos:pos + size]))[0]
+            self._slots[last_slot] = entry
+            keys[entry * size:(entry + 1) * size] = keys[pos:pos + size]
+            pos = last * BALANCE_SIZE
+            values[entry * BALANCE_SIZE:(entry + 1) * BALANCE_SIZE] = \
+                values[pos:pos + BALANCE_SIZE]
+        del keys[last * size:]
+        del values[last * BALANCE_SIZE:]
+
+        # Shift back the following entries of the probe sequence, so that
+        # no lookup stops at the freed slot
+        slots = self._slots
+        mask = self._mask
+        slots[slot] = _EMPTY
+        hole = slot
+        slot = (slot + 1) & mask
+        while slots[slot] != _EMPTY:
+            pos = slots[slot] * size
+            home = hash(bytes(keys[pos:pos + size])) & mask
+            if (slot - home) & mask >= (slot - hole) & mask:
+                slots[hole] = slots[slot]
+                slots[slot] = _EMPTY
+                hole = slot
+            slot = (slot + 1) & mask
+
+    def _restore(self, entry: int, key: bytes, balance: int):
+        """Undo the removal of an entry, moving back the one that took its
+        place to the end"""
+        keys = self._keys
+        values = self._values
+        size = self._key_size
+        count = len(self)
+        if entry < count:
+            pos = entry * size
+            moved = bytes(keys[pos:pos + size])
+            self._slots[self._lookup(moved)[0]] = count
+            keys += moved
+            pos = entry * BALANCE_SIZE
+            values += values[pos:pos + BALANCE_SIZE]
+            keys[entry * size:(entry + 1) * size] = key
+            values[pos:pos + BALANCE_SIZE] = balance.to_bytes(BALANCE_SIZE,
+                                                              'big')
+        else:
+            keys += key
+            values += balance.to_bytes(BALANCE_SIZE, 'big')
+        self._slots[self._lookup(key)[0]] = entry
+        self._grow()
+
+    def _resize(self, capacity: int):
+        slots = array('i', [_EMPTY]) * capacity
+        mask = capacity - 1
+        keys = bytes(self._keys)
+        size = self._key_size
+        for entry, pos in enumerate(range(0, len(keys), size)):
+            slot = hash(keys[pos:pos + size]) & mask
+            while slots[slot] != _EMPTY:
+                slot = (slot + 1) & mask
+            slots[slot] = entry
+        self._slots = slots
+        self._mask = mask
+
+
+def _address_key(account) -> bytes:
+    """Return the 20 bytes of an address given as hex or as bytes"""
+    if isinstance(account, str):
+        if len(account) == 2 + 2 * ADDRESS_SIZE and account[:2] in ('0x',
+                                                                    '0X'):
+            try:
+                key = bytes.fromhex(account[2:])
+            except ValueError:
+                key = None
+            # fromhex skips whitespace, making the address shorter
+            if key is not None and len(key) == ADDRESS_SIZE:
+                return key
+    elif isinstance(account, (bytes, bytearray, memoryview)):
+        if len(account) == ADDRESS_SIZE:
+            return bytes(account)
+    raise ValueError(f'Invalid address {account!r}')
+
+
+def _address_account(key: bytes) -> str:
+    return '0x' + key.hex()
+
+
+def _uint256_key(value) -> bytes:
+    if (not isinstance(value, int) or isinstance(value, bool)
+            or not 0 <= value <= MAX_BALANCE):
+        raise ValueError(f'Invalid uint256 {value!r}')
+    return value.to_bytes(32, 'big')
+
+
+def _uint256_account(key: bytes) -> int:
+    return int.from_bytes(key, 'big')
+
+
+_KEY_PARTS = {
+    'address': (ADDRESS_SIZE, _address_key, _address_account),
+    'uint256': (32, _uint256_key, _uint256_account),
+}
+
+
+def _compose(parts: list[tuple]):
+    """Return the functions converting tuple keys to bytes and back"""
+    count = len(parts)
+    bounds = []
+    pos = 0
+    for size, _, _ in parts:
+        bounds.append((pos, pos + size))
+        pos += size
+    to_key = [to_key for _, to_key, _ in parts]
+    to_account = [to_account for _, _, to_account in parts]
+
+    def key(account) -> bytes:
+        if not isinstance(account, tuple) or len(account) != count:
+            raise ValueError(f'Expected a key with {count} parts, got '
+                             f'{account!r}')
+        return b''.join([
+            convert(value) for convert, value in zip(to_key, account)
+        ])
+
+    def account(key: bytes) -> tuple:
+        return tuple(
+            convert(key[start:end])
+            for convert, (start, end) in zip(to_account, bounds)
+        )
+
+    return key, account
+
+
+def _check_amount(amount: int):
+    if not isinstance(amount, int) or isinstance(amount, bool):
+        raise ValueError(f'Invalid amount {amount!r}')
+    if amount < 0:
+        raise ValueError(f'Negative amount {amount}')
@@ -0,0 +1,260 @@
+import random
+import sys
+
+import pytest
+
+from .ledger import Ledger, MAX_BALANCE
+
+ALICE = '0x721be000f6054b5e0e57aaab791015b53f0a18f4'
+BOB = '0xf39fd6e51aad88f6f4ce6ab8827279cfffb92266'
+
+
+def address(idx: int) -> str:
+    return '0x' + idx.to_bytes(20, 'big').hex()
+
+
+def test_should_normalize_addresses():
+    ledger = Ledger()
+    ledger.credit(ALICE.upper().replace('0X', '0x'), 10)
+    ledger.credit(bytes.fromhex(ALICE[2:]), 5)
+
+    assert ledger[ALICE] == 15
+    assert list(ledger) == [ALICE]
+    assert dict(ledger) == {ALICE: 15}
+
+
+def test_should_behave_as_a_dict():
+    ledger = Ledger({ALICE: 1})
+    ledger[BOB] = 2
+
+    assert len(ledger) == 2
+    assert ledger.get(BOB) == 2
+    assert ledger.get(address(1), 0) == 0
+    assert ledger.get('not an address') is None
+    assert 'not an address' not in ledger
+    assert BOB in ledger
+
+    del ledger[ALICE]
+    assert dict(ledger) == {BOB: 2}
+    with pytest.raises(KeyError):
+        del ledger[ALICE]
+
+
+def test_should_debit():
+    ledger = Ledger({ALICE: 10})
+
+    assert ledger.debit(ALICE, 4) == 6
+    assert ledger.debit(ALICE, 6) == 0
+    assert ledger[ALICE] == 0
+
+    with pytest.raises(ValueError):
+        ledger.debit(ALICE, 1)
+    with pytest.raises(ValueError):
+        ledger.debit(BOB, 1)
+    assert BOB not in ledger
+
+
+@pytest.mark.parametrize('amount', [-1, 1.5, True, '1'])
+def test_should_reject_invalid_amounts(amount):
+    ledger = Ledger()
+    with pytest.raises(ValueError):
+        ledger.credit(ALICE, amount)
+    with pytest.raises(ValueError):
+        ledger[ALICE] = amount
+    assert len(ledger) == 0
+
+
+@pytest.mark.parametrize('account', ['0x1234', ALICE[2:], ALICE[:-2] + ' 1',
+                                     b'\x00' * 19, 42])
+def test_should_reject_invalid_addresses(account):
+    with pytest.raises(ValueError):
+        Ledger().credit(account, 1)
+
+
+def test_should_check_overflow():
+    ledger = Ledger({ALICE: MAX_BALANCE - 1})
+
+    assert ledger.credit(ALICE, 1) == MAX_BALANCE
+    with pytest.raises(OverflowError):
+        ledger.credit(ALICE, 1)
+    with pytest.raises(OverflowError):
+        ledger.credit(BOB, MAX_BALANCE + 1)
+    assert ledger[ALICE] == MAX_BALANCE
+    assert BOB not in ledger
+
+
+def test_should_apply_credits_atomically():
+    ledger = Ledger({ALICE: MAX_BALANCE - 5})
+
+    with pytest.raises(OverflowError):
+        ledger.apply_credits([(BOB, 1), (ALICE, 3), (ALICE, 3)])
+    with pytest.raises(ValueError):
+        ledger.apply_credits([(BOB, 1), (ALICE, -1)])
+    assert dict(ledger) == {ALICE: MAX_BALANCE - 5}
+
+    ledger.apply_credits([(BOB, 1), (ALICE, 3), (BOB, 2)])
+    assert dict(ledger) == {ALICE: MAX_BALANCE - 2, BOB: 3}
+
+
+def test_should_match_a_dict_through_growth_and_removal():
+    ledger = Ledger()
+    expected = {}
+    for idx in range(2000):
+        account = address(idx * 7919 % 100003)
+        ledger.credit(account, idx)
+        expected[account] = expected.get(account, 0) + idx
+    for idx in range(0, 2000, 3):
+        account = address(idx * 7919 % 100003)
+        del ledger[account]
+        del expected[account]
+
+    assert len(ledger) == len(expected)
+    assert dict(ledger) == expected
+    for account, balance in expected.items():
+        assert ledger[account] == balance
+
+
+def test_should_be_smaller_than_a_dict():
+    accounts = {address(idx): 10**18 * idx for idx in range(10000)}
+    ledger = Ledger(accounts)
+
+    dict_size = sys.getsizeof(accounts) + sum(
+        sys.getsizeof(key) + sys.getsizeof(value)
+        for key, value in accounts.items()
+    )
+    assert sys.getsizeof(ledger) < dict_size / 2
+
+
+def test_should_list_pages():
+    ledger = Ledger({address(idx): idx for idx in range(5)})
+
+    items, cursor = ledger.page(0, 2)
+    assert items == [(address(0), 0), (address(1), 1)]
+    assert cursor == 2
+
+    ledger.credit(address(5), 5)
+    pages = []
+    while cursor is not None:
+        items, cursor = ledger.page(cursor, 2)
+        pages.append(items)
+    assert pages == [[(address(2), 2), (address(3), 3)],
+                     [(address(4), 4), (address(5), 5)]]
+
+    assert ledger.page(6) == ([], None)
+    assert ledger.page(10, 5) == ([], None)
+    with pytest.raises(ValueError):
+        ledger.page(-1)
+
+
+def test_should_apply_debits_atomically():
+    ledger = Ledger({ALICE: 10, BOB: 5})
+
+    with pytest.raises(ValueError):
+        ledger.apply_debits([(ALICE, 5), (BOB, 3), (ALICE, 6)])
+    with pytest.raises(ValueError):
+        ledger.apply_debits([(ALICE, 1), (address(1), 1)])
+    assert dict(ledger) == {ALICE: 10, BOB: 5}
+
+    ledger.apply_debits([(ALICE, 5), (BOB, 5), (ALICE, 5), (address(1), 0)])
+    assert dict(ledger) == {ALICE: 0, BOB: 0}
+
+
+def test_should_key_by_tuples():
+    token = '0x' + '42' * 20
+    ledger = Ledger(key_types=('address', 'address', 'uint256'))
+    ledger.credit((token.upper().replace('0X', '0x'), ALICE, 1), 10)
+    ledger.apply_credits([((token, ALICE, 1), 5), ((token, BOB, 2**255), 1)])
+
+    assert ledger[token, ALICE, 1] == 15
+    assert list(ledger) == [(token, ALICE, 1), (token, BOB, 2**255)]
+    assert ledger.page(1) == ([((token, BOB, 2**255), 1)], None)
+    assert (token, ALICE) not in ledger
+    assert (token, ALICE, -1) not in ledger
+    with pytest.raises(ValueError):
+        ledger.credit((token, ALICE), 1)
+    with pytest.raises(ValueError):
+        ledger.credit((token, ALICE, 2**256), 1)
+
+    del ledger[token, ALICE, 1]
+    assert dict(ledger) == {(token, BOB, 2**255): 1}
+
+
+def test_should_reject_invalid_key_types():
+    with pytest.raises(ValueError):
+        Ledger(key_types=('address', 'string'))
+    with pytest.raises(ValueError):
+        Ledger(key_types=())
+
+
+def test_should_apply_with_a_key_prefix():
+    token = '0x' + '42' * 20
+    ledger = Ledger(key_types=('address', 'address', 'uint256'))
+
+    ledger.apply_credits([(1, 10), (2, 20), (1, 5)], prefix=(token, ALICE))
+    assert dict(ledger) == {(token, ALICE, 1): 15, (token, ALICE, 2): 20}
+
+    with pytest.raises(ValueError):
+        ledger.apply_debits([(1, 5), (2, 21)], prefix=(token, ALICE))
+    ledger.apply_debits([(1, 5), (2, 20)], prefix=(token, ALICE))
+    assert dict(ledger) == {(token, ALICE, 1): 10, (token, ALICE, 2): 0}
+
+    with pytest.raises(ValueError):
+        ledger.apply_credits([((ALICE, 1), 1)], prefix=(token,) * 3)
+    with pytest.raises(ValueError):
+        ledger.apply_credits([(1, 1)], prefix=(token, 'bob'))
+
+
+def test_should_roll_back_changes():
+    ledger = Ledger({address(idx): idx for idx in range(10)})
+    before = list(ledger.items())
+
+    ledger.begin()
+    ledger.credit(address(1), 5)
+    ledger.credit(address(1), 5)
+    ledger.debit(address(2), 2)
+    del ledger[address(3)]
+    del ledger[address(9)]
+    ledger[address(3)] = 7
+    ledger.apply_credits([(address(idx), 1) for idx in range(5, 20)])
+    ledger.rollback()
+
+    assert list(ledger.items()) == before
+    for idx in range(20):
+        assert ledger.get(address(idx)) == (idx if idx < 10 else None)
+
+
+def test_should_roll_back_random_changes():
+    rng = random.Random(42)
+    ledger = Ledger({address(idx): idx for idx in range(100)})
+    for _ in range(50):
+        before = list(ledger.items())
+        ledger.begin()
+        for _ in range(rng.randrange(1, 200)):
+            account = address(rng.randrange(300))
+            operation = rng.randrange(3)
+            if operation == 0:
+                ledger.credit(account, rng.randrange(100))
+            elif operation == 1:
+                ledger.pop(account, None)
+            else:
+                ledger[account] = rng.randrange(100)
+        changed = list(ledger.items())
+        if rng.randrange(2):
+            ledger.rollback()
+            assert list(ledger.items()) == before
+        else:
+            ledger.commit()
+            assert list(ledger.items()) == changed
+        # The slots agree with the entries
+        accounts = set(ledger)
+        assert all((address(idx) in ledger) == (address(idx) in accounts)
+                   for idx in range(300))
+
+
+def test_should_refuse_nested_transactions():
+    ledger = Ledger()
+    ledger.begin()
+    with pytest.raises(RuntimeError):
+        ledger.begin()
+    ledger.commit()
+    ledger.begin()
@@ -0,0 +1,45 @@
+import logging
+
+from cartesi import DApp
+from cartesi.router import DAppAddressRouter
+from cartesi.wallet.ether import EtherWallet
+from cartesi.wallet.erc20 import ERC20Wallet
+from cartesi.wallet.erc721 import ERC721Wallet
+from cartesi.wallet.erc1155 import ERC1155Wallet
+
+
+LOGGER = logging.getLogger(__name__)
+logging.basicConfig(level=logging.DEBUG)
+dapp = DApp()
+
+
+ETHER_PORTAL_ADDRESS = '0xffdbe43d4c855bf7e0f105c400a50857f53ab044'
+ERC20_PORTAL_ADDRESS = '0x9c21aeb2093c32ddbc53eef24b873bdcd1ada1db'
+ERC721_PORTAL_ADDRESS = '0x237f8dd094c0e47f4236f12b4fa01d6dae89fb87'
+ERC1155_SINGLE_PORTAL_ADDRESS = '0x7cfb0193ca87eb6e48056885e026552c3a941fc4'
+ERC1155_BATCH_PORTAL_ADDRESS = '0xedb53860a6b52bbb7561ad596416ee9965b055aa'
+DAPP_RELAY_ADDRESS = '0xf5de34d6bbc0446e2a45719e718efebaae179dae'
+
+dapp_address_router = DAppAddressRouter(relay_address=DAPP_RELAY_ADDRESS)
+dapp.add_router(dapp_address_router)
+
+ether_wallet = EtherWallet(portal_address=ETHER_PORTAL_ADDRESS,
+                           dapp_address_router=dapp_address_router)
+dapp.add_router(ether_wallet)
+
+erc20_wallet = ERC20Wallet(portal_address=ERC20_PORTAL_ADDRESS)
+dapp.add_router(erc20_wallet)
+
+erc721_wallet = ERC721Wallet(portal_address=ERC721_PORTAL_ADDRESS,
+                             dapp_address_router=dapp_address_router)
+dapp.add_router(erc721_wallet)
+
+erc1155_wallet = ERC1155Wallet(
+    single_portal_address=ERC1155_SINGLE_PORTAL_ADDRESS,
+    batch_portal_address=ERC1155_BATCH_PORTAL_ADDRESS,
+    dapp_address_router=dapp_address_router,
+)
+dapp.add_router(erc1155_wallet)
+
+if __name__ == '__main__':
+    dapp.run()
@@ -0,0 +1,59 @@
+import asyncio
+import logging
+
+from cartesi import (
+    DApp,
+    Rollup,
+    RollupData,
+    ABIRouter,
+    ABILiteralHeader,
+    JSONRouter,
+    URLRouter,
+    URLParameters,
+)
+
+LOGGER = logging.getLogger(__name__)
+logging.basicConfig(level=logging.DEBUG)
+dapp = DApp()
+abi_router = ABIRouter()
+json_router = JSONRouter()
+url_router = URLRouter()
+dapp.add_router(abi_router)
+dapp.add_router(json_router)
+dapp.add_router(url_router)
+
+
+def str2hex(str):
+    """Encodes a string as a hex string"""
+    return "0x" + str.encode("utf-8").hex()
+
+
+@abi_router.advance(header=ABILiteralHeader(header=b'\x01\x02'))
+async def handle_abi(rollup: Rollup, data: RollupData) -> bool:
+    await rollup.notice(data.payload)
+    return True
+
+
+@json_router.advance({"op": "count"})
+async def handle_count(rollup: Rollup, data: RollupData) -> bool:
+    count = data.json_payload()['count']
+    await asyncio.gather(*(
+        rollup.notice(str2hex(str(idx))) for idx in range(count)
+    ))
+    return True
+
+
+@url_router.inspect('hello/{name}')
+async def hello_inspect(rollup: Rollup, params: URLParameters) -> bool:
+    await rollup.report(str2hex(f'Hello {params.path_params["name"]}'))
+    return True
+
+
+@dapp.advance()
+async def handle_advance(rollup: Rollup, data: RollupData) -> bool:
+    await rollup.report(str2hex('Unknown operation'))
+    return False
+
+
+if __name__ == '__main__':
+    dapp.run()
@@ -1,6 +1,7 @@
 import logging
 
 from cartesi import DApp
+from cartesi.router import DAppAddressRouter
 from cartesi.wallet.ether import EtherWallet
 
 
@@ -10,8 +11,13 @@ dapp = DApp()
 
 
 ETHER_PORTAL_ADDRESS = '0xffdbe43d4c855bf7e0f105c400a50857f53ab044'
+DAPP_RELAY_ADDRESS = '0xf5de34d6bbc0446e2a45719e718efebaae179dae'
 
-ether_wallet = EtherWallet(portal_address=ETHER_PORTAL_ADDRESS)
+dapp_address_router = DAppAddressRouter(relay_address=DAPP_RELAY_ADDRESS)
+dapp.add_router(dapp_address_router)
+
+ether_wallet = EtherWallet(portal_address=ETHER_PORTAL_ADDRESS,
+                           dapp_address_router=dapp_address_router)
 dapp.add_router(ether_wallet)
 
 if __name__ == '__main__':
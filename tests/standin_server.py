@@ -0,0 +1,127 @@
+"""
+Local stand-in for the Rollup HTTP Server, for tests and benchmarks
+"""
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.standin._on_connect()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'null')
+        status, response = self.server.standin._on_request(self.path, body)
+
+        content = b'' if response is None else json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if self.server.standin.chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            if content:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(content), content))
+            self.wfile.write(b'0\r\n\r\n')
+        else:
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandinRollupServer:
+    """Minimal Rollup Server running on a background thread.
+
+    Each `/finish` pops the next entry of `inputs` or answers 202 when it is
+    None or there is none left, unless a `repeat` input is given. Outputs are
+    answered with `output_status`, which may also be a callable receiving
+    the path and body, and recorded together with every other request in
+    `requests`.
+    """
+
+    def __init__(self, inputs=(), chunked: bool = False, repeat=None):
+        self.inputs = deque(inputs)
+        self.repeat = repeat
+        self.chunked = chunked
+        self.output_status = 200
+        self.requests: list[tuple[str, object]] = []
+        self.connections = 0
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.standin = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f'http://{host}:{port}'
+
+    def _on_connect(self):
+        with self._lock:
+            self.connections += 1
+
+    def _on_request(self, path, body):
+        with self._lock:
+            self.requests.append((path, body))
+            if path == '/finish':
+                if self.inputs:
+                    next_input = self.inputs.popleft()
+                    if next_input is None:
+                        return 202, None
+                    return 200, next_input
+                if self.repeat is not None:
+                    return 200, self.repeat
+                return 202, None
+            index = self._counters.get(path, 0)
+            self._counters[path] = index + 1
+            status = self.output_status
+            if callable(status):
+                status = status(path, body)
+            return status, {'index': index}
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={'poll_interval': 0.01},
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def advance_input(payload: str = '0x', msg_sender: str = '0x' + '00' * 20):
+    """Return a `/finish` response body for an advance-state input"""
+    return {
+        'request_type': 'advance_state',
+        'data': {
+            'metadata': {
+                'msg_sender': msg_sender,
+                'epoch_index': 0,
+                'input_index': 0,
+                'block_number': 0,
+                'timestamp': 0,
+            },
+            'payload': payload,
+        },
+    }
@@ -0,0 +1,182 @@
+import json
+
+import eth_abi
+import pytest
+
+from cartesi import _packed
+from cartesi.abi import encode_model
+from cartesi.models import ABIFunctionSelectorHeader
+from cartesi.testclient import TestClient
+from cartesi.wallet.erc1155 import WithdrawERC1155BatchPayload
+
+import examples.asset_wallets as app
+
+SENDER = '0x721be000f6054b5e0e57aaab791015b53f0a18f4'
+TOKEN = '0x' + '42' * 20
+DAPP_ADDRESS = '0xab7528bb862fb57e8a2bcd567a2e929a0be56a5e'
+EXTRA = eth_abi.encode(['bytes', 'bytes'], [b'', b''])
+
+
+@pytest.fixture
+def dapp_client() -> TestClient:
+    for wallet in (app.erc20_wallet, app.erc721_wallet, app.erc1155_wallet):
+        wallet.balance.clear()
+    client = TestClient(app.dapp)
+    client.send_advance(hex_payload=DAPP_ADDRESS,
+                        msg_sender=app.DAPP_RELAY_ADDRESS)
+    return client
+
+
+def packed(types: list[str], values: list) -> str:
+    return '0x' + _packed.encode_packed(types, values).hex()
+
+
+def withdrawal(function: str, types: list[str], values: list) -> str:
+    header = ABIFunctionSelectorHeader(function=function,
+                                       argument_types=types)
+    return '0x' + (header.to_bytes()
+                   + _packed.encode_packed(types, values)).hex()
+
+
+def inspect(client: TestClient, path: str):
+    client.send_inspect(hex_payload='0x' + path.encode('ascii').hex())
+    assert client.rollup.status
+    report = client.rollup.reports[-1]['data']['payload']
+    return json.loads(bytes.fromhex(report[2:]))
+
+
+def test_erc20_deposit_and_withdraw(dapp_client: TestClient):
+    deposit_types = ['bool', 'address', 'address', 'uint256', 'bytes']
+    dapp_client.send_advance(
+        hex_payload=packed(deposit_types, [True, TOKEN, SENDER, 100, b'']),
+        msg_sender=app.ERC20_PORTAL_ADDRESS,
+    )
+    assert dapp_client.rollup.status
+
+    # Failed transfers are not credited
+    dapp_client.send_advance(
+        hex_payload=packed(deposit_types, [False, TOKEN, SENDER, 100, b'']),
+        msg_sender=app.ERC20_PORTAL_ADDRESS,
+    )
+    assert not dapp_client.rollup.status
+    assert inspect(dapp_client, f'balance/erc20/{TOKEN}/{SENDER}') == {
+        'token': TOKEN, 'address': SENDER, 'balance': 100,
+    }
+
+    types = ['address', 'uint256', 'bytes']
+    dapp_client.send_advance(
+        hex_payload=withdrawal('ERC20Withdraw', types, [TOKEN, 30, b'']),
+        msg_sender=SENDER,
+    )
+    assert dapp_client.rollup.status
+    voucher = dapp_client.rollup.vouchers[-1]['data']['payload']
+    assert voucher['destination'] == TOKEN
+    assert voucher['payload'] == '0xa9059cbb' + eth_abi.encode(
+        ['address', 'uint256'], [SENDER, 30]
+    ).hex()
+
+    dapp_client.send_advance(
+        hex_payload=withdrawal('ERC20Withdraw', types, [TOKEN, 71, b'']),
+        msg_sender=SENDER,
+    )
+    assert not dapp_client.rollup.status
+    assert inspect(dapp_client, 'balance/erc20') == {
+        'balances': [{'token': TOKEN, 'address': SENDER, 'balance': 70}],
+        'next_cursor': None,
+    }
+
+
+def test_erc721_deposit_and_withdraw(dapp_client: TestClient):
+    dapp_client.send_advance(
+        hex_payload=packed(['address', 'address', 'uint256', 'bytes'],
+                           [TOKEN, SENDER, 7, EXTRA]),
+        msg_sender=app.ERC721_PORTAL_ADDRESS,
+    )
+    assert dapp_client.rollup.status
+    assert app.erc721_wallet.balance[TOKEN, SENDER, 7] == 1
+    assert inspect(dapp_client, f'balance/erc721/{TOKEN}/{SENDER}/7') == {
+        'token': TOKEN, 'address': SENDER, 'id': 7, 'balance': 1,
+    }
+
+    types = ['address', 'uint256', 'bytes']
+    dapp_client.send_advance(
+        hex_payload=withdrawal('ERC721Withdraw', types, [TOKEN, 7, b'']),
+        msg_sender=SENDER,
+    )
+    assert dapp_client.rollup.status
+    assert (TOKEN, SENDER, 7) not in app.erc721_wallet.balance
+    voucher = dapp_client.rollup.vouchers[-1]['data']['payload']
+    assert voucher['destination'] == TOKEN
+    assert voucher['payload'].endswith(eth_abi.encode(
+        ['address', 'address', 'uint256'], [DAPP_ADDRESS, SENDER, 7]
+    ).hex())
+
+    # Already withdrawn
+    dapp_client.send_advance(
+        hex_payload=withdrawal('ERC721Withdraw', types, [TOKEN, 7, b'']),
+        msg_sender=SENDER,
+    )
+    assert not dapp_client.rollup.status
+
+
+def test_erc1155_deposits_and_withdrawals(dapp_client: TestClient):
+    dapp_client.send_advance(
+        hex_payload=packed(
+            ['address', 'address', 'uint256', 'uint256', 'bytes'],
+            [TOKEN, SENDER, 1, 10, EXTRA],
+        ),
+        msg_sender=app.ERC1155_SINGLE_PORTAL_ADDRESS,
+    )
+    assert dapp_client.rollup.status
+
+    batch = eth_abi.encode(['uint256[]', 'uint256[]', 'bytes', 'bytes'],
+                           [[1, 2, 1], [5, 20, 5], b'', b''])
+    dapp_client.send_advance(
+        hex_payload=packed(['address', 'address', 'bytes'],
+                           [TOKEN, SENDER, batch]),
+        msg_sender=app.ERC1155_BATCH_PORTAL_ADDRESS,
+    )
+    assert dapp_client.rollup.status
+    assert dict(app.erc1155_wallet.balance) == {
+        (TOKEN, SENDER, 1): 20,
+        (TOKEN, SENDER, 2): 20,
+    }
+
+    types = ['address', 'uint256', 'uint256', 'bytes']
+    dapp_client.send_advance(
+        hex_payload=withdrawal('ERC1155Withdraw', types, [TOKEN, 1, 5, b'']),
+        msg_sender=SENDER,
+    )
+    assert dapp_client.rollup.status
+    assert app.erc1155_wallet.balance[TOKEN, SENDER, 1] == 15
+
+    # The batch is withdrawn entirely or not at all
+    header = ABIFunctionSelectorHeader(
+        function='ERC1155BatchWithdraw',
+        argument_types=['address', 'uint256[]', 'uint256[]', 'bytes'],
+    ).to_bytes()
+    for amounts, accepted in [([15, 21], False), ([15, 20], True)]:
+        batch_withdrawal = WithdrawERC1155BatchPayload(
+            token=TOKEN, tokenIds=[1, 2], amounts=amounts, execLayerData=b''
+        )
+        dapp_client.send_advance(
+            hex_payload='0x' + (header
+                                + encode_model(batch_withdrawal)).hex(),
+            msg_sender=SENDER,
+        )
+        assert dapp_client.rollup.status == accepted
+
+    assert dict(app.erc1155_wallet.balance) == {
+        (TOKEN, SENDER, 1): 0,
+        (TOKEN, SENDER, 2): 0,
+    }
+    voucher = dapp_client.rollup.vouchers[-1]['data']['payload']
+    assert voucher['destination'] == TOKEN
+    assert voucher['payload'].startswith('0x2eb2c2d6')
+
+    report = inspect(dapp_client, 'balance/erc1155?limit=1')
+    assert report == {
+        'balances': [{'token': TOKEN, 'address': SENDER, 'id': 1,
+                      'balance': 0}],
+        'next_cursor': 1,
+    }
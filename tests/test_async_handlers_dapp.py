@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from cartesi.testclient import TestClient
+
+import examples.async_handlers
+from examples.async_handlers import str2hex
+
+
+@pytest.fixture
+def dapp_client() -> TestClient:
+    client = TestClient(examples.async_handlers.dapp)
+    return client
+
+
+def test_abi_async_handler(dapp_client: TestClient):
+    dapp_client.send_advance(hex_payload='0x010203')
+
+    assert dapp_client.rollup.status
+    assert dapp_client.rollup.notices[-1]['data']['payload'] == '0x010203'
+
+
+def test_json_async_handler(dapp_client: TestClient):
+    dapp_client.send_advance(
+        hex_payload=str2hex(json.dumps({'op': 'count', 'count': 3}))
+    )
+
+    assert dapp_client.rollup.status
+    payloads = [n['data']['payload'] for n in dapp_client.rollup.notices]
+    assert payloads[-3:] == [str2hex('0'), str2hex('1'), str2hex('2')]
+
+
+def test_url_async_handler(dapp_client: TestClient):
+    dapp_client.send_inspect(hex_payload=str2hex('hello/Earth'))
+
+    assert dapp_client.rollup.status
+    response = str2hex('Hello Earth')
+    assert dapp_client.rollup.reports[-1]['data']['payload'] == response
+
+
+def test_default_async_handler(dapp_client: TestClient):
+    dapp_client.send_advance(hex_payload=str2hex('unknown'))
+
+    assert not dapp_client.rollup.status
+    response = str2hex('Unknown operation')
+    assert dapp_client.rollup.reports[-1]['data']['payload'] == response
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from cartesi import DApp, JournaledDict
+from cartesi.rollup import AsyncHTTPRollupServer
+
+from .standin_server import StandinRollupServer, advance_input
+
+
+class StopLoop(Exception):
+    pass
+
+
+def run_inputs(server, handler, n_inputs):
+    """Run the rollup main loop until `n_inputs` were handled"""
+    server.repeat = advance_input('0xdead')
+    rollup = AsyncHTTPRollupServer(server.url)
+    count = 0
+
+    async def _handler(request):
+        nonlocal count
+        count += 1
+        if count > n_inputs:
+            raise StopLoop()
+        return await handler(rollup, request)
+
+    rollup.set_handler(_handler)
+    with pytest.raises(StopLoop):
+        rollup.main_loop()
+
+
+def test_should_send_outputs_in_order_before_finish():
+    inputs = [advance_input('0x01'), advance_input('0x02')]
+
+    async def handler(rollup, request):
+        # Fire and forget outputs are also joined before finish
+        rollup.report('0xff')
+        indexes = await asyncio.gather(*(
+            rollup.notice(f'0x{idx:02x}') for idx in range(5)
+        ))
+        assert len(indexes) == 5
+        return True
+
+    with StandinRollupServer(inputs=inputs) as server:
+        run_inputs(server, handler, n_inputs=2)
+
+    notices = [
+        body['payload'] for path, body in server.requests
+        if path == '/notice'
+    ]
+    assert notices == [f'0x{idx:02x}' for idx in range(5)] * 2
+
+    finishes = [
+        (idx, body) for idx, (path, body) in enumerate(server.requests)
+        if path == '/finish'
+    ]
+    assert finishes == [
+        (0, {'status': 'accept'}),
+        (7, {'status': 'accept'}),
+        (14, {'status': 'accept'}),
+    ]
+    assert server.connections == 1
+
+
+def test_should_reject_when_output_fails():
+    inputs = [advance_input('0x01')]
+
+    async def handler(rollup, request):
+        rollup.notice('0x01')
+        return True
+
+    with StandinRollupServer(inputs=inputs) as server:
+        server.output_status = 400
+        run_inputs(server, handler, n_inputs=1)
+
+    assert server.requests[-1] == ('/finish', {'status': 'reject'})
+
+
+def test_should_accept_sync_handler():
+    inputs = [advance_input('0x01')]
+
+    async def handler(rollup, request):
+        return _sync_handler(rollup, request)
+
+    def _sync_handler(rollup, request):
+        rollup.notice(request.data.payload)
+        return True
+
+    with StandinRollupServer(inputs=inputs) as server:
+        run_inputs(server, handler, n_inputs=1)
+
+    assert server.requests[1] == ('/notice', {'payload': '0x01'})
+    assert server.requests[-1] == ('/finish', {'status': 'accept'})
+
+
+def test_should_roll_back_state_when_output_fails():
+    inputs = [advance_input('0x01')]
+    dapp = DApp()
+    state = dapp.add_state(JournaledDict())
+
+    @dapp.advance()
+    async def handle_advance(rollup, data):
+        state['x'] = 1
+        rollup.notice('0x01')
+        return True
+
+    async def handler(rollup, request):
+        dapp.rollup = rollup
+        return await dapp._handle_async(request)
+
+    with StandinRollupServer(inputs=inputs) as server:
+        server.output_status = 500
+        run_inputs(server, handler, n_inputs=1)
+
+    assert server.requests[-1] == ('/finish', {'status': 'reject'})
+    assert state == {}
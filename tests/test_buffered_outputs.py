@@ -0,0 +1,151 @@
+from concurrent.futures import Future
+
+import pytest
+
+from cartesi import DApp, JournaledDict
+from cartesi.rollup import HTTPRollupServer, OutputSkipped
+
+from .standin_server import StandinRollupServer, advance_input
+
+
+class StopLoop(Exception):
+    pass
+
+
+def run_inputs(server, handler, n_inputs, buffer_outputs=True):
+    """Run the rollup main loop until `n_inputs` were handled"""
+    server.repeat = advance_input('0xdead')
+    rollup = HTTPRollupServer(server.url, buffer_outputs=buffer_outputs)
+    count = 0
+
+    def _handler(request):
+        nonlocal count
+        count += 1
+        if count > n_inputs:
+            raise StopLoop()
+        return handler(rollup, request)
+
+    rollup.set_handler(_handler)
+    with pytest.raises(StopLoop):
+        rollup.main_loop()
+
+
+def test_should_send_buffered_outputs_in_order():
+    inputs = [advance_input('0x01'), advance_input('0x02')]
+    futures = []
+
+    def handler(rollup, request):
+        for idx in range(20):
+            futures.append(rollup.notice(f'0x{idx:02x}'))
+        rollup.report(request.data.payload)
+        return True
+
+    with StandinRollupServer(inputs=inputs) as server:
+        run_inputs(server, handler, n_inputs=2)
+
+    expected = (
+        [('/finish', {'status': 'accept'})] +
+        [('/notice', {'payload': f'0x{idx:02x}'}) for idx in range(20)] +
+        [('/report', {'payload': '0x01'})] +
+        [('/finish', {'status': 'accept'})] +
+        [('/notice', {'payload': f'0x{idx:02x}'}) for idx in range(20)] +
+        [('/report', {'payload': '0x02'})] +
+        [('/finish', {'status': 'accept'})]
+    )
+    assert server.requests == expected
+    assert all(isinstance(future, Future) for future in futures)
+    assert futures[-1].result() == b'{"index": 39}'
+
+
+def test_should_reject_and_skip_after_failed_output():
+    inputs = [advance_input('0x01'), advance_input('0x02')]
+    futures = []
+
+    def handler(rollup, request):
+        if request.data.payload == '0x01':
+            futures.append(rollup.voucher({'destination': '0x00'}))
+            futures.append(rollup.notice('0x01'))
+        else:
+            rollup.notice('0x02')
+        return True
+
+    def fail_vouchers(path, body):
+        return 400 if path == '/voucher' else 200
+
+    with StandinRollupServer(inputs=inputs) as server:
+        server.output_status = fail_vouchers
+        run_inputs(server, handler, n_inputs=2)
+
+    assert server.requests == [
+        ('/finish', {'status': 'accept'}),
+        ('/voucher', {'destination': '0x00'}),
+        ('/finish', {'status': 'reject'}),
+        ('/notice', {'payload': '0x02'}),
+        ('/finish', {'status': 'accept'}),
+    ]
+    assert futures[0].result() == b'{"index": 0}'
+    with pytest.raises(OutputSkipped):
+        futures[1].result()
+
+
+def test_should_reject_failed_output_without_buffer():
+    inputs = [advance_input('0x01')]
+
+    def handler(rollup, request):
+        rollup.notice('0x01')
+        return True
+
+    with StandinRollupServer(inputs=inputs) as server:
+        server.output_status = 500
+        run_inputs(server, handler, n_inputs=1, buffer_outputs=False)
+
+    assert server.requests[-1] == ('/finish', {'status': 'reject'})
+
+
+@pytest.mark.parametrize('buffer_outputs', [False, True])
+def test_should_roll_back_state_when_output_fails(buffer_outputs):
+    inputs = [advance_input('0x01')]
+    dapp = DApp()
+    state = dapp.add_state(JournaledDict())
+
+    @dapp.advance()
+    def handle_advance(rollup, data):
+        state['x'] = 1
+        rollup.notice('0x01')
+        return True
+
+    def handler(rollup, request):
+        dapp.rollup = rollup
+        return dapp._handle(request)
+
+    with StandinRollupServer(inputs=inputs) as server:
+        server.output_status = 500
+        run_inputs(server, handler, n_inputs=1,
+                   buffer_outputs=buffer_outputs)
+
+    assert server.requests[-1] == ('/finish', {'status': 'reject'})
+    assert state == {}
+
+
+@pytest.mark.parametrize('buffer_outputs', [False, True])
+def test_should_await_outputs_in_async_handlers(buffer_outputs):
+    inputs = [advance_input('0x01')]
+    dapp = DApp()
+    contents = []
+
+    @dapp.advance()
+    async def handle_advance(rollup, data):
+        contents.append(await rollup.notice(data.payload))
+        contents.append(await rollup.report(data.payload))
+        return True
+
+    def handler(rollup, request):
+        dapp.rollup = rollup
+        return dapp._handle(request)
+
+    with StandinRollupServer(inputs=inputs) as server:
+        run_inputs(server, handler, n_inputs=1,
+                   buffer_outputs=buffer_outputs)
+
+    assert server.requests[-1] == ('/finish', {'status': 'accept'})
+    assert contents == [b'{"index": 0}'] * 2
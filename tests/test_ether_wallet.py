@@ -2,14 +2,20 @@ import pytest
 import json
 
 from cartesi.abi import encode_model
+from cartesi.models import ABIFunctionSelectorHeader
 from cartesi.testclient import TestClient
-from cartesi.wallet.ether import DepositEtherPayload
+from cartesi.wallet.ether import DepositEtherPayload, WithdrawEtherPayload
 
 import examples.ether_wallet
 
 
+SENDER = "0x721be000f6054b5e0e57aaab791015b53f0a18f4"
+DAPP_ADDRESS = "0xab7528bb862fb57e8a2bcd567a2e929a0be56a5e"
+
+
 @pytest.fixture
 def dapp_client() -> TestClient:
+    examples.ether_wallet.ether_wallet.balance.clear()
     client = TestClient(examples.ether_wallet.dapp)
     return client
 
@@ -18,7 +24,7 @@ def dapp_client() -> TestClient:
 def deposit_payload() -> str:
     deposit = DepositEtherPayload(
         success=True,
-        sender="0x721be000f6054b5e0e57aaab791015b53f0a18f4",
+        sender=SENDER.upper().replace('0X', '0x'),
         depositAmount=int(1e18),
         execLayerData=b'',
     )
@@ -37,14 +43,108 @@ def test_should_handle_deposit(dapp_client: TestClient, deposit_payload: str):
     assert dapp_client.rollup.status
 
     # Send the inspect
-    path = 'balance/ether'
-    inspect_payload = '0x' + path.encode('ascii').hex()
-    dapp_client.send_inspect(hex_payload=inspect_payload)
+    send_inspect(dapp_client, 'balance/ether')
 
     assert dapp_client.rollup.status
 
+    report = last_report(dapp_client)
+    assert report == {SENDER: int(1e18)}
+
+    send_inspect(dapp_client, 'balance/ether?cursor=0')
+    report = last_report(dapp_client)
+    assert report == {'balances': {SENDER: int(1e18)}, 'next_cursor': None}
+
+
+def last_report(dapp_client: TestClient):
     report = dapp_client.rollup.reports[-1]['data']['payload']
     report = bytes.fromhex(report[2:])
-    report = json.loads(report.decode('utf-8'))
-    print(json.dumps(report, indent=4))
-    assert isinstance(report, dict)
+    return json.loads(report.decode('utf-8'))
+
+
+def send_inspect(dapp_client: TestClient, path: str):
+    dapp_client.send_inspect(hex_payload='0x' + path.encode('ascii').hex())
+
+
+def test_should_inspect_balance_of_address(dapp_client: TestClient,
+                                           deposit_payload: str):
+    dapp_client.send_advance(
+        hex_payload=deposit_payload,
+        msg_sender=examples.ether_wallet.ETHER_PORTAL_ADDRESS,
+    )
+
+    send_inspect(dapp_client, 'balance/ether/' + SENDER.upper()[2:])
+    assert not dapp_client.rollup.status
+
+    send_inspect(dapp_client, 'balance/ether/0x' + SENDER.upper()[2:])
+    assert dapp_client.rollup.status
+    assert last_report(dapp_client) == {'address': SENDER,
+                                        'balance': int(1e18)}
+
+    send_inspect(dapp_client, 'balance/ether/0x' + '00' * 20)
+    assert dapp_client.rollup.status
+    assert last_report(dapp_client) == {'address': '0x' + '00' * 20,
+                                        'balance': 0}
+
+
+def test_should_inspect_balances_by_page(dapp_client: TestClient):
+    balance = examples.ether_wallet.ether_wallet.balance
+    accounts = {f'0x{idx:040x}': idx for idx in range(5)}
+    balance.update(accounts)
+
+    pages = {}
+    cursor = 0
+    while cursor is not None:
+        send_inspect(dapp_client, f'balance/ether?cursor={cursor}&limit=2')
+        assert dapp_client.rollup.status
+        report = last_report(dapp_client)
+        assert len(report['balances']) <= 2
+        pages.update(report['balances'])
+        cursor = report['next_cursor']
+    assert pages == accounts
+
+    send_inspect(dapp_client, 'balance/ether?limit=1000000')
+    assert last_report(dapp_client)['balances'] == accounts
+
+    send_inspect(dapp_client, 'balance/ether?cursor=abc')
+    assert not dapp_client.rollup.status
+    send_inspect(dapp_client, 'balance/ether?cursor=-1')
+    assert not dapp_client.rollup.status
+
+
+def withdraw_payload(amount: int) -> str:
+    header = ABIFunctionSelectorHeader(
+        function='EtherWithdraw',
+        argument_types=['uint256', 'bytes'],
+    )
+    withdrawal = WithdrawEtherPayload(amount=amount, execLayerData=b'')
+    payload = header.to_bytes() + encode_model(withdrawal, packed=True)
+    return '0x' + payload.hex()
+
+
+def test_should_withdraw(dapp_client: TestClient, deposit_payload: str):
+    dapp_client.send_advance(
+        hex_payload=deposit_payload,
+        msg_sender=examples.ether_wallet.ETHER_PORTAL_ADDRESS,
+    )
+    dapp_client.send_advance(
+        hex_payload=DAPP_ADDRESS,
+        msg_sender=examples.ether_wallet.DAPP_RELAY_ADDRESS,
+    )
+    assert dapp_client.rollup.status
+
+    dapp_client.send_advance(hex_payload=withdraw_payload(int(4e17)),
+                             msg_sender=SENDER.upper().replace('0X', '0x'))
+
+    assert dapp_client.rollup.status
+    assert examples.ether_wallet.ether_wallet.balance[SENDER] == int(6e17)
+    voucher = dapp_client.rollup.vouchers[-1]['data']['payload']
+    assert voucher['destination'] == DAPP_ADDRESS
+    assert voucher['payload'].endswith(int(4e17).to_bytes(32, 'big').hex())
+
+    # More than the remaining balance
+    dapp_client.send_advance(hex_payload=withdraw_payload(int(7e17)),
+                             msg_sender=SENDER)
+
+    assert not dapp_client.rollup.status
+    assert examples.ether_wallet.ether_wallet.balance[SENDER] == int(6e17)
+    assert len(dapp_client.rollup.vouchers) == 1
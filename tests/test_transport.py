@@ -0,0 +1,226 @@
+import asyncio
+import socket
+import threading
+
+import pytest
+
+from cartesi.transport import (
+    SessionTransport,
+    SocketTransport,
+    AsyncSocketTransport,
+)
+from cartesi.polling import IdlePolicy
+from cartesi.rollup import HTTPRollupServer
+
+from .standin_server import StandinRollupServer, advance_input
+
+
+class StopLoop(Exception):
+    pass
+
+
+@pytest.fixture(params=['session', 'socket'])
+def transport(request):
+    if request.param == 'session':
+        transport = SessionTransport()
+    else:
+        transport = SocketTransport()
+    yield transport
+    transport.close()
+
+
+@pytest.mark.parametrize('chunked', [False, True])
+def test_should_reuse_connection(transport, chunked):
+    with StandinRollupServer(chunked=chunked) as server:
+        for idx in range(5):
+            response = transport.post(
+                server.url + '/notice',
+                {'payload': '0x'},
+            )
+            assert response.status_code == 200
+            assert response.json() == {'index': idx}
+
+    assert server.connections == 1
+    assert len(server.requests) == 5
+
+
+def test_should_handle_empty_response(transport):
+    with StandinRollupServer() as server:
+        response = transport.post(server.url + '/finish', {'status': 'accept'})
+
+    assert response.status_code == 202
+    assert response.content == b''
+
+
+def test_socket_transport_should_reconnect():
+    transport = SocketTransport()
+    with StandinRollupServer() as server:
+        transport.post(server.url + '/notice', {'payload': '0x'})
+        # Simulate the server dropping the idle connection
+        for conn in transport._connections.values():
+            conn.sock.shutdown(2)
+        response = transport.post(server.url + '/notice', {'payload': '0x'})
+
+    assert response.status_code == 200
+    assert server.connections == 2
+    transport.close()
+
+
+class ClosingServer:
+    """Server answering the first request of each connection, then reading
+    the next one and closing the connection without answering it"""
+
+    def __init__(self):
+        self.requests: list[bytes] = []
+        self._sock = socket.create_server(('127.0.0.1', 0))
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._sock.getsockname()
+        return f'http://{host}:{port}'
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            with conn:
+                reader = conn.makefile('rb')
+                self._read_request(reader)
+                conn.sendall(b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\n'
+                             b'\r\n{}')
+                self._read_request(reader)
+                reader.close()
+
+    def _read_request(self, reader):
+        self.requests.append(reader.readline().split()[1])
+        length = 0
+        while (line := reader.readline()) not in (b'\r\n', b''):
+            name, _, value = line.partition(b':')
+            if name.lower() == b'content-length':
+                length = int(value)
+        reader.read(length)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._sock.close()
+
+
+def test_socket_transport_should_not_resend_processed_request():
+    transport = SocketTransport()
+    with ClosingServer() as server:
+        transport.post(server.url + '/notice', {'payload': '0x'})
+        with pytest.raises(ConnectionError):
+            transport.post(server.url + '/finish', {'status': 'accept'})
+
+    assert server.requests == [b'/notice', b'/finish']
+    transport.close()
+
+
+def test_async_transport_should_not_resend_processed_request():
+    async def post_twice(url):
+        transport = AsyncSocketTransport()
+        try:
+            await transport.post(url + '/notice', {'payload': '0x'})
+            with pytest.raises(ConnectionError):
+                await transport.post(url + '/finish', {'status': 'accept'})
+        finally:
+            await transport.close()
+
+    with ClosingServer() as server:
+        asyncio.run(post_twice(server.url))
+
+    assert server.requests == [b'/notice', b'/finish']
+
+
+class TruncatingServer(ClosingServer):
+    """Server answering with a chunk shorter than its size, then closing
+    the connection"""
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            with conn:
+                reader = conn.makefile('rb')
+                self._read_request(reader)
+                conn.sendall(b'HTTP/1.1 200 OK\r\n'
+                             b'Transfer-Encoding: chunked\r\n'
+                             b'\r\n10\r\n{"index"')
+                reader.close()
+
+
+def test_socket_transport_should_reject_truncated_chunk():
+    transport = SocketTransport()
+    with TruncatingServer() as server:
+        with pytest.raises(ConnectionError, match='Incomplete'):
+            transport.post(server.url + '/notice', {'payload': '0x'})
+
+    assert server.requests == [b'/notice']
+    transport.close()
+
+
+def test_async_transport_should_reject_truncated_chunk():
+    async def post(url):
+        transport = AsyncSocketTransport()
+        try:
+            with pytest.raises(ConnectionError, match='Incomplete'):
+                await transport.post(url + '/notice', {'payload': '0x'})
+        finally:
+            await transport.close()
+
+    with TruncatingServer() as server:
+        asyncio.run(post(server.url))
+
+    assert server.requests == [b'/notice']
+
+
+def test_rollup_server_should_use_transport(transport):
+    inputs = [advance_input('0x01'), advance_input('0x02')]
+    received = []
+
+    def handler(request):
+        received.append(request.data.payload)
+        if len(received) == len(inputs):
+            raise StopLoop()
+        rollup.notice(request.data.payload)
+        return True
+
+    with StandinRollupServer(inputs=inputs) as server:
+        rollup = HTTPRollupServer(server.url, transport=transport)
+        rollup.set_handler(handler)
+        with pytest.raises(StopLoop):
+            rollup.main_loop()
+
+    assert received == ['0x01', '0x02']
+    assert server.requests == [
+        ('/finish', {'status': 'accept'}),
+        ('/notice', {'payload': '0x01'}),
+        ('/finish', {'status': 'accept'}),
+    ]
+    assert server.connections == 1
+
+
+def test_rollup_server_should_back_off_when_idle():
+    policy = IdlePolicy(initial_delay=0.001, max_delay=0.004, jitter=0)
+    inputs = [None, None, None, advance_input('0x01')]
+
+    def handler(request):
+        raise StopLoop()
+
+    with StandinRollupServer(inputs=inputs) as server:
+        rollup = HTTPRollupServer(server.url, idle_policy=policy)
+        rollup.set_handler(handler)
+        with pytest.raises(StopLoop):
+            rollup.main_loop()
+
+    assert policy.stats.idle_polls == 3
+    assert policy.stats.wakeups == 1
+    assert policy.stats.last_wake_latency == pytest.approx(0.004)